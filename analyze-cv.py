@@ -0,0 +1,81 @@
+from fastapi import APIRouter, FastAPI, Request, HTTPException, Query, Depends
+from typing import List
+import importlib
+import logging
+
+from hireform import cv_compact
+from hireform.logs import configure_logging_on_startup
+from hireform.metrics import instrument, stage
+from hireform.responses import ORJSONResponse
+from hireform.security import validate_api_key
+
+# Modèle de rétention et index ESCO partagés avec /predict-cv-retention/
+retention = importlib.import_module("predict-cv-retention")
+
+logger = logging.getLogger(__name__)
+router = APIRouter(tags=["analyze-cv"], default_response_class=ORJSONResponse)
+
+ANALYSES = ("gaps", "retention", "anonymize")
+
+
+def selected_analyses(values: List[str]) -> list:
+    # ?analyses=gaps,retention ou ?analyses=gaps&analyses=retention
+    names = [name.strip() for value in values for name in value.split(",") if name.strip()]
+    unknown = set(names) - set(ANALYSES)
+    if unknown:
+        raise HTTPException(400, f"Analyses inconnues : {', '.join(sorted(unknown))} (choix : {', '.join(ANALYSES)})")
+    return names or list(ANALYSES)
+
+
+# --- Endpoint fusionné : /analyze-gaps/, /predict-cv-retention/ et /anonymize-cv/
+# sur un seul CV, lu et normalisé une fois (cf. hireform.cv_compact)
+@router.post("/analyze-cv/", dependencies=[Depends(validate_api_key)])
+async def analyze_cv(
+    request: Request,
+    analyses: List[str] = Query(list(ANALYSES), description="Analyses à calculer : gaps, retention, anonymize"),
+    gap_threshold: int = Query(3, description="Seuil de détection des trous de carrière en mois"),
+):
+    selected = selected_analyses(analyses)
+    try:
+        payload = await request.json()
+    except:
+        raise HTTPException(400, "JSON invalide")
+
+    try:
+        with stage("normalize"):
+            cv = cv_compact.compact_cv(payload)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    result = {}
+    if "gaps" in selected:
+        with stage("gaps"):
+            result["career_gaps"] = cv_compact.career_gaps(cv.timeline, gap_threshold)
+
+    if "retention" in selected:
+        try:
+            with stage("model_load"):
+                await retention.ensure_loaded()
+        except Exception as e:
+            logger.exception("Chargement du modèle de rétention en échec")
+            raise HTTPException(503, f"Modèle indisponible : {e}")
+        try:
+            with stage("features"):
+                features = cv_compact.retention_features(cv, retention.esco_labels)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        result["retention"] = retention.score(features)
+
+    if "anonymize" in selected:
+        with stage("anonymize"):
+            result["anonymized"] = cv_compact.anonymize(cv)
+
+    return ORJSONResponse(result)
+
+
+# Application autonome (uvicorn analyze-cv:app) : modèle de rétention chargé dès le démarrage.
+# La passerelle (gateway.py) monte seulement `router`.
+app = FastAPI(title="Hireform CV Analysis", lifespan=retention.lifespan, default_response_class=ORJSONResponse)
+app.include_router(router)
+configure_logging_on_startup(app)
+instrument(app)
@@ -1,10 +1,14 @@
-from fastapi import FastAPI, Query, Header, HTTPException
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Depends
 from pydantic import BaseModel
 from typing import List, Optional
-from datetime import datetime
-from dateutil.relativedelta import relativedelta
 
-app = FastAPI(title="Hireform Career Gaps Detector")
+from hireform.cv_compact import Position, career_gaps, parse_year_month
+from hireform.logs import configure_logging_on_startup
+from hireform.metrics import instrument
+from hireform.responses import ORJSONResponse
+from hireform.security import validate_api_key
+
+router = APIRouter(tags=["analyze-gaps"], default_response_class=ORJSONResponse)
 
 class Experience(BaseModel):
     company: str
@@ -15,43 +19,33 @@ class Experience(BaseModel):
 class CV(BaseModel):
     experience: List[Experience]
 
-def parse_date(date_str: str) -> datetime:
-    try:
-        return datetime.strptime(date_str, "%Y-%m")
-    except Exception:
-        raise ValueError(f"Format invalide pour la date : {date_str}")
-
 def detect_career_gaps(experiences: List[Experience], threshold_months: int):
-    sorted_exp = sorted(experiences, key=lambda x: parse_date(x.start_date), reverse=True)
-    gaps = []
-
-    for i in range(len(sorted_exp) - 1):
-        end_current = parse_date(sorted_exp[i].end_date)
-        start_next = parse_date(sorted_exp[i + 1].start_date)
-
-        diff = relativedelta(start_next, end_current)
-        months_gap = diff.years * 12 + diff.months
-
-        if months_gap > threshold_months:
-            gaps.append({
-                "start": sorted_exp[i].end_date,
-                "end": sorted_exp[i + 1].start_date,
-                "duration_months": months_gap,
-                "description": f"Inactivité de {months_gap} mois entre {start_next.strftime('%B %Y')} et {end_current.strftime('%B %Y')}"
-            })
-
-    return gaps
-
-@app.post("/analyze-gaps/")
+    # Dates "YYYY-MM" strictes (ValueError sinon), puis calcul partagé avec /analyze-cv/ :
+    # écart entre la fin du poste le plus ancien et le début du suivant (cf. hireform.cv_compact)
+    for e in experiences:
+        parse_year_month(e.start_date)
+        parse_year_month(e.end_date)
+    positions = [Position(e.company, e.role, e.start_date, e.end_date) for e in experiences]
+    timeline = sorted(positions, key=lambda p: p.start_month)
+    return career_gaps(timeline, threshold_months)
+
+@router.post("/analyze-gaps/")
 def analyze_gaps(
     cv: CV,
     gap_threshold: int = Query(3, description="Seuil de détection en mois", alias="gap_threshold"),
-    api_key: str = Header(..., alias="api-key")
+    api_key: str = Depends(validate_api_key)
 ):
-    if not api_key.startswith("sk-"):
-        raise HTTPException(status_code=401, detail="Clé API invalide")
-
-    gaps = detect_career_gaps(cv.experience, gap_threshold)
+    try:
+        gaps = detect_career_gaps(cv.experience, gap_threshold)
+    except ValueError as e:
+        raise HTTPException(422, str(e))
     result = cv.dict()
     result["career_gaps"] = gaps
     return result
+
+
+# Application autonome (uvicorn analyze-gaps:app) ; la passerelle (gateway.py) monte `router`
+app = FastAPI(title="Hireform Career Gaps Detector", default_response_class=ORJSONResponse)
+app.include_router(router)
+configure_logging_on_startup(app)
+instrument(app)
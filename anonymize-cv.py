@@ -1,9 +1,14 @@
-from fastapi import FastAPI, Header, HTTPException
+from fastapi import APIRouter, FastAPI, Depends
 from pydantic import BaseModel
 from typing import List, Optional, Union
-import re
 
-app = FastAPI(title="Hireform Blind Hiring API")
+from hireform.cv_compact import EMAIL_MASK, PHONE_MASK, SCHOOL_MASK, mask_name
+from hireform.logs import configure_logging_on_startup
+from hireform.metrics import instrument
+from hireform.responses import ORJSONResponse
+from hireform.security import validate_api_key
+
+router = APIRouter(tags=["anonymize-cv"], default_response_class=ORJSONResponse)
 
 # Modèle de CV structuré
 class Education(BaseModel):
@@ -26,35 +31,30 @@ class CV(BaseModel):
     experience: List[Experience]
     skills: Optional[List[str]]
 
-@app.post("/anonymize-cv/")
+@router.post("/anonymize-cv/")
 async def anonymize_cv(
     cv: CV,
-    api_key: str = Header(..., alias="api-key")
+    api_key: str = Depends(validate_api_key)
 ):
-    if not api_key.startswith("sk-"):
-        raise HTTPException(status_code=401, detail="Clé API invalide")
-
     anonymized = cv.dict()
 
     # Masquage nom complet → Initiale prénom + 2 lettres nom (ex: "Sarah Khelifi" → "SKh")
-    if cv.name:
-        parts = cv.name.strip().split()
-        if len(parts) >= 2:
-            prenom = parts[0]
-            nom = parts[-1]
-            anonymized["name"] = prenom[0] + nom[:2]
-        else:
-            anonymized["name"] = "[Nom masqué]"
-    else:
-        anonymized["name"] = "[Nom masqué]"
+    anonymized["name"] = mask_name(cv.name)
 
     # Masquage total des autres infos perso
-    anonymized["email"] = "[Email masqué]"
-    anonymized["phone"] = "[Téléphone masqué]"
+    anonymized["email"] = EMAIL_MASK
+    anonymized["phone"] = PHONE_MASK
     anonymized["photo"] = None
 
     # Masquer les écoles
     for edu in anonymized.get("education", []):
-        edu["school"] = "[École masquée]"
+        edu["school"] = SCHOOL_MASK
 
     return anonymized
+
+
+# Application autonome (uvicorn anonymize-cv:app) ; la passerelle (gateway.py) monte `router`
+app = FastAPI(title="Hireform Blind Hiring API", default_response_class=ORJSONResponse)
+app.include_router(router)
+configure_logging_on_startup(app)
+instrument(app)
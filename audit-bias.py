@@ -1,23 +1,57 @@
-from fastapi import FastAPI, Header, HTTPException
+from fastapi import APIRouter, FastAPI, Depends, HTTPException
 from pydantic import BaseModel
-import openai
-import json
+import logging
 
-app = FastAPI(title="Audit RH – Analyse de biais linguistiques")
+from hireform.llm import complete_json, get_openai_client
+from hireform.logs import configure_logging_on_startup
+from hireform.metrics import instrument
+from hireform.responses import ORJSONResponse
+from hireform.security import validate_api_key
+from hireform.singleflight import llm_flight, request_key, stats_router
+from hireform.validation import InvalidOutput, compile_schema
+
+logger = logging.getLogger(__name__)
+router = APIRouter(tags=["audit-bias"], default_response_class=ORJSONResponse)
+
+MODEL = "gpt-4.1"
+PROMPT_VERSION = "audit-bias-v1"  # à incrémenter à chaque modification du prompt
+
+# Forme de la réponse demandée dans le prompt, compilée une fois
+AUDIT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "impact_estimate": {"type": "number"},
+        "terms_found": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"term": {"type": "string"}, "reason": {"type": "string"},
+                               "location": {"type": "string"}},
+                "required": ["term", "reason"]
+            }
+        },
+        "suggestions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"original": {"type": "string"}, "replacement": {"type": "string"},
+                               "note": {"type": "string"}},
+                "required": ["original", "replacement"]
+            }
+        }
+    },
+    "required": ["impact_estimate", "terms_found", "suggestions"]
+}
+validate_audit = compile_schema(AUDIT_SCHEMA)
 
 class DescriptionPayload(BaseModel):
     text: str
 
-@app.post("/audit-bias/")
+@router.post("/audit-bias/")
 async def audit_bias(
     payload: DescriptionPayload,
-    api_key: str = Header(..., alias="api-key")
+    api_key: str = Depends(validate_api_key)
 ):
-    if not api_key.startswith("sk-"):
-        raise HTTPException(status_code=401, detail="Clé API invalide ou manquante")
-
-    openai.api_key = api_key
-
     # Prompt expert conforme au droit français et aux bonnes pratiques
     system_prompt = (
         "Tu es un assistant expert en rédaction RH non discriminante. Ton rôle est d’auditer des offres d’emploi "
@@ -53,19 +87,29 @@ async def audit_bias(
         f"Texte de l’offre :\n{payload.text}"
     )
 
-    response = openai.chat.completions.create(
-        model="gpt-4.1",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
-    )
+    async def call_llm():
+        # JSON réparé et validé contre AUDIT_SCHEMA, une relance ciblée si invalide
+        try:
+            return await complete_json(
+                get_openai_client(api_key), validate_audit,
+                model=MODEL,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ]
+            )
+        except InvalidOutput as e:
+            logger.warning("Réponse OpenAI invalide après relance : %s", e)
+            raise HTTPException(status_code=502, detail=f"Réponse OpenAI non valide : {e}")
+
+    # Audits identiques simultanés → un seul appel amont
+    key = request_key("audit-bias", MODEL, PROMPT_VERSION, {"text": payload.text}, api_key)
+    return ORJSONResponse(await llm_flight.do(key, call_llm, label="audit-bias"))
 
-    # Extraction du contenu JSON renvoyé par le modèle
-    content = response.choices[0].message.content
-    try:
-        result = json.loads(content)
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=500, detail="Réponse OpenAI non valide : JSON mal formé")
 
-    return result
+# Application autonome (uvicorn audit-bias:app) ; la passerelle (gateway.py) monte `router`
+app = FastAPI(title="Audit RH – Analyse de biais linguistiques", default_response_class=ORJSONResponse)
+app.include_router(router)
+app.include_router(stats_router)
+configure_logging_on_startup(app)
+instrument(app)
@@ -0,0 +1,70 @@
+"""
+Compare deux fichiers de résultats (bench/micro.py ou bench/load.py).
+
+    python bench/compare.py avant.json apres.json
+    python bench/compare.py avant.json apres.json --metrics p50_ms p99_ms throughput_rps
+
+Affiche, pour chaque cas présent dans les deux fichiers, la valeur avant,
+après et l'écart relatif ; --json produit la même chose en JSON.
+"""
+import argparse
+import json
+import sys
+
+DEFAULT_METRICS = {
+    "micro": ["median_ms", "ops_per_s"],
+    "load": ["throughput_rps", "p50_ms", "p95_ms", "p99_ms", "error_rate"],
+    "pdf_text": ["pages_per_s", "peak_rss_mb", "python_peak_mb"],
+}
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(before: dict, after: dict, metrics) -> dict:
+    rows = {}
+    for case in before["results"]:
+        if case not in after["results"]:
+            continue
+        row = {}
+        for metric in metrics:
+            old, new = before["results"][case].get(metric), after["results"][case].get(metric)
+            if not isinstance(old, (int, float)) or not isinstance(new, (int, float)):
+                continue
+            change = (new - old) / old if old else None
+            row[metric] = {"before": old, "after": new,
+                           "change": round(change, 4) if change is not None else None}
+        rows[case] = row
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparaison de deux exécutions de benchmark")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--metrics", nargs="+")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    args = parser.parse_args()
+
+    before, after = load(args.before), load(args.after)
+    if before["kind"] != after["kind"]:
+        sys.exit(f"Résultats de natures différentes : {before['kind']} / {after['kind']}")
+    rows = compare(before, after, args.metrics or DEFAULT_METRICS[before["kind"]])
+
+    if args.json:
+        print(json.dumps({"before": before["meta"], "after": after["meta"], "cases": rows}, indent=2))
+        return
+    print(f"avant : {before['meta'].get('git')} ({before['meta'].get('date')})")
+    print(f"après : {after['meta'].get('git')} ({after['meta'].get('date')})")
+    for case, row in rows.items():
+        cells = []
+        for metric, v in row.items():
+            change = f"{v['change']:+.1%}" if v["change"] is not None else "n/a"
+            cells.append(f"{metric} {v['before']} → {v['after']} ({change})")
+        print(f"{case:<34} " + "  ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
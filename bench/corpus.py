@@ -0,0 +1,267 @@
+"""
+Corpus synthétiques et reproductibles (graine fixe) pour les benchmarks.
+
+- CV JSON au format de `extract_cv_schema` (main.py), nombre d'expériences réglable ;
+- PDF de CV sur deux colonnes (écrits à la main, sans dépendance : police
+  Helvetica, encodage WinAnsi) ;
+- modèles d'entreprise .docx (python-docx) contenant les valeurs du CV, que
+  /generate-template-cv/ remplace par des balises Jinja2, avec N paragraphes
+  de remplissage pour faire varier la taille ;
+- modèle .docx d'offre ({{ title }}, {{ description }}) et template web pour format-offer.
+
+    python -m bench.corpus corpus/ --cvs 20 --experiences 3,10,40 --template-sizes 10,200,2000
+"""
+import argparse
+import io
+import json
+import os
+import random
+import textwrap
+from typing import Dict, List, Optional
+
+FIRST_NAMES = ["Camille", "Léa", "Hugo", "Inès", "Lucas", "Chloé", "Mathis", "Jade", "Nathan", "Zoé"]
+LAST_NAMES = ["Martin", "Bernard", "Dubois", "Khelifi", "Nguyen", "Lefèvre", "Moreau", "Garcia", "Roux", "Faure"]
+ROLES = ["Développeur Python", "Data engineer", "Chef de projet", "Analyste financier", "Technicien support",
+         "Responsable RH", "Ingénieur DevOps", "Consultant SAP", "Product owner", "Comptable"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne SA", "Vandelay"]
+TASKS = ["Conception d'API REST", "Revue de code", "Animation des rituels agiles", "Suivi budgétaire",
+         "Migration vers le cloud", "Recrutement des profils techniques", "Support utilisateurs niveau 2",
+         "Rédaction de spécifications fonctionnelles", "Mise en place de tableaux de bord",
+         "Automatisation des déploiements"]
+TOOLS = ["Python", "SQL", "Docker", "Kubernetes", "Excel", "SAP", "Jira", "Git", "FastAPI", "Power BI"]
+SCHOOLS = ["Université Lyon 1", "INSA Toulouse", "Sorbonne Université", "IUT de Nantes", "ESSEC"]
+DEGREES = ["Master informatique", "Licence de gestion", "BTS SIO", "Diplôme d'ingénieur", "MBA"]
+LANGUAGES = {"Français": "Natif", "Anglais": "C1", "Espagnol": "B2", "Allemand": "A2"}
+
+
+# --- CV JSON
+def make_cv(rng: random.Random, n_experiences: int = 4) -> dict:
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    year, month = 2024, 6
+    experiences = []
+    for _ in range(n_experiences):
+        # Du plus récent au plus ancien, avec parfois une interruption
+        length = rng.randint(4, 40)
+        end = (year, month)
+        start_index = year * 12 + month - 1 - length
+        start = (start_index // 12, start_index % 12 + 1)
+        experiences.append({
+            "role": rng.choice(ROLES),
+            "company": rng.choice(COMPANIES),
+            "start_date": f"{start[0]:04d}-{start[1]:02d}",
+            "end_date": f"{end[0]:04d}-{end[1]:02d}",
+            "responsibilities": rng.sample(TASKS, rng.randint(2, 4)),
+            "environment": rng.sample(TOOLS, rng.randint(2, 5)),
+        })
+        gap = rng.choice([1, 1, 1, 2, 6, 14])
+        previous = start_index - gap
+        year, month = previous // 12, previous % 12 + 1
+    return {
+        "personal_information": {
+            "name": f"{first} {last}",
+            "title": experiences[0]["role"] if experiences else rng.choice(ROLES),
+            "email": f"{first.lower()}.{last.lower()}@example.com",
+            "phone": f"+33 6 {rng.randint(10, 99)} {rng.randint(10, 99)} {rng.randint(10, 99)} {rng.randint(10, 99)}",
+            "location": rng.choice(["Paris", "Lyon", "Nantes", "Lille", "Toulouse"]),
+        },
+        "experience": experiences,
+        "certifications": [{"name": rng.choice(["AWS Cloud Practitioner", "PMP", "Scrum Master", "TOEIC"]),
+                            "issuer": rng.choice(["AWS", "PMI", "Scrum.org", "ETS"])}],
+        "education": [{"degree": rng.choice(DEGREES), "institution": rng.choice(SCHOOLS)}],
+        "skills": {"Langages": rng.sample(TOOLS[:4], 2), "Outils": rng.sample(TOOLS[4:], 3)},
+        "languages": dict(rng.sample(sorted(LANGUAGES.items()), 2)),
+    }
+
+
+# --- PDF écrit à la main
+def _pdf_text(text: str) -> bytes:
+    raw = text.encode("cp1252", errors="replace")
+    out = bytearray()
+    for byte in raw:
+        if byte in b"()\\":
+            out += b"\\" + bytes([byte])
+        elif byte > 126:
+            out += f"\\{byte:03o}".encode("ascii")
+        else:
+            out.append(byte)
+    return bytes(out)
+
+
+def _pdf_line(size: int, x: float, y: float, text: str, matrix=None) -> bytes:
+    if matrix is None:
+        return b"BT /F1 %d Tf %.1f %.1f Td (%s) Tj ET\n" % (size, x, y, _pdf_text(text))
+    return b"BT /F1 %d Tf %g %g %g %g %.1f %.1f Tm (%s) Tj ET\n" % (size, *matrix, x, y, _pdf_text(text))
+
+
+def pdf_bytes(pages: List[List[tuple]], size: int = 10, boxes: Optional[List[bytes]] = None) -> bytes:
+    """
+    PDF dont chaque page est une liste de (x, y, texte), y depuis le bas, ou de
+    (x, y, texte, (a, b, c, d)) pour une matrice de texte. `boxes` : entrées du
+    dictionnaire de chaque page (MediaBox, CropBox, Rotate), A4 par défaut.
+    """
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    page_ids = []
+    for index, lines in enumerate(pages):
+        stream = b"".join(_pdf_line(size, *line) for line in lines)
+        objects.append(b"<< /Length %d >>\nstream\n%sendstream" % (len(stream), stream))
+        content_id = len(objects)
+        box = boxes[index] if boxes else b"/MediaBox [0 0 595 842]"
+        objects.append(b"<< /Type /Page /Parent 2 0 R %s "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (box, content_id))
+        page_ids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % i for i in page_ids), len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def _column_lines(blocks: List[str], width: int) -> List[str]:
+    lines = []
+    for block in blocks:
+        lines.extend(textwrap.wrap(block, width) or [""])
+    return lines
+
+
+def cv_pdf(cv: dict, columns: int = 2) -> bytes:
+    """CV mis en page sur `columns` colonnes (1 ou 2), autant de pages que nécessaire."""
+    info = cv["personal_information"]
+    side = [info["name"], info.get("title", ""), info["email"], info.get("phone", ""), info.get("location", ""), ""]
+    side += ["Compétences"] + [f"{k} : {', '.join(v)}" for k, v in cv.get("skills", {}).items()] + [""]
+    side += ["Langues"] + [f"{k} : {v}" for k, v in cv.get("languages", {}).items()] + [""]
+    side += ["Formation"] + [f"{e['degree']} – {e['institution']}" for e in cv.get("education", [])] + [""]
+    side += ["Certifications"] + [f"{c['name']} ({c.get('issuer', '')})" for c in cv.get("certifications", [])]
+    main = ["Expériences"]
+    for exp in cv.get("experience", []):
+        main += ["", f"{exp['role']} – {exp['company']}", f"{exp['start_date']} – {exp['end_date']}"]
+        main += [f"• {r}" for r in exp.get("responsibilities", [])]
+        main += ["Environnement : " + ", ".join(exp.get("environment", []))]
+
+    if columns == 1:
+        streams = [(50, _column_lines(side + [""] + main, 90))]
+    else:
+        streams = [(40, _column_lines(side, 38)), (300, _column_lines(main, 45))]
+    pages, top, bottom, step = [], 800, 50, 14
+    per_page = (top - bottom) // step
+    n_pages = max(-(-len(lines) // per_page) for _, lines in streams)
+    for p in range(n_pages):
+        page = []
+        for x, lines in streams:
+            for i, line in enumerate(lines[p * per_page:(p + 1) * per_page]):
+                if line:
+                    page.append((x, top - i * step, line))
+        pages.append(page)
+    return pdf_bytes(pages)
+
+
+# --- Modèles .docx
+def company_template(cv: dict, filler_paragraphs: int = 10) -> bytes:
+    """
+    Modèle d'entreprise contenant les valeurs du CV, suivies de
+    `filler_paragraphs` paragraphes. Les valeurs sont dans le premier
+    paragraphe : les boucles de /generate-template-cv/ englobent le texte
+    depuis le début du document (motif `<w:p…>.*?marqueur`).
+    """
+    from docx import Document
+
+    exp0, edu0, cert0 = cv["experience"][0], cv["education"][0], cv["certifications"][0]
+    lang, level = next(iter(cv["languages"].items()))
+    doc = Document()
+    doc.add_paragraph(" | ".join([
+        exp0["start_date"], exp0["end_date"], exp0["role"], exp0["company"],
+        edu0["degree"], edu0["institution"], cert0["name"], cert0["issuer"], f"{lang} : {level}",
+    ]))
+    doc.add_heading("Dossier de compétences", 1)
+    doc.add_paragraph("Document confidentiel – usage interne.")
+    doc.add_heading("Conditions générales", 1)
+    for i in range(filler_paragraphs):
+        doc.add_paragraph(f"Clause {i + 1}. " + " ".join(TASKS) + ".")
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def offer_template() -> bytes:
+    """Modèle ATS pour /format-offer (balises docxtpl)."""
+    from docx import Document
+
+    doc = Document()
+    doc.add_heading("{{ title }}", 0)
+    doc.add_paragraph("{{ description }}")
+    doc.add_paragraph("Publié le {{ datePosted }}")
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+WEB_TEMPLATE = """<!doctype html>
+<html lang="fr"><head><meta charset="utf-8"><title>{{ title }}</title></head>
+<body><article><h1>{{ title }}</h1><p>{{ description }}</p></article></body></html>
+"""
+
+
+def write_corpus(out_dir: str, cvs: int = 20, experiences=(3, 10, 40),
+                 template_sizes=(10, 200, 2000), seed: int = 0) -> Dict[str, list]:
+    """Écrit le corpus dans `out_dir` et renvoie son manifeste (chemins relatifs)."""
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(out_dir, "templates"), exist_ok=True)
+    manifest = {"cvs": [], "pdfs": [], "templates": [], "seed": seed}
+
+    for i in range(cvs):
+        n = experiences[i % len(experiences)]
+        cv = make_cv(rng, n)
+        name = f"cv_{i:03d}_{n}exp"
+        with open(os.path.join(out_dir, name + ".json"), "w", encoding="utf-8") as f:
+            json.dump(cv, f, ensure_ascii=False, indent=2)
+        with open(os.path.join(out_dir, name + ".pdf"), "wb") as f:
+            f.write(cv_pdf(cv))
+        manifest["cvs"].append(name + ".json")
+        manifest["pdfs"].append(name + ".pdf")
+
+    reference = make_cv(random.Random(seed), experiences[0])
+    for size in template_sizes:
+        name = f"template_{size}.docx"
+        with open(os.path.join(out_dir, name), "wb") as f:
+            f.write(company_template(reference, size))
+        manifest["templates"].append(name)
+    with open(os.path.join(out_dir, "template_reference_cv.json"), "w", encoding="utf-8") as f:
+        json.dump(reference, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(out_dir, "offer_template.docx"), "wb") as f:
+        f.write(offer_template())
+    with open(os.path.join(out_dir, "templates", "web_template.html"), "w", encoding="utf-8") as f:
+        f.write(WEB_TEMPLATE)
+
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génération du corpus de benchmark")
+    parser.add_argument("out_dir")
+    parser.add_argument("--cvs", type=int, default=20)
+    parser.add_argument("--experiences", type=_int_list, default=[3, 10, 40],
+                        help="Nombres d'expériences par CV (cycliques)")
+    parser.add_argument("--template-sizes", type=_int_list, default=[10, 200, 2000],
+                        help="Paragraphes de remplissage des modèles .docx")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    manifest = write_corpus(args.out_dir, args.cvs, args.experiences, args.template_sizes, args.seed)
+    print(f"{len(manifest['cvs'])} CV, {len(manifest['templates'])} modèles dans {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
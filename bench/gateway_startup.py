@@ -0,0 +1,118 @@
+"""
+Démarrage : onze services séparés contre la passerelle unique (gateway.py).
+
+Chaque mesure est un processus neuf `python -X importtime` qui importe le ou
+les modules de service : durée d'import (somme des temps « self » rapportés
+par -X importtime), temps mur, RSS et PSS après import, et les paquets de
+premier niveau les plus coûteux.
+
+- separate : un processus par service (déploiement actuel), totaux sommés ;
+- gateway  : un seul processus qui importe gateway.py.
+
+Avec --baseline-rev, les mêmes mesures sont faites sur une révision
+antérieure (copie de travail git temporaire) pour la comparaison avant/après :
+
+    python bench/gateway_startup.py --baseline-rev HEAD~1 > startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from gateway import SERVICES  # noqa: E402  (liste des modules, sans import des services)
+
+CHILD = r"""
+import importlib, json, sys, time
+sys.path.insert(0, ".")
+t0 = time.perf_counter()
+error = None
+for name in sys.argv[1:]:
+    try:
+        importlib.import_module(name)
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+elapsed = time.perf_counter() - t0
+memory = {}
+with open("/proc/self/smaps_rollup") as f:
+    for line in f:
+        key, _, value = line.partition(":")
+        if key in ("Rss", "Pss"):
+            memory[key.lower() + "_mb"] = round(int(value.split()[0]) / 1024, 1)
+print(json.dumps({"wall_s": round(elapsed, 4), "error": error, **memory}))
+"""
+
+
+def parse_importtime(stderr: str, top: int) -> dict:
+    """Total des temps « self » et paquets de premier niveau les plus lents (cumulé)."""
+    total_us, roots = 0, []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        total_us += int(self_us)
+        if not name.startswith("  "):  # indentation = import imbriqué
+            roots.append((int(cumulative_us), name.strip()))
+    roots.sort(reverse=True)
+    return {
+        "import_ms": round(total_us / 1000, 1),
+        "slowest": [{"module": name, "cumulative_ms": round(us / 1000, 1)} for us, name in roots[:top]],
+    }
+
+
+def measure(root: str, modules: list, top: int) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD, *modules],
+        cwd=root, capture_output=True, text=True,
+    )
+    lines = proc.stdout.strip().splitlines()
+    result = json.loads(lines[-1]) if lines else {"error": proc.stderr.strip().splitlines()[-1:]}
+    result.update(parse_importtime(proc.stderr, top))
+    return result
+
+
+def measure_tree(root: str, top: int) -> dict:
+    interpreter = measure(root, [], 0)
+    separate = {name: measure(root, [name], top) for name in SERVICES}
+    report = {
+        "interpreter": interpreter,
+        "separate": {
+            "services": separate,
+            "total_import_ms": round(sum(r["import_ms"] for r in separate.values()), 1),
+            "total_rss_mb": round(sum(r.get("rss_mb", 0) for r in separate.values()), 1),
+            "errors": {n: r["error"] for n, r in separate.items() if r.get("error")},
+        },
+    }
+    if os.path.exists(os.path.join(root, "gateway.py")):
+        report["gateway"] = measure(root, ["gateway"], top)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de démarrage : services séparés / passerelle")
+    parser.add_argument("--baseline-rev", help="Révision git « avant » (ex. HEAD~1)")
+    parser.add_argument("--top", type=int, default=8, help="Paquets les plus lents à afficher")
+    args = parser.parse_args()
+
+    results = {"after": measure_tree(ROOT, args.top)}
+    if args.baseline_rev:
+        with tempfile.TemporaryDirectory() as tmp:
+            worktree = os.path.join(tmp, "baseline")
+            subprocess.run(["git", "-C", ROOT, "worktree", "add", "--detach", worktree, args.baseline_rev],
+                           check=True, capture_output=True)
+            try:
+                results["before"] = measure_tree(worktree, args.top)
+            finally:
+                subprocess.run(["git", "-C", ROOT, "worktree", "remove", "--force", worktree],
+                               check=True, capture_output=True)
+        results["before"]["rev"] = args.baseline_rev
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Scénarios de charge concurrente par endpoint, contre la passerelle et les remplaçants locaux.
+
+Démarre le remplaçant OpenAI, le remplaçant DeepL et `gateway:app` (uvicorn,
+un worker) avec le faux `libreoffice` dans le PATH, puis envoie pour chaque
+scénario `--requests` requêtes à `--concurrency` clients simultanés. Rapporte
+débit, percentiles de latence (p50/p95/p99) et codes de réponse.
+
+    python bench/load.py --output load.json
+    python bench/load.py --scenarios translate-cv generate-offer --concurrency 1 8 32 \\
+        --openai-latency-ms 800 --openai-jitter-ms 200 --error-rate 0.02
+
+Les charges utiles varient d'une requête à l'autre sur toute l'exécution
+(corpus à graine fixe, numéro de requête unique) pour ne pas mesurer le cache
+singleflight.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench.corpus import WEB_TEMPLATE, company_template, cv_pdf, make_cv, offer_template  # noqa: E402
+from bench.results import latency_summary, metadata, write_results  # noqa: E402
+from bench.standins import BIN_DIR, free_port, serve  # noqa: E402
+
+API_KEY = "sk-bench"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+class Corpus:
+    """Charges utiles préparées une fois, indexées par numéro de requête."""
+
+    def __init__(self, size: int = 32, seed: int = 0):
+        rng = random.Random(seed)
+        self.cvs = [make_cv(rng, rng.choice([3, 5, 10])) for _ in range(size)]
+        self.pdfs = [cv_pdf(cv) for cv in self.cvs]
+        # Modèles construits sur le CV renvoyé par le remplaçant OpenAI : la
+        # réécriture Jinja2 de /generate-template-cv/ y retrouve ses valeurs
+        from bench.standins.openai_api import SAMPLE_CV
+
+        self.templates = [company_template(SAMPLE_CV, n) for n in (10, 200)]
+        self.offer_template = offer_template()
+
+    def cv(self, i):
+        return self.cvs[i % len(self.cvs)]
+
+    def job(self, i):
+        cv = self.cv(i)
+        return {"title": f"{cv['personal_information']['title']} #{i}", "location": cv["personal_information"]["location"],
+                "company_name": cv["experience"][0]["company"], "salary": 40000 + 500 * (i % 40)}
+
+
+def _extract_cv(c, i):
+    return {"files": {"file": ("cv.pdf", c.pdfs[i % len(c.pdfs)], "application/pdf")}}
+
+
+def _transform_cv(c, i):
+    return {"files": {"cv_file": ("cv.pdf", c.pdfs[i % len(c.pdfs)], "application/pdf"),
+                      "model_file": ("model.docx", c.templates[i % len(c.templates)], DOCX)},
+            "params": {"as_pdf": "true"}}
+
+
+def _anonymize(c, i):
+    cv = c.cv(i)
+    return {"json": {
+        "name": cv["personal_information"]["name"], "email": cv["personal_information"]["email"],
+        "phone": cv["personal_information"]["phone"], "photo": None,
+        "education": [{"school": e["institution"], "degree": e["degree"]} for e in cv["education"]],
+        "experience": [{"company": e["company"], "role": e["role"], "start_date": e["start_date"],
+                        "end_date": e["end_date"], "description": "; ".join(e["responsibilities"])}
+                       for e in cv["experience"]],
+        "skills": [s for values in cv["skills"].values() for s in values],
+    }}
+
+
+def _format_offer(c, i):
+    job = c.job(i)
+    hr_json = {"title": job["title"], "description": f"Poste basé à {job['location']}.", "datePosted": "2025-01-01"}
+    return {"data": {"hr_json": json.dumps(hr_json, ensure_ascii=False)},
+            "files": {"template_file": ("offer.docx", c.offer_template, DOCX)},
+            "params": [("formats", "linkedin"), ("formats", "web"), ("formats", "ats"), ("as_pdf", "true")],
+            "headers": {"api-key": "bench-internal"}}
+
+
+# nom → (méthode, chemin, constructeur de la requête i)
+SCENARIOS = {
+    "extract-cv": ("POST", "/extract-cv/", _extract_cv),
+    "transform-cv": ("POST", "/transform-cv/", _transform_cv),
+    "analyze-gaps": ("POST", "/analyze-gaps/",
+                     lambda c, i: {"json": {"experience": c.cv(i)["experience"]}, "params": {"gap_threshold": 3}}),
+    "anonymize-cv": ("POST", "/anonymize-cv/", _anonymize),
+    # Sans rétention : le modèle n'a pas de remplaçant local
+    "analyze-cv": ("POST", "/analyze-cv/",
+                   lambda c, i: {"json": c.cv(i), "params": {"analyses": "gaps,anonymize", "gap_threshold": 3}}),
+    "translate-cv": ("POST", "/translate-cv/", lambda c, i: {"json": c.cv(i), "params": {"target_lang": "EN,DE"}}),
+    "generate-offer": ("POST", "/generate-offer",
+                       lambda c, i: {"json": c.job(i), "headers": {"X-OpenAI-Key": API_KEY}}),
+    "audit-bias": ("POST", "/audit-bias/",
+                   lambda c, i: {"json": {"text": f"Nous recherchons un développeur dynamique, jeune équipe ({i})."}}),
+    "predict-offer-perf-fast": ("POST", "/predict-offer-perf/",
+                                lambda c, i: {"json": c.job(i), "params": {"mode": "fast"}}),
+    "predict-offer-perf-full": ("POST", "/predict-offer-perf/",
+                                lambda c, i: {"json": c.job(i), "params": {"mode": "full"}}),
+    "format-offer": ("POST", "/format-offer", _format_offer),
+}
+
+
+async def run_scenario(client, name: str, corpus: Corpus, requests: int, concurrency: int, warmup: int,
+                       numbers) -> dict:
+    method, path, build = SCENARIOS[name]
+
+    async def one(i):
+        kwargs = build(corpus, i)
+        headers = {"api-key": API_KEY, **kwargs.pop("headers", {})}
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, headers=headers, **kwargs)
+            await response.aread()
+            status = response.status_code
+        except Exception as e:
+            status = type(e).__name__
+        return status, time.perf_counter() - start
+
+    for _ in range(warmup):
+        await one(next(numbers))
+
+    queue = itertools.islice(numbers, requests)
+    samples = []
+
+    async def client_loop():
+        for i in queue:  # itérateur partagé : chaque requête est prise une seule fois
+            samples.append(await one(i))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    statuses = Counter(str(status) for status, _ in samples)
+    ok = [latency for status, latency in samples if status == 200]
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(1 - len(ok) / len(samples), 4) if samples else 0.0,
+        **latency_summary(ok),
+        "statuses": dict(statuses),
+    }
+
+
+async def run_all(base_url: str, scenarios, concurrencies, requests: int, warmup: int, corpus: Corpus) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=max(concurrencies), max_keepalive_connections=max(concurrencies))
+    results = {}
+    numbers = itertools.count()
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as client:
+        for name in scenarios:
+            for concurrency in concurrencies:
+                result = await run_scenario(client, name, corpus, requests, concurrency, warmup, numbers)
+                results[f"{name}/c{concurrency}"] = result
+                print(f"{name:<26} c={concurrency:<3} {result['throughput_rps']:>8} req/s  "
+                      f"p50={result.get('p50_ms', '-')} p99={result.get('p99_ms', '-')} ms  {result['statuses']}",
+                      file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scénarios de charge Hireform (remplaçants locaux)")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Requêtes par scénario et niveau de concurrence")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--openai-latency-ms", type=float, default=300)
+    parser.add_argument("--openai-jitter-ms", type=float, default=50)
+    parser.add_argument("--deepl-latency-ms", type=float, default=80)
+    parser.add_argument("--deepl-jitter-ms", type=float, default=20)
+    parser.add_argument("--libreoffice-latency-ms", type=float, default=600)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Part d'erreurs de chaque remplaçant")
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="Part de réponses JSON défectueuses du remplaçant OpenAI (réparation, relance)")
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    settings = {k: v for k, v in vars(args).items() if k not in ("output", "scenarios")}
+    standin_env = {
+        "OPENAI_STANDIN_LATENCY_MS": str(args.openai_latency_ms),
+        "OPENAI_STANDIN_JITTER_MS": str(args.openai_jitter_ms),
+        "OPENAI_STANDIN_ERROR_RATE": str(args.error_rate),
+        "OPENAI_STANDIN_MALFORMED_RATE": str(args.malformed_rate),
+        "OPENAI_STANDIN_RPM": "1000000",
+        "DEEPL_STANDIN_LATENCY_MS": str(args.deepl_latency_ms),
+        "DEEPL_STANDIN_JITTER_MS": str(args.deepl_jitter_ms),
+        "DEEPL_STANDIN_ERROR_RATE": str(args.error_rate),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        templates_dir = os.path.join(tmp, "templates")
+        os.makedirs(templates_dir)
+        with open(os.path.join(templates_dir, "web_template.html"), "w", encoding="utf-8") as f:
+            f.write(WEB_TEMPLATE)
+        log_path = os.path.join(tmp, "servers.log")
+        gateway_port = free_port()
+
+        with serve("bench.standins.openai_api:app", standin_env, log_path=log_path) as openai_url, \
+                serve("bench.standins.deepl:app", standin_env, log_path=log_path) as deepl_url:
+            gateway_env = {
+                "OPENAI_BASE_URL": f"{openai_url}/v1",
+                "OPENAI_API_KEY": API_KEY,
+                "DEEPL_API_URL": f"{deepl_url}/v2/translate",
+                "DEEPL_API_KEY": "bench",
+                "TRANSLATION_MEMORY_PATH": "",
+                "HIREFORM_BASE_URL": f"http://127.0.0.1:{gateway_port}",
+                "TEMPLATES_DIR": templates_dir,
+                "API_KEY": "bench-internal",
+                # Un seul client simulé : quota par clé levé, seuls les pools globaux limitent
+                "ADMISSION_KEY_CONCURRENCY": str(max(args.concurrency)),
+                "ADMISSION_KEY_QUEUE": str(max(args.concurrency)),
+                "ADMISSION_KEY_RPM": "0",
+                "PATH": BIN_DIR + os.pathsep + os.environ.get("PATH", ""),
+                "LIBREOFFICE_STANDIN_LATENCY_MS": str(args.libreoffice_latency_ms),
+                "LIBREOFFICE_STANDIN_ERROR_RATE": str(args.error_rate),
+            }
+            with serve("gateway:app", gateway_env, port=gateway_port, log_path=log_path) as gateway_url:
+                corpus = Corpus()
+                results = asyncio.run(run_all(gateway_url, args.scenarios, args.concurrency,
+                                              args.requests, args.warmup, corpus))
+        print(f"Journaux des serveurs : {log_path} (supprimés en fin d'exécution)", file=sys.stderr)
+
+    write_results(args.output, "load", metadata(**settings), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Coût de la journalisation sur le chemin chaud de /extract-cv/.
+
+Rejoue, pour un CV complet, les appels de log d'une requête dans plusieurs
+configurations, chacune dans un processus neuf (la configuration du logging est
+globale) :
+
+- legacy         : basicConfig(DEBUG) et f-strings d'avant hireform.logs
+                   (clé API, extrait brut, function_call.arguments complet) ;
+- pipeline-info  : hireform.logs au niveau INFO (défaut) ;
+- pipeline-debug : hireform.logs au niveau DEBUG, tout est émis ;
+- pipeline-debug-sampled : DEBUG, main.payload échantillonné à 1 %.
+
+Mesure le temps par requête côté thread appelant, le temps de vidage de la file
+par le listener et le temps CPU total du processus par requête (appelant et
+listener réunis : sur une machine à un cœur, le listener prend le GIL pendant la
+mesure côté appelant). Sortie vers /dev/null.
+
+    python bench/logging_cost.py --output logging.json
+    python bench/micro.py --only logging
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+VARIANTS = ["legacy", "pipeline-info", "pipeline-debug", "pipeline-debug-sampled"]
+API_KEY = "sk-bench-0123456789abcdef"
+
+
+def _payload():
+    from bench.standins.openai_api import SAMPLE_CV
+
+    arguments = json.dumps(SAMPLE_CV, ensure_ascii=False)
+    raw_text = (arguments.replace('"', " ") + "\n") * 3
+    return raw_text, arguments, SAMPLE_CV
+
+
+def _legacy_request(logger, raw_text, arguments, data):
+    logger.debug("=== /extract-cv/ called ===")
+    logger.debug(f"Received api-key: {API_KEY[:5]}... (length={len(API_KEY)})")
+    logger.debug(f"PDF temporaire enregistré sous {'/tmp/tmpabcd.pdf'} ({48213} bytes)")
+    logger.debug(f"Raw text extrait (premiers 200 chars): {raw_text[:200]!r}")
+    logger.info("Appel openai.chat.completions.create() …")
+    logger.info("Réponse reçue de l'API OpenAI")
+    logger.debug(f"function_call.arguments (type={type(arguments)}): {arguments!r}")
+    logger.debug("Extraction JSON réussie, renvoi du résultat")
+    logger.debug(f"PDF temporaire supprimé : {'/tmp/tmpabcd.pdf'}")
+
+
+def _pipeline_request(logger, payload_logger, raw_text, arguments, data):
+    # Mêmes appels que main.extract_cv
+    logger.debug("=== /extract-cv/ called ===")
+    logger.debug("PDF temporaire enregistré sous %s (%d bytes)", "/tmp/tmpabcd.pdf", 48213)
+    payload_logger.debug("Raw text extrait (%d chars)", len(raw_text), extra={"excerpt": raw_text[:200]})
+    logger.info("Appel openai.chat.completions.create() …")
+    logger.info("Réponse reçue de l'API OpenAI")
+    payload_logger.debug("Extraction JSON réussie, renvoi du résultat", extra={"cv": data})
+    logger.debug("PDF temporaire supprimé : %s", "/tmp/tmpabcd.pdf")
+
+
+def run_variant(variant: str, repeat: int, number: int) -> dict:
+    """Exécuté dans le processus enfant."""
+    from bench.micro import measure
+
+    raw_text, arguments, data = _payload()
+    sink = open(os.devnull, "w", encoding="utf-8")
+    logger, payload_logger = logging.getLogger("main"), logging.getLogger("main.payload")
+
+    if variant == "legacy":
+        logging.basicConfig(level=logging.DEBUG, stream=sink)
+        request, stop = (lambda: _legacy_request(logger, raw_text, arguments, data)), (lambda: None)
+    else:
+        from hireform import logs
+
+        logs.configure_logging(level="INFO" if variant == "pipeline-info" else "DEBUG",
+                               sample="main.payload=0.01" if variant.endswith("sampled") else "", stream=sink)
+        request, stop = (lambda: _pipeline_request(logger, payload_logger, raw_text, arguments, data)), \
+            logs.stop_logging  # le listener écrit ce qui reste en file
+
+    cpu = time.process_time()
+    result = measure(request, repeat, number)
+    start = time.perf_counter()
+    stop()
+    result["drain_ms"] = round(1000 * (time.perf_counter() - start), 3)
+    result["cpu_ms_per_request"] = round(1000 * (time.process_time() - cpu) / (result["calls"] + 1), 4)
+    return result
+
+
+def run_all(repeat: int, number: int = 200) -> dict:
+    results = {}
+    for variant in VARIANTS:
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--variant", variant,
+                              "--repeat", str(repeat), "--number", str(number)],
+                             cwd=ROOT, check=True, capture_output=True, text=True).stdout
+        results[f"logging/{variant}"] = json.loads(out)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coût de la journalisation par requête")
+    parser.add_argument("--variant", choices=VARIANTS, help="(interne) mesure une seule configuration")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--number", type=int, default=200, help="Requêtes simulées par série")
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args.repeat, args.number)))
+        return
+
+    from bench.results import metadata, write_results
+
+    results = run_all(args.repeat, args.number)
+    for case, r in results.items():
+        print(f"{case:<32} appelant {1000 * r['median_ms']:>7.1f} µs/requête  "
+              f"CPU total {1000 * r['cpu_ms_per_request']:>7.1f} µs/requête  vidage {r['drain_ms']} ms", file=sys.stderr)
+    write_results(args.output, "micro", metadata(repeat=args.repeat, number=args.number), results)
+
+
+if __name__ == "__main__":
+    main()
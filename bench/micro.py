@@ -0,0 +1,212 @@
+"""
+Microbenchmarks des fonctions de traitement, sur le corpus synthétique.
+
+- extract_text_columns : PDF deux colonnes de 3, 10 et 40 expériences, par backend (cf. bench/pdf_text.py) ;
+- rewrite_template     : réécriture Jinja2 de /generate-template-cv/ (10 à 2000 paragraphes) ;
+- detect_career_gaps   : 3 à 200 expériences ;
+- translate_json       : CV complet contre le remplaçant DeepL (mémoire de traduction désactivée) ;
+- logging              : journalisation d'une requête /extract-cv/ (cf. bench/logging_cost.py) ;
+- validate_llm_output  : décodage et validation d'un CV extrait (3 à 40 expériences), propre ou à réparer ;
+- serialize_response   : jsonable_encoder + JSONResponse contre ORJSONResponse direct ;
+- analyze_cv           : trous, features de rétention et anonymisation d'un même CV,
+                         trois endpoints (trois décodages, deux modèles pydantic) contre /analyze-cv/.
+
+    python bench/micro.py --output micro.json
+    python bench/micro.py --only rewrite_template --repeat 20
+
+Chaque mesure : `repeat` séries de `number` appels, temps par appel (min,
+médiane, moyenne) et débit.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench.corpus import cv_pdf, company_template, make_cv  # noqa: E402
+from bench.results import metadata, write_results  # noqa: E402
+from bench.standins import serve  # noqa: E402
+
+BENCHMARKS = ["extract_text_columns", "rewrite_template", "detect_career_gaps", "translate_json", "logging",
+              "validate_llm_output", "serialize_response", "analyze_cv"]
+
+
+def measure(fn, repeat: int, number: int) -> dict:
+    fn()  # chauffe (imports paresseux, caches)
+    per_call = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_call.append((time.perf_counter() - start) / number)
+    return {
+        "calls": repeat * number,
+        "min_ms": round(1000 * min(per_call), 4),
+        "median_ms": round(1000 * statistics.median(per_call), 4),
+        "mean_ms": round(1000 * statistics.fmean(per_call), 4),
+        "ops_per_s": round(1 / statistics.median(per_call), 1),
+    }
+
+
+def bench_extract_text_columns(tmp: str, repeat: int) -> dict:
+    main = importlib.import_module("main")
+    results = {}
+    for n in (3, 10, 40):
+        path = os.path.join(tmp, f"cv_{n}.pdf")
+        with open(path, "wb") as f:
+            f.write(cv_pdf(make_cv(random.Random(n), n)))
+        for backend in ("pdfplumber", "pdfium"):
+            results[f"extract_text_columns/{n}exp-{backend}"] = measure(
+                lambda: main.extract_text_columns(path, backend), repeat, 1)
+    return results
+
+
+def bench_rewrite_template(tmp: str, repeat: int) -> dict:
+    service = importlib.import_module("transform-cv")
+    cv = make_cv(random.Random(0), 3)
+    results = {}
+    for size in (10, 200, 2000):
+        template = company_template(cv, size)
+        results[f"rewrite_template/{size}par"] = measure(
+            lambda: service.rewrite_template(template, cv), repeat, 1 if size > 200 else 5)
+    return results
+
+
+def bench_detect_career_gaps(tmp: str, repeat: int) -> dict:
+    service = importlib.import_module("analyze-gaps")
+    results = {}
+    for n in (3, 10, 40, 200):
+        cv = service.CV(**{"experience": make_cv(random.Random(n), n)["experience"]})
+        results[f"detect_career_gaps/{n}exp"] = measure(
+            lambda: service.detect_career_gaps(cv.experience, 3), repeat, 200 if n <= 40 else 20)
+    return results
+
+
+def bench_translate_json(tmp: str, repeat: int) -> dict:
+    results = {}
+    with serve("bench.standins.deepl:app") as deepl_url:
+        os.environ.update(DEEPL_API_URL=f"{deepl_url}/v2/translate", DEEPL_API_KEY="bench",
+                          TRANSLATION_MEMORY_PATH="")
+        service = importlib.import_module("translate-cv")
+        loop = asyncio.new_event_loop()
+        try:
+            for n in (3, 10, 40):
+                cv = make_cv(random.Random(n), n)
+                results[f"translate_json/{n}exp"] = measure(
+                    lambda: loop.run_until_complete(service.translate_json(cv, "EN")), repeat, 5)
+            loop.run_until_complete(service.shutdown())
+            from hireform.http import close_http_client
+            loop.run_until_complete(close_http_client())
+        finally:
+            loop.close()
+    return results
+
+
+def bench_logging(tmp: str, repeat: int) -> dict:
+    from bench.logging_cost import run_all
+
+    return run_all(repeat)  # un processus par configuration de logging
+
+
+def bench_validate_llm_output(tmp: str, repeat: int) -> dict:
+    from hireform.validation import parse_llm_json
+
+    main = importlib.import_module("main")
+    results = {}
+    for n in (3, 10, 40):
+        cv = make_cv(random.Random(n), n)
+        clean = json.dumps(cv, ensure_ascii=False)
+        # Défauts réparables : bloc ```json, virgule finale, tableau null
+        damaged = "```json\n" + json.dumps({**cv, "certifications": None}, ensure_ascii=False)[:-1] + ",}\n```"
+        results[f"validate_llm_output/{n}exp"] = measure(
+            lambda: main.validate_cv(parse_llm_json(clean)), repeat, 200)
+        results[f"validate_llm_output/{n}exp-repair"] = measure(
+            lambda: main.validate_cv(parse_llm_json(damaged)), repeat, 200)
+    return results
+
+
+def bench_serialize_response(tmp: str, repeat: int) -> dict:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from hireform.responses import ORJSONResponse
+
+    results = {}
+    for n in (3, 40):
+        cv = make_cv(random.Random(n), n)
+        results[f"serialize_response/{n}exp-json"] = measure(
+            lambda: JSONResponse(jsonable_encoder(cv)).body, repeat, 200)
+        results[f"serialize_response/{n}exp-orjson"] = measure(lambda: ORJSONResponse(cv).body, repeat, 200)
+    return results
+
+
+def bench_analyze_cv(tmp: str, repeat: int) -> dict:
+    from bench.corpus import ROLES, TOOLS
+    from hireform import cv_compact
+    from hireform.cv_features import retention_features
+
+    gaps = importlib.import_module("analyze-gaps")
+    anonymize = importlib.import_module("anonymize-cv")
+    esco_labels = frozenset(label.lower() for label in ROLES + TOOLS)
+
+    def separate(body: bytes, flat: bytes):
+        cv = gaps.CV(**json.loads(body))
+        gaps.detect_career_gaps(cv.experience, 3)
+        retention_features(json.loads(body), esco_labels)
+        coroutine = anonymize.anonymize_cv(anonymize.CV(**json.loads(flat)), "bench")
+        try:
+            coroutine.send(None)
+        except StopIteration as done:
+            return done.value
+
+    def fused(body: bytes):
+        cv = cv_compact.compact_cv(json.loads(body))
+        cv_compact.career_gaps(cv.timeline, 3)
+        cv_compact.retention_features(cv, esco_labels)
+        return cv_compact.anonymize(cv)
+
+    results = {}
+    for n in (3, 10, 40):
+        cv = make_cv(random.Random(n), n)
+        body = json.dumps(cv, ensure_ascii=False).encode()
+        # /anonymize-cv/ n'accepte que la forme plate (cf. bench/load.py)
+        flat = json.dumps({
+            "name": cv["personal_information"]["name"], "email": cv["personal_information"]["email"],
+            "phone": cv["personal_information"]["phone"], "photo": None,
+            "education": [{"school": e["institution"], "degree": e["degree"]} for e in cv["education"]],
+            "experience": [{"company": e["company"], "role": e["role"], "start_date": e["start_date"],
+                            "end_date": e["end_date"], "description": "; ".join(e["responsibilities"])}
+                           for e in cv["experience"]],
+            "skills": [s for values in cv["skills"].values() for s in values],
+        }, ensure_ascii=False).encode()
+        results[f"analyze_cv/{n}exp-separate"] = measure(lambda: separate(body, flat), repeat, 200)
+        results[f"analyze_cv/{n}exp-fused"] = measure(lambda: fused(body), repeat, 200)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks Hireform")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument("--repeat", type=int, default=10, help="Séries de mesures par cas")
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    os.environ.setdefault("HIREFORM_METRICS", "0")  # mesure des fonctions, pas de l'instrumentation
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.only:
+            results.update(globals()[f"bench_{name}"](tmp, args.repeat))
+            print(f"{name} : ok", file=sys.stderr)
+    write_results(args.output, "micro", metadata(repeat=args.repeat), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Backends d'extraction des mots PDF (hireform.pdf_text) : parité et débit.
+
+Corpus synthétique : CV d'une et deux colonnes de 3 à 200 expériences
+(1 à ~30 pages), générés par bench/corpus.py.
+
+- Parité : pour chaque document, mêmes mots dans le même ordre avec les deux
+  backends, coordonnées à `--tolerance` pt près, et même texte en sortie de
+  `main.extract_text_columns`. Code de sortie 1 en cas d'écart.
+- Débit : chaque backend dans un processus neuf (mémoire non partagée) ; pages
+  par seconde sur `--repeat` passes du corpus, pic de mémoire résidente
+  (ru_maxrss) et pic des allocations Python (tracemalloc, mesuré à part sur le
+  plus gros document : c'est là que pdfplumber crée ses objets caractère).
+
+    python bench/pdf_text.py --output pdf_text.json
+    python bench/pdf_text.py --parity-only
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench.corpus import cv_pdf, make_cv  # noqa: E402
+
+DOCUMENTS = [(3, 2), (10, 2), (40, 2), (40, 1), (200, 2), (200, 1)]  # (expériences, colonnes)
+COORDINATES = ("x0", "x1", "top", "bottom", "doctop")
+
+
+def write_corpus(directory: str) -> list:
+    paths = []
+    for n, columns in DOCUMENTS:
+        path = os.path.join(directory, f"cv_{n}exp_{columns}col.pdf")
+        with open(path, "wb") as f:
+            f.write(cv_pdf(make_cv(random.Random(n), n), columns))
+        paths.append(path)
+    return paths
+
+
+def parity(paths: list, tolerance: float) -> dict:
+    import importlib
+
+    from hireform.pdf_text import page_words
+
+    main = importlib.import_module("main")
+    report = {}
+    for path in paths:
+        reference, candidate = page_words(path, "pdfplumber"), page_words(path, "pdfium")
+        texts = lambda pages: [[w["text"] for w in words] for words in pages]
+        delta = max((abs(a[k] - b[k]) for ref, cand in zip(reference, candidate)
+                     for a, b in zip(ref, cand) for k in COORDINATES), default=0.0)
+        row = {
+            "pages": len(reference),
+            "words": sum(map(len, reference)),
+            "same_words": int(texts(reference) == texts(candidate)),
+            "same_text": int(main.extract_text_columns(path, "pdfplumber")
+                             == main.extract_text_columns(path, "pdfium")),
+            "max_delta_pt": round(delta, 3),
+        }
+        row["ok"] = int(row["same_words"] and row["same_text"] and delta <= tolerance)
+        report[os.path.basename(path)] = row
+    return report
+
+
+def run_backend(backend: str, paths: list, repeat: int) -> dict:
+    """Exécuté dans le processus enfant."""
+    from hireform.pdf_text import page_words
+
+    page_words(paths[0], backend)  # chauffe : imports paresseux
+    pages, words = 0, 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for path in paths:
+            result = page_words(path, backend)
+            pages += len(result)
+            words += sum(map(len, result))
+    elapsed = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    largest = max(paths, key=os.path.getsize)
+    tracemalloc.start()
+    page_words(largest, backend)
+    peak_python = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "pages": pages,
+        "pages_per_s": round(pages / elapsed, 1),
+        "ms_per_page": round(1000 * elapsed / pages, 3),
+        "words_per_s": round(words / elapsed, 1),
+        "peak_rss_mb": round(peak_rss / 1024, 1),
+        "python_peak_mb": round(peak_python / 2 ** 20, 2),
+    }
+
+
+def throughput(paths: list, repeat: int, backends: list) -> dict:
+    results = {}
+    for backend in backends:
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--backend", backend,
+                              "--repeat", str(repeat), *paths],
+                             cwd=ROOT, check=True, capture_output=True, text=True).stdout
+        results[f"pdf_text/{backend}"] = json.loads(out)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parité et débit des backends d'extraction PDF")
+    parser.add_argument("--backends", nargs="+", default=["pdfplumber", "pdfium"])
+    parser.add_argument("--repeat", type=int, default=3, help="Passes du corpus par backend")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Écart maximal des coordonnées (pt)")
+    parser.add_argument("--parity-only", action="store_true")
+    parser.add_argument("--backend", help="(interne) mesure un seul backend sur les fichiers donnés")
+    parser.add_argument("paths", nargs="*", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    if args.backend:
+        print(json.dumps(run_backend(args.backend, args.paths, args.repeat)))
+        return
+
+    from bench.results import metadata, write_results
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_corpus(tmp)
+        report = parity(paths, args.tolerance)
+        results = {f"parity/{name}": row for name, row in report.items()}
+        if not args.parity_only:
+            results.update(throughput(paths, args.repeat, args.backends))
+    write_results(args.output, "pdf_text", metadata(repeat=args.repeat, tolerance=args.tolerance), results)
+
+    failed = [name for name, row in report.items() if not row["ok"]]
+    if failed:
+        sys.exit(f"Parité non respectée : {', '.join(failed)}")
+    print("Parité : ok", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
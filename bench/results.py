@@ -0,0 +1,72 @@
+"""
+Format commun des résultats de benchmark (JSON comparable d'une exécution à l'autre).
+
+    {"kind": "micro" | "load", "meta": {...}, "results": {nom: {mesures}}}
+
+Les mesures sont plates (nombres) pour que bench/compare.py puisse confronter
+deux fichiers clé par clé.
+"""
+import datetime
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def git_revision() -> Optional[str]:
+    try:
+        rev = subprocess.run(["git", "-C", ROOT, "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "-C", ROOT, "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True).stdout.strip()
+        return rev + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(**settings) -> dict:
+    return {
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "argv": sys.argv[1:],
+        "settings": settings,
+    }
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Percentile au rang le plus proche (`q` entre 0 et 100) d'une liste triée."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_summary(latencies_s: List[float]) -> Dict[str, float]:
+    values = sorted(latencies_s)
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean_ms": round(1000 * sum(values) / len(values), 3),
+        "p50_ms": round(1000 * percentile(values, 50), 3),
+        "p95_ms": round(1000 * percentile(values, 95), 3),
+        "p99_ms": round(1000 * percentile(values, 99), 3),
+        "max_ms": round(1000 * values[-1], 3),
+    }
+
+
+def write_results(path: Optional[str], kind: str, meta: dict, results: dict):
+    document = {"kind": kind, "meta": meta, "results": results}
+    text = json.dumps(document, indent=2, ensure_ascii=False)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
@@ -0,0 +1,137 @@
+"""
+Démarrage et mémoire par worker de /predict-cv-retention/.
+
+Compare trois façons de démarrer N workers :
+- baseline : chaque worker fait `joblib.load(pkl)` + `LocalDB()` (ancien import) ;
+- lazy     : chaque worker importe le service (port ouvert) puis charge en fond ;
+- preload  : le parent charge une fois (RETENTION_PRELOAD=1) puis forke les workers.
+
+Pour chaque mode : temps jusqu'au port ouvert, temps jusqu'à prêt, RSS et PSS
+par worker (PSS répartit les pages partagées entre processus).
+
+    python bench/retention_startup.py --model cv_retention_model.pkl --workers 4
+"""
+import argparse
+import importlib
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SAMPLE_CV = {
+    "experience": [
+        {"role": "Python", "company": "A", "start_date": "2018-01", "end_date": "2020-06"},
+        {"role": "Chef de projet", "company": "B", "start_date": "2021-01", "end_date": "2023-03"},
+    ],
+    "skills": ["python", "haskell", "gestion de projet"],
+}
+
+
+def memory_mb(pid="self") -> dict:
+    """Rss/Pss en Mo d'après /proc/<pid>/smaps_rollup (Linux)."""
+    out = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("Rss", "Pss"):
+                out[key.lower() + "_mb"] = round(int(value.split()[0]) / 1024, 1)
+    return out
+
+
+def _import_service():
+    return importlib.import_module("predict-cv-retention")
+
+
+def _score(service):
+    from hireform.cv_features import FEATURE_COLUMNS, retention_features
+    import numpy as np
+
+    features = retention_features(SAMPLE_CV, service.esco_labels)
+    X = np.array([[features[c] for c in FEATURE_COLUMNS]])
+    return float(service.model.predict_proba(X)[0][1])
+
+
+def _worker(mode, conn, stop):
+    t0 = time.perf_counter()
+    if mode == "baseline":
+        import joblib
+        import numpy as np
+        from esco import LocalDB
+
+        model = joblib.load(os.environ["RETENTION_MODEL_PATH"])
+        db = LocalDB()
+        port_open = ready = time.perf_counter() - t0
+        db.search_products({"python"})
+        model.predict_proba(np.zeros((1, 6)))
+    else:
+        service = _import_service()  # preload : déjà importé avant le fork
+        port_open = time.perf_counter() - t0
+        service.load_resources()
+        ready = time.perf_counter() - t0
+        _score(service)
+    conn.send({"port_open_s": round(port_open, 4), "ready_s": round(ready, 4)})
+    stop.wait()
+
+
+def run_mode(mode: str, workers: int) -> dict:
+    ctx = mp.get_context("fork" if mode == "preload" else "spawn")
+    parent_load = 0.0
+    if mode == "preload":
+        os.environ["RETENTION_PRELOAD"] = "1"
+        t0 = time.perf_counter()
+        _import_service()
+        parent_load = time.perf_counter() - t0
+
+    stop = ctx.Event()
+    procs, conns = [], []
+    for _ in range(workers):
+        parent_conn, child_conn = ctx.Pipe()
+        p = ctx.Process(target=_worker, args=(mode, child_conn, stop))
+        p.start()
+        procs.append(p)
+        conns.append(parent_conn)
+
+    timings = [c.recv() for c in conns]
+    memory = [memory_mb(p.pid) for p in procs]
+    stop.set()
+    for p in procs:
+        p.join()
+
+    return {
+        "mode": mode,
+        "workers": workers,
+        "parent_load_s": round(parent_load, 4),
+        "port_open_s_max": max(t["port_open_s"] for t in timings),
+        "ready_s_max": max(t["ready_s"] for t in timings),
+        "rss_mb_per_worker": max(m["rss_mb"] for m in memory),
+        "pss_mb_per_worker": max(m["pss_mb"] for m in memory),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de démarrage du service de rétention")
+    parser.add_argument("--model", default="cv_retention_model.pkl")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--modes", nargs="+", default=["baseline", "lazy", "preload"])
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    os.environ["RETENTION_MODEL_PATH"] = os.path.abspath(args.model)
+    # Conversion .joblib et index ESCO construits hors mesure (étape de déploiement)
+    from hireform.esco_index import EscoIndex
+    from hireform.model_store import convert_for_mmap
+
+    convert_for_mmap(args.model)
+    EscoIndex.open()
+
+    # preload en dernier : il importe le service dans le processus parent
+    modes = sorted(args.modes, key=lambda m: m == "preload")
+    print(json.dumps([run_mode(m, args.workers) for m in modes], indent=2))
+
+
+if __name__ == "__main__":
+    main()
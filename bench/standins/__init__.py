@@ -0,0 +1,85 @@
+"""
+Serveurs de remplacement locaux pour les API externes (OpenAI, DeepL, LibreOffice).
+
+Latence et pannes se règlent par variables d'environnement préfixées par le
+nom du remplaçant (OPENAI_STANDIN_…, DEEPL_STANDIN_…, LIBREOFFICE_STANDIN_…) :
+    _LATENCY_MS  latence moyenne par requête (défaut 0)
+    _JITTER_MS   écart-type de la latence (loi normale tronquée à 0, défaut 0)
+    _ERROR_RATE  part des requêtes en erreur serveur (défaut 0)
+
+Le faux `libreoffice` est dans bench/standins/bin : PATH=bench/standins/bin:$PATH.
+"""
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bin")
+
+
+class Faults:
+    """Latence et taux d'erreur d'un remplaçant, lus dans l'environnement."""
+
+    def __init__(self, prefix: str):
+        self.latency_ms = float(os.getenv(f"{prefix}_LATENCY_MS", "0"))
+        self.jitter_ms = float(os.getenv(f"{prefix}_JITTER_MS", "0"))
+        self.error_rate = float(os.getenv(f"{prefix}_ERROR_RATE", "0"))
+
+    def delay(self) -> float:
+        """Latence à simuler pour une requête, en secondes."""
+        if not self.jitter_ms:
+            return self.latency_ms / 1000
+        return max(0.0, random.gauss(self.latency_ms, self.jitter_ms)) / 1000
+
+    def fail(self) -> bool:
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 30.0, proc: Optional[subprocess.Popen] = None):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"Le serveur s'est arrêté au démarrage (code {proc.returncode})")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError(f"Port {port} fermé après {timeout:.0f}s")
+
+
+@contextmanager
+def serve(app: str, env: Optional[Dict[str, str]] = None, port: Optional[int] = None,
+          log_path: Optional[str] = None, timeout: float = 60.0):
+    """
+    Lance `uvicorn <app>` dans un sous-processus (racine du dépôt comme
+    répertoire courant) et renvoie son URL de base une fois le port ouvert.
+    """
+    port = port or free_port()
+    log = open(log_path, "ab") if log_path else subprocess.DEVNULL
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env={**os.environ, **(env or {})}, stdout=log, stderr=log,
+    )
+    try:
+        wait_for_port(port, timeout, proc)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        if log_path:
+            log.close()
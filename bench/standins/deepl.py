@@ -0,0 +1,49 @@
+"""
+Remplaçant local de l'API DeepL `/v2/translate`.
+
+Traduit chaque `text` en « [LANG] texte » et compte les requêtes et les textes
+reçus (GET /stats), pour vérifier le regroupement des appels de translate-cv.
+
+    uvicorn bench.standins.deepl:app --port 8089
+    DEEPL_API_URL=http://127.0.0.1:8089/v2/translate DEEPL_API_KEY=x uvicorn translate-cv:app
+
+Variables : DEEPL_STANDIN_LATENCY_MS, DEEPL_STANDIN_JITTER_MS (latence par
+requête, défaut 0), DEEPL_STANDIN_ERROR_RATE (part des requêtes en 503,
+défaut 0).
+"""
+import asyncio
+
+from fastapi import FastAPI, HTTPException, Request
+
+from bench.standins import Faults
+
+app = FastAPI(title="DeepL stand-in")
+
+faults = Faults("DEEPL_STANDIN")
+stats = {"requests": 0, "texts": 0, "failed": 0}
+
+
+@app.post("/v2/translate")
+async def translate(request: Request):
+    if not request.headers.get("authorization", "").startswith("DeepL-Auth-Key "):
+        raise HTTPException(403, "Authorization failed")
+    form = await request.form()
+    texts = form.getlist("text")
+    target = (form.get("target_lang") or "").upper()
+    if not texts or not target:
+        raise HTTPException(400, "Parameter 'text' and 'target_lang' required")
+
+    stats["requests"] += 1
+    stats["texts"] += len(texts)
+    delay = faults.delay()
+    if delay:
+        await asyncio.sleep(delay)
+    if faults.fail():
+        stats["failed"] += 1
+        raise HTTPException(503, "Service temporarily unavailable")
+    return {"translations": [{"detected_source_language": "FR", "text": f"[{target}] {t}"} for t in texts]}
+
+
+@app.get("/stats")
+async def get_stats():
+    return stats
@@ -0,0 +1,200 @@
+"""
+Remplaçant local de l'API OpenAI `/v1/chat/completions`.
+
+Réponses déterministes selon le prompt :
+- `functions` / `tools` fournis → function_call avec un CV extrait factice ;
+- prompt d'audit de biais ou de performance d'annonce → JSON attendu ;
+- sinon → texte d'offre d'emploi (en streaming SSE si `stream: true`).
+
+    uvicorn bench.standins.openai_api:app --port 8088
+    OPENAI_BASE_URL=http://127.0.0.1:8088/v1 uvicorn generate-offer:app
+
+Variables : OPENAI_STANDIN_LATENCY_MS, OPENAI_STANDIN_JITTER_MS (avant la
+réponse, défaut 0), OPENAI_STANDIN_TOKEN_MS (entre deux fragments en
+streaming, défaut 0), OPENAI_STANDIN_RPM (limite annoncée dans les en-têtes
+x-ratelimit-*, défaut 500), OPENAI_STANDIN_429_RATE (part des requêtes
+refusées en 429, défaut 0), OPENAI_STANDIN_ERROR_RATE (part des requêtes en
+500, défaut 0), OPENAI_STANDIN_MALFORMED_RATE (part des réponses JSON
+défectueuses, défaut 0 : moitié réparables — bloc ```json et virgule finale —,
+moitié sans champ requis ; une relance, reconnue au message assistant de
+l'historique, reçoit toujours un JSON correct).
+"""
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from bench.standins import Faults
+
+app = FastAPI(title="OpenAI stand-in")
+
+faults = Faults("OPENAI_STANDIN")
+TOKEN_MS = float(os.getenv("OPENAI_STANDIN_TOKEN_MS", "0"))
+RPM = int(os.getenv("OPENAI_STANDIN_RPM", "500"))
+RATE_429 = float(os.getenv("OPENAI_STANDIN_429_RATE", "0"))
+MALFORMED_RATE = float(os.getenv("OPENAI_STANDIN_MALFORMED_RATE", "0"))
+stats = {"requests": 0, "streams": 0, "rejected": 0, "failed": 0, "malformed": 0, "reasks": 0}
+_window = {"start": time.monotonic(), "count": 0}
+
+
+def _rate_limit_headers() -> dict:
+    """En-têtes x-ratelimit-* sur une fenêtre glissante d'une minute."""
+    now = time.monotonic()
+    if now - _window["start"] >= 60:
+        _window.update(start=now, count=0)
+    _window["count"] += 1
+    reset = max(0.0, 60 - (now - _window["start"]))
+    return {
+        "x-ratelimit-limit-requests": str(RPM),
+        "x-ratelimit-remaining-requests": str(max(0, RPM - _window["count"])),
+        "x-ratelimit-reset-requests": f"{reset:.3f}s",
+        "x-ratelimit-limit-tokens": str(RPM * 200),
+        "x-ratelimit-remaining-tokens": str(max(0, (RPM - _window["count"]) * 200)),
+        "x-ratelimit-reset-tokens": f"{reset:.3f}s",
+    }
+
+SAMPLE_CV = {
+    "personal_information": {"name": "Camille Martin", "title": "Développeuse Python",
+                             "email": "camille.martin@example.com", "phone": "+33 6 00 00 00 00",
+                             "location": "Lyon"},
+    "experience": [
+        {"role": "Développeuse Python", "company": "Acme", "start_date": "2020-01", "end_date": "2024-06",
+         "responsibilities": ["Conception d'API", "Revue de code"], "environment": ["Python", "FastAPI"]},
+        {"role": "Développeuse junior", "company": "Globex", "start_date": "2017-09", "end_date": "2019-08",
+         "responsibilities": ["Maintenance applicative"], "environment": ["Django"]},
+    ],
+    "certifications": [{"name": "AWS Cloud Practitioner", "issuer": "AWS"}],
+    "education": [{"degree": "Master informatique", "institution": "Université Lyon 1"}],
+    "skills": {"Langages": ["Python", "SQL"], "Outils": ["Docker", "Git"]},
+    "languages": {"Français": "Natif", "Anglais": "C1"},
+}
+
+AUDIT = {
+    "impact_estimate": 0.2,
+    "terms_found": [{"term": "jeune équipe", "reason": "Stéréotype d'âge", "location": "Contexte"}],
+    "suggestions": [{"original": "jeune équipe", "replacement": "équipe dynamique", "note": "Formulation neutre"}],
+}
+
+OFFER_PERF = {
+    "score": 72, "category": "Bon", "click_probability": 0.034, "apply_probability": 0.009,
+    "suggestions": {"title": "Développeur Python senior – CDI Paris", "keywords": ["FastAPI", "télétravail"],
+                    "structure": "Contexte, Responsabilités, Avantages en listes à puces."},
+}
+
+OFFER_TEXT = (
+    "Rejoignez une équipe produit en pleine croissance. Vos missions : concevoir des API, "
+    "garantir la qualité du code et accompagner les profils juniors. Profil : 5 ans "
+    "d'expérience en Python. Avantages : télétravail partiel, mutuelle, formation. Postulez !"
+)
+
+
+def _json_reply(body: dict, document: dict) -> str:
+    if any(m.get("role") == "assistant" for m in body.get("messages", [])):
+        stats["reasks"] += 1
+    elif random.random() < MALFORMED_RATE:
+        stats["malformed"] += 1
+        if random.random() < 0.5:
+            text = json.dumps(document, ensure_ascii=False, indent=2)
+            return "```json\n" + text[:-1].rstrip() + ",\n}\n```"
+        first = next(iter(document))
+        return json.dumps({k: v for k, v in document.items() if k != first}, ensure_ascii=False)
+    return json.dumps(document, ensure_ascii=False)
+
+
+def _reply(body: dict):
+    """(content, function_call) déterministes pour la requête."""
+    functions = body.get("functions") or [t["function"] for t in body.get("tools", []) if "function" in t]
+    if functions:
+        return None, {"name": functions[0]["name"], "arguments": _json_reply(body, SAMPLE_CV)}
+    prompt = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+    if "impact_estimate" in prompt:
+        return _json_reply(body, AUDIT), None
+    if "click_probability" in prompt:
+        return _json_reply(body, OFFER_PERF), None
+    return OFFER_TEXT, None
+
+
+def _usage(body: dict, content: str) -> dict:
+    prompt_tokens = sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 4
+    completion_tokens = len(content or "") // 4
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+    headers = _rate_limit_headers()
+    if _window["count"] > RPM or random.random() < RATE_429:
+        stats["rejected"] += 1
+        return JSONResponse(
+            {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+            status_code=429, headers={**headers, "retry-after": "0.2"},
+        )
+    delay = faults.delay()
+    if delay:
+        await asyncio.sleep(delay)
+    if faults.fail():
+        stats["failed"] += 1
+        return JSONResponse(
+            {"error": {"message": "The server had an error while processing your request.",
+                       "type": "server_error", "code": None}},
+            status_code=500, headers=headers,
+        )
+
+    content, function_call = _reply(body)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    created = int(time.time())
+    model = body.get("model", "gpt-4.1")
+
+    if body.get("stream"):
+        stats["streams"] += 1
+
+        async def chunks():
+            words = (content or "").split(" ")
+            for i, word in enumerate(words):
+                delta = {"content": word if i == 0 else " " + word}
+                if i == 0:
+                    delta["role"] = "assistant"
+                yield "data: " + json.dumps({
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+                }) + "\n\n"
+                if TOKEN_MS:
+                    await asyncio.sleep(TOKEN_MS / 1000)
+            yield "data: " + json.dumps({
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            }) + "\n\n"
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield "data: " + json.dumps({
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [], "usage": _usage(body, content),
+                }) + "\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/event-stream", headers=headers)
+
+    message = {"role": "assistant", "content": content}
+    if function_call:
+        message["function_call"] = function_call
+    return JSONResponse({
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": model,
+        "choices": [{"index": 0, "message": message,
+                     "finish_reason": "function_call" if function_call else "stop"}],
+        "usage": _usage(body, content or (function_call or {}).get("arguments", "")),
+    }, headers=headers)
+
+
+@app.get("/stats")
+async def get_stats():
+    return stats
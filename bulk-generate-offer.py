@@ -0,0 +1,153 @@
+"""
+Génération d'offres en masse à partir d'un JSONL de `JobInput`.
+
+Les appels OpenAI passent par un ordonnanceur à seaux de jetons (requêtes et
+tokens par minute, recalés sur les en-têtes `x-ratelimit-*`, 429 réessayés
+avec gigue). Chaque JobPosting est écrit dès qu'il est prêt ; un fichier de
+checkpoint permet de reprendre un lot interrompu sans régénérer ce qui est fait.
+
+    OPENAI_API_KEY=sk-... python bulk-generate-offer.py jobs.jsonl postings.jsonl --rpm 500 --tpm 30000
+
+Sortie : une ligne {"line": n, "job_posting": {...}} par offre (ordre d'achèvement).
+Erreurs définitives : <sortie>.errors.jsonl, non marquées dans le checkpoint
+(elles sont retentées à la reprise).
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import sys
+import time
+
+import openai
+
+from hireform.llm import get_openai_client
+from hireform.rate_limiter import RateLimiter, estimate_tokens, parse_duration
+
+service = importlib.import_module("generate-offer")
+
+logger = logging.getLogger("bulk-generate-offer")
+
+RETRYABLE = (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError,
+             openai.InternalServerError)
+
+
+# --- Checkpoint : numéros de ligne terminés, un par ligne (ajout seul)
+def load_checkpoint(path: str) -> set:
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {int(line) for line in f if line.strip()}
+
+
+async def generate_one(job, api_key: str, limiter: RateLimiter) -> str:
+    """Description d'une offre, sous contrôle du limiteur, avec retries."""
+    messages = service.build_messages(job)
+    estimated = estimate_tokens(messages, service.MAX_TOKENS)
+    # Les retries sont gérés ici (limiteur + gigue), pas par le SDK
+    client = get_openai_client(api_key).with_options(max_retries=0)
+
+    for attempt in range(limiter.max_retries + 1):
+        await limiter.acquire(estimated)
+        try:
+            raw = await client.chat.completions.with_raw_response.create(
+                model=service.MODEL,
+                messages=messages,
+                temperature=service.TEMPERATURE,
+                max_tokens=service.MAX_TOKENS,
+            )
+        except RETRYABLE as e:
+            limiter.settle(estimated, 0)
+            response = getattr(e, "response", None)
+            if response is not None:
+                limiter.update_from_headers(response.headers)
+            if attempt == limiter.max_retries:
+                raise
+            retry_after = parse_duration(response.headers.get("retry-after")) if response is not None else None
+            delay = limiter.backoff(attempt + 1, retry_after)
+            logger.warning("%s, nouvel essai dans %.1fs", type(e).__name__, delay)
+            await asyncio.sleep(delay)
+            continue
+
+        limiter.update_from_headers(raw.headers)
+        completion = raw.parse()
+        limiter.settle(estimated, completion.usage.total_tokens if completion.usage else None)
+        return completion.choices[0].message.content.strip()
+
+
+async def run(input_path: str, output_path: str, api_key: str, limiter: RateLimiter, concurrency: int) -> dict:
+    checkpoint_path = output_path + ".checkpoint"
+    errors_path = output_path + ".errors.jsonl"
+    done = load_checkpoint(checkpoint_path)
+    counts = {"skipped": len(done), "generated": 0, "failed": 0}
+    started = time.perf_counter()
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2 * concurrency)
+
+    with open(output_path, "a", encoding="utf-8") as out, \
+            open(checkpoint_path, "a", encoding="utf-8") as ckpt, \
+            open(errors_path, "a", encoding="utf-8") as errors:
+
+        def record(file, payload: dict):
+            file.write(json.dumps(payload, ensure_ascii=False) + "\n")
+            file.flush()
+
+        async def producer():
+            # Lecture au fil de l'eau : mémoire bornée par la taille de la file
+            with open(input_path, encoding="utf-8") as f:
+                for n, line in enumerate(f, start=1):
+                    if line.strip() and n not in done:
+                        await queue.put((n, line))
+            for _ in range(concurrency):
+                await queue.put(None)
+
+        async def worker():
+            while (item := await queue.get()) is not None:
+                n, line = item
+                try:
+                    job = service.JobInput(**json.loads(line))
+                    description = await generate_one(job, api_key, limiter)
+                except Exception as e:
+                    counts["failed"] += 1
+                    record(errors, {"line": n, "error": f"{type(e).__name__}: {e}"})
+                    continue
+                # Offre écrite avant le checkpoint : au pire regénérée, jamais perdue
+                record(out, {"line": n, "job_posting": service.build_job_posting(job, description)})
+                ckpt.write(f"{n}\n")
+                ckpt.flush()
+                counts["generated"] += 1
+                if counts["generated"] % 10 == 0:
+                    logger.info("%d offres générées (%.1f/min)", counts["generated"],
+                                60 * counts["generated"] / (time.perf_counter() - started))
+
+        await asyncio.gather(producer(), *(worker() for _ in range(concurrency)))
+
+    counts.update(limiter.stats)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génération d'offres en masse (JSONL de JobInput)")
+    parser.add_argument("input", help="JSONL, un JobInput par ligne")
+    parser.add_argument("output", help="JSONL de sortie (ouvert en ajout pour la reprise)")
+    parser.add_argument("--rpm", type=float, default=500, help="Requêtes par minute autorisées")
+    parser.add_argument("--tpm", type=float, default=30_000, help="Tokens par minute autorisés")
+    parser.add_argument("--concurrency", type=int, default=8, help="Appels simultanés maximum")
+    parser.add_argument("--max-retries", type=int, default=6)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    api_key = os.getenv("OPENAI_API_KEY", "")
+    if not api_key.startswith("sk-"):
+        parser.error("OPENAI_API_KEY manquante ou invalide")
+
+    limiter = RateLimiter(args.rpm, args.tpm, max_retries=args.max_retries)
+    counts = asyncio.run(run(args.input, args.output, api_key, limiter, args.concurrency))
+    logger.info("Terminé : %s", json.dumps(counts))
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
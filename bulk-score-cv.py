@@ -0,0 +1,167 @@
+"""
+Scoring hors ligne d'un export de CV extraits (JSONL ou Parquet) → Parquet.
+
+Reprend les features de /predict-cv-retention/ et /analyze-gaps/ en colonnes,
+lot par lot, pour que la mémoire reste bornée quelle que soit la taille
+de l'entrée.
+
+Exemple :
+    python bulk-score-cv.py cvs.jsonl scores.parquet --chunk-size 20000 --workers 4
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from hireform.cv_features import chunk_features, feature_matrix
+from hireform.esco_index import EscoIndex
+from hireform.model_store import load_shared_model
+
+logger = logging.getLogger("bulk-score-cv")
+
+OUTPUT_SCHEMA_FIELDS = [
+    ("row", pa.int64()),
+    ("avg_tenure_months", pa.float64()),
+    ("num_positions", pa.float64()),
+    ("num_breaks", pa.float64()),
+    ("num_skills", pa.int64()),
+    ("esco_skills_mapped", pa.int64()),
+    ("esco_titles_mapped", pa.int64()),
+    ("num_career_gaps", pa.float64()),
+    ("max_gap_months", pa.float64()),
+    ("risk_score", pa.float64()),
+    ("risk_category", pa.string()),
+]
+
+# --- État par processus (chargé une fois par worker)
+_model = None
+_esco_labels = None
+_gap_threshold = 3
+
+
+def _init_worker(model_path: str, gap_threshold: int):
+    global _model, _esco_labels, _gap_threshold
+    # Modèle et index ESCO mappés : les pages sont partagées entre les workers
+    _model = load_shared_model(model_path)
+    _esco_labels = EscoIndex.open()
+    _gap_threshold = gap_threshold
+
+
+# --- Lecture en flux
+def read_chunks(path: str, chunk_size: int, id_column: str = None):
+    """Itère sur l'entrée par lots de `chunk_size` CV, en ne lisant que les colonnes utiles."""
+    columns = ["experience", "skills"] + ([id_column] if id_column else [])
+    if path.endswith((".parquet", ".pq")):
+        pf = pq.ParquetFile(path)
+        present = [c for c in columns if c in pf.schema_arrow.names]
+        for batch in pf.iter_batches(batch_size=chunk_size, columns=present):
+            yield batch.to_pandas()
+    else:
+        reader = pd.read_json(
+            path, lines=True, chunksize=chunk_size, dtype=False, convert_dates=False
+        )
+        with reader:
+            for chunk in reader:
+                yield chunk[[c for c in columns if c in chunk.columns]]
+
+
+# --- Scoring d'un lot
+def score_chunk(chunk: pd.DataFrame, offset: int, id_column: str = None) -> pa.Table:
+    features = chunk_features(chunk, _esco_labels, _gap_threshold)
+
+    X = feature_matrix(features)
+    valid = ~np.isnan(X).any(axis=1)
+    scores = np.full(len(features), np.nan)
+    if valid.any():
+        scores[valid] = _model.predict_proba(X[valid])[:, 1]
+    features["risk_score"] = np.round(scores, 3)
+    features["risk_category"] = np.where(
+        np.isnan(scores), None, np.where(scores > 0.5, "High risk", "Low risk")
+    )
+
+    features.insert(0, "row", np.arange(offset, offset + len(features), dtype=np.int64))
+    fields = list(OUTPUT_SCHEMA_FIELDS)
+    if id_column:
+        features.insert(1, id_column, chunk[id_column].astype("string").to_numpy()
+                        if id_column in chunk else None)
+        fields.insert(1, (id_column, pa.string()))
+    return pa.Table.from_pandas(features, schema=pa.schema(fields), preserve_index=False)
+
+
+# --- Orchestration
+def run(input_path: str, output_path: str, model_path: str, chunk_size: int,
+        workers: int, gap_threshold: int, id_column: str = None) -> int:
+    writer = None
+    total = 0
+    started = time.perf_counter()
+
+    def write(table: pa.Table):
+        nonlocal writer, total
+        if writer is None:
+            writer = pq.ParquetWriter(output_path, table.schema)
+        writer.write_table(table)
+        total += table.num_rows
+        logger.info("%d CV scorés (%.0f CV/s)", total, total / (time.perf_counter() - started))
+
+    # Conversion du modèle et construction de l'index ESCO faites une seule fois, ici
+    _init_worker(model_path, gap_threshold)
+    chunks = read_chunks(input_path, chunk_size, id_column)
+    try:
+        if workers <= 1:
+            offset = 0
+            for chunk in chunks:
+                write(score_chunk(chunk, offset, id_column))
+                offset += len(chunk)
+        else:
+            # Fenêtre bornée de lots en vol : mémoire ≈ 2 × workers × chunk_size
+            with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                     initargs=(model_path, gap_threshold)) as pool:
+                pending = deque()
+                offset = 0
+                for chunk in chunks:
+                    pending.append(pool.submit(score_chunk, chunk, offset, id_column))
+                    offset += len(chunk)
+                    if len(pending) >= 2 * workers:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+    finally:
+        if writer is not None:
+            writer.close()
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", help="Fichier .jsonl ou .parquet de CV extraits")
+    parser.add_argument("output", help="Fichier Parquet de sortie")
+    parser.add_argument("--model", default="cv_retention_model.pkl")
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Nombre de processus (1 = séquentiel)")
+    parser.add_argument("--gap-threshold", type=int, default=3,
+                        help="Seuil de trou de carrière en mois")
+    parser.add_argument("--id-column", default=None,
+                        help="Colonne identifiant à recopier dans la sortie")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    if not os.path.exists(args.input):
+        parser.error(f"Fichier introuvable : {args.input}")
+
+    total = run(args.input, args.output, args.model, args.chunk_size,
+                args.workers, args.gap_threshold, args.id_column)
+    logger.info("Terminé : %d CV → %s", total, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
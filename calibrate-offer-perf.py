@@ -0,0 +1,89 @@
+"""
+Calibration du modèle local de /predict-offer-perf/?mode=fast.
+
+Entrée : JSONL d'annonces publiées avec leurs statistiques observées, p. ex.
+    {"ad": {...}, "impressions": 5400, "clicks": 162, "applies": 21, "score": 74}
+
+- click : régression logistique sur clicks / impressions ;
+- apply : régression logistique sur applies / impressions ;
+- score : régression linéaire sur `score` (p. ex. scores historiques du mode
+  complet) ; si absent, la tête score du modèle actuel est conservée.
+
+    python calibrate-offer-perf.py ads_stats.jsonl --output offer_perf_model.json
+"""
+import argparse
+import json
+import sys
+from datetime import date
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression, Ridge
+
+from hireform.offer_scoring import FEATURES, MODEL_PATH, extract_features, load_model
+
+
+def _binomial_fit(X: np.ndarray, successes: np.ndarray, trials: np.ndarray) -> dict:
+    """Logistique pondérée : chaque annonce compte pour ses succès et ses échecs."""
+    X2 = np.vstack([X, X])
+    y = np.concatenate([np.ones(len(X)), np.zeros(len(X))])
+    w = np.concatenate([successes, np.maximum(trials - successes, 0)])
+    keep = w > 0
+    clf = LogisticRegression(C=1.0, max_iter=1000)
+    clf.fit(X2[keep], y[keep], sample_weight=w[keep])
+    return {"intercept": float(clf.intercept_[0]), "weights": [float(c) for c in clf.coef_[0]]}
+
+
+def calibrate(records: list, base: dict) -> dict:
+    raw = np.array([[extract_features(r["ad"])[f] for f in FEATURES] for r in records])
+    mean = raw.mean(axis=0)
+    scale = raw.std(axis=0)
+    scale[scale == 0] = 1.0
+    X = (raw - mean) / scale
+
+    impressions = np.array([r.get("impressions", 0) for r in records], dtype=float)
+    model = {
+        "version": f"calibrated-{date.today().isoformat()}",
+        "source": f"calibrate-offer-perf.py sur {len(records)} annonces",
+        "features": list(FEATURES),
+        "mean": mean.round(6).tolist(),
+        "scale": scale.round(6).tolist(),
+        "click": _binomial_fit(X, np.array([r.get("clicks", 0) for r in records], dtype=float), impressions),
+        "apply": _binomial_fit(X, np.array([r.get("applies", 0) for r in records], dtype=float), impressions),
+    }
+
+    scored = [i for i, r in enumerate(records) if r.get("score") is not None]
+    if scored:
+        reg = Ridge(alpha=1.0).fit(X[scored], [records[i]["score"] for i in scored])
+        model["score"] = {"intercept": float(reg.intercept_), "weights": [float(c) for c in reg.coef_]}
+    else:
+        # Tête score conservée, réexprimée dans la nouvelle standardisation
+        old_w = np.array(base["score"]["weights"]) / np.array(base["scale"])
+        model["score"] = {
+            "intercept": float(base["score"]["intercept"] + old_w @ (mean - np.array(base["mean"]))),
+            "weights": (old_w * scale).tolist(),
+        }
+    return model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibre le modèle local de performance d'annonces")
+    parser.add_argument("input", help="JSONL {ad, impressions, clicks, applies, score?}")
+    parser.add_argument("--output", default=MODEL_PATH)
+    parser.add_argument("--base", default=MODEL_PATH, help="Modèle actuel (tête score par défaut)")
+    args = parser.parse_args(argv)
+
+    with open(args.input, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if not records:
+        parser.error("Aucune annonce dans le fichier d'entrée")
+
+    model = calibrate(records, load_model(args.base))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(model, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    print(f"Modèle calibré sur {len(records)} annonces → {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
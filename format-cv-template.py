@@ -1,22 +1,20 @@
-from fastapi import FastAPI, Request, UploadFile, File, Query, Depends, HTTPException
+from fastapi import APIRouter, FastAPI, Request, UploadFile, File, Query, Depends, HTTPException
 from fastapi.responses import StreamingResponse
-from fastapi.security import APIKeyHeader
-from docxtpl import DocxTemplate
+import asyncio
 import tempfile
-import subprocess
 import io
 import os
 
-app = FastAPI(title="Hireform CV Formatter")
+from hireform.admission import slot
+from hireform.logs import configure_logging_on_startup
+from hireform.metrics import instrument
+from hireform.office import convert_to_pdf
+from hireform.responses import ORJSONResponse
+from hireform.security import validate_api_key
 
-# Auth via header api-key
-api_key_header = APIKeyHeader(name="api-key", auto_error=True)
-def validate_api_key(api_key: str = Depends(api_key_header)):
-    if not api_key.startswith("sk-"):
-        raise HTTPException(status_code=401, detail="Clé API invalide")
-    return api_key
+router = APIRouter(tags=["format-cv-template"], default_response_class=ORJSONResponse)
 
-@app.post("/format-cv-template")
+@router.post("/format-cv-template")
 async def format_cv_template(
     request: Request,
     template_file: UploadFile = File(...),
@@ -31,6 +29,7 @@ async def format_cv_template(
 
     # Lecture du template Word
     template_content = await template_file.read()
+    from docxtpl import DocxTemplate  # chargé au premier rendu
     template = DocxTemplate(io.BytesIO(template_content))
 
     # Injection des données dans le template
@@ -60,9 +59,8 @@ async def format_cv_template(
         with open(tmp_docx_path, "wb") as f:
             f.write(docx_io.getvalue())
 
-        subprocess.run([
-            "libreoffice", "--headless", "--convert-to", "pdf", "--outdir", tmpdir, tmp_docx_path
-        ], check=True)
+        async with slot("pdf_convert"):  # hors boucle d'événements, profil LibreOffice propre à l'appel
+            await asyncio.to_thread(convert_to_pdf, tmp_docx_path, tmpdir)
 
         pdf_file = open(tmp_pdf_path, "rb")
         return StreamingResponse(
@@ -70,3 +68,10 @@ async def format_cv_template(
             media_type="application/pdf",
             headers={"Content-Disposition": "attachment; filename=cv_formatted.pdf"}
         )
+
+
+# Application autonome (uvicorn format-cv-template:app) ; la passerelle (gateway.py) monte `router`
+app = FastAPI(title="Hireform CV Formatter", default_response_class=ORJSONResponse)
+app.include_router(router)
+configure_logging_on_startup(app)
+instrument(app)
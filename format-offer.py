@@ -1,11 +1,28 @@
-from fastapi import FastAPI, Request, UploadFile, File, Query, Depends, HTTPException
+from fastapi import APIRouter, FastAPI, Request, UploadFile, File, Form, Query, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 from fastapi.security import APIKeyHeader
-from docxtpl import DocxTemplate
-from jinja2 import Environment, FileSystemLoader
-import openai, io, os, subprocess, tempfile, json
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager, nullcontext
+from functools import lru_cache
+import asyncio, io, logging, os, tempfile, json, uuid, zipfile
 
-app = FastAPI()
+from hireform.admission import slot
+from hireform.llm import get_openai_client
+from hireform.logs import configure_logging_on_startup
+from hireform.metrics import instrument, record_llm_usage, stage
+from hireform.office import convert_to_pdf
+from hireform.responses import ORJSONResponse
+from hireform.security import admitted
+
+TEMPLATES_DIR = os.getenv("TEMPLATES_DIR", "templates")
+FORMAT_WORKERS = int(os.getenv("FORMAT_OFFER_WORKERS", "2"))
+
+MEDIA_TYPES = {
+    "txt": "text/plain; charset=utf-8",
+    "html": "text/html; charset=utf-8",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+}
 
 # Authentification
 api_key_header = APIKeyHeader(name="api-key")
@@ -14,47 +31,168 @@ def validate_key(key: str = Depends(api_key_header)):
         raise HTTPException(401, "API key invalide")
     return key
 
-@app.post("/format-offer", summary="Formate une offre d'emploi dans différents formats")
+# Environnement Jinja partagé par le processus : templates compilés une fois,
+# bytecode mis en cache sur disque pour les redémarrages
+@lru_cache(maxsize=1)
+def get_jinja_env():
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+    return Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        bytecode_cache=FileSystemBytecodeCache(),
+        auto_reload=False,
+    )
+
+# Pool de processus pour le rendu docx et la conversion LibreOffice (CPU + sous-processus)
+_pool = None
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(FORMAT_WORKERS)
+    return _pool
+
+async def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await shutdown()
+
+logger = logging.getLogger(__name__)
+router = APIRouter(tags=["format-offer"], default_response_class=ORJSONResponse)
+
+# 1) Version LinkedIn via GPT-4.1 (appel asynchrone)
+async def format_linkedin(hr_json: dict) -> tuple:
+    prompt = f"Formate pour LinkedIn : {hr_json.get('description')}"
+    async with slot("llm"):
+        with stage("linkedin"):
+            resp = await get_openai_client(os.getenv("OPENAI_API_KEY")).chat.completions.create(
+                model="gpt-4.1",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=300
+            )
+    record_llm_usage("gpt-4.1", resp.usage)
+    return "txt", resp.choices[0].message.content.strip().encode("utf-8")
+
+# 2) Version ATS (DOCX/PDF) via python-docx-template — exécutée dans le pool
+def render_ats(template_bytes: bytes, hr_json: dict, as_pdf: bool) -> tuple:
+    from docxtpl import DocxTemplate  # importé dans le processus de rendu seulement
+
+    doc = DocxTemplate(io.BytesIO(template_bytes))
+    doc.render(hr_json)                                 # {{ title }}, {{ description }}…
+    stream = io.BytesIO(); doc.save(stream)
+    if not as_pdf:
+        return "docx", stream.getvalue()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "x.docx")
+        with open(path, "wb") as f:
+            f.write(stream.getvalue())
+        with open(convert_to_pdf(path, tmp), "rb") as f:  # profil LibreOffice propre à l'appel
+            return "pdf", f.read()
+
+async def ats_job(template_bytes: bytes, hr_json: dict, as_pdf: bool) -> tuple:
+    # Conversion LibreOffice : place du pool pdf_convert tenue pendant le rendu
+    async with slot("pdf_convert") if as_pdf else nullcontext():
+        return await asyncio.get_running_loop().run_in_executor(get_pool(), render_ats, template_bytes, hr_json, as_pdf)
+
+# 3) Version Web (HTML + JSON-LD)
+def render_web(hr_json: dict) -> tuple:
+    html = get_jinja_env().get_template("web_template.html").render(**hr_json)  # HTML semantique
+    # Inject JSON-LD schema.org
+    jsonld = { "@context":"https://schema.org/","@type":"JobPosting", **{k:hr_json[k] for k in ("title","description","datePosted") if k in hr_json}}
+    full_html = html.replace("</body>",
+                             f"<script type='application/ld+json'>\n{json.dumps(jsonld,ensure_ascii=False)}\n</script>\n</body>")
+    return "html", full_html.encode("utf-8")
+
+def _multipart_part(boundary: str, name: str, ext: str, content: bytes) -> bytes:
+    headers = (
+        f"--{boundary}\r\n"
+        f"Content-Type: {MEDIA_TYPES[ext]}\r\n"
+        f"Content-Disposition: attachment; name=\"{name}\"; filename=\"{name}.{ext}\"\r\n\r\n"
+    )
+    return headers.encode("utf-8") + content + b"\r\n"
+
+@router.post("/format-offer", summary="Formate une offre d'emploi dans différents formats")
 async def format_offer(
-    hr_json: dict,                                 # JSON standardisé (HR-JSON)  [oai_citation:5‡Microsoft Learn](https://learn.microsoft.com/en-us/azure/architecture/best-practices/api-design?utm_source=chatgpt.com)
+    hr_json_text: str = Form(..., alias="hr_json"),  # JSON standardisé (HR-JSON), champ du formulaire multipart
     template_file: UploadFile = File(None),        # Template .docx Jinja2 pour ATS
     formats: list[str] = Query(..., description="Formats souhaités : ats, linkedin, web"),
     as_pdf: bool = Query(False, description="True pour PDF, False pour DOCX/HTML"),
-    api_key: str = Depends(validate_key)
+    output: str = Query("zip", pattern="^(zip|multipart)$",
+                        description="zip : archive des formats, multipart : chaque format envoyé dès qu'il est prêt"),
+    api_key: str = Depends(admitted(validate_key))
 ):
-    outputs = {}
+    try:
+        hr_json = json.loads(hr_json_text)
+    except json.JSONDecodeError:
+        raise HTTPException(400, "hr_json invalide")
+    if "ats" in formats and not template_file:
+        raise HTTPException(400, "Template .docx requis pour ats")
 
-    # 1) Version LinkedIn via GPT-4 Turbo
+    # Tous les formats démarrent en même temps : la latence est celle du plus lent
+    jobs = {}
     if "linkedin" in formats:
-        prompt = f"Formate pour LinkedIn : {hr_json.get('description')}"
-        resp = openai.Completion.create(model="gpt-4.1", prompt=prompt, max_tokens=300)
-        outputs["linkedin"] = resp.choices[0].text.strip()
-
-    # 2) Version ATS (DOCX/PDF) via python-docx-template
+        jobs["linkedin"] = asyncio.ensure_future(format_linkedin(hr_json))
     if "ats" in formats:
-        if not template_file:
-            raise HTTPException(400, "Template .docx requis pour ats")
-        buf = await template_file.read()
-        doc = DocxTemplate(io.BytesIO(buf))
-        doc.render(hr_json)                                 # {{ title }}, {{ description }}… 
-        stream = io.BytesIO(); doc.save(stream); stream.seek(0)
-        if as_pdf:
-            with tempfile.TemporaryDirectory() as tmp:
-                path = os.path.join(tmp, "x.docx")
-                open(path, "wb").write(stream.getvalue())
-                subprocess.run(["libreoffice","--headless","--convert-to","pdf",path], check=True)
-                outputs["ats"] = ("pdf", open(path.replace(".docx",".pdf"),"rb").read())
-        else:
-            outputs["ats"] = ("docx", stream.getvalue())
-
-    # 3) Version Web (HTML + JSON-LD)
+        template_bytes = await template_file.read()
+        jobs["ats"] = asyncio.ensure_future(ats_job(template_bytes, hr_json, as_pdf))
     if "web" in formats:
-        env = Environment(loader=FileSystemLoader("templates"))
-        html = env.get_template("web_template.html").render(**hr_json)  # HTML semantique  [oai_citation:6‡Blog](https://blog.dreamfactory.com/best-practices-for-naming-rest-api-endpoints?utm_source=chatgpt.com)
-        # Inject JSON-LD schema.org
-        jsonld = { "@context":"https://schema.org/","@type":"JobPosting", **{k:hr_json[k] for k in ("title","description","datePosted") if k in hr_json}}
-        full_html = html.replace("</body>",
-                                 f"<script type='application/ld+json'>\n{json.dumps(jsonld,ensure_ascii=False)}\n</script>\n</body>")
-        outputs["web"] = full_html
-
-    return outputs
+        jobs["web"] = asyncio.ensure_future(asyncio.to_thread(render_web, hr_json))
+    names = {job: name for name, job in jobs.items()}
+
+    if output == "zip":
+        try:
+            results = dict(zip(jobs, await asyncio.gather(*jobs.values())))
+        except HTTPException:  # pool saturé (429/503)
+            for job in jobs.values():
+                job.cancel()
+            raise
+        except Exception as e:
+            logger.exception("Formatage de l'offre en échec")
+            for job in jobs.values():
+                job.cancel()
+            raise HTTPException(500, f"Erreur de formatage : {e}")
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name, (ext, content) in results.items():
+                zf.writestr(f"{name}.{ext}", content)
+        buf.seek(0)
+        return StreamingResponse(
+            buf,
+            media_type="application/zip",
+            headers={"Content-Disposition": "attachment; filename=offer_formats.zip"}
+        )
+
+    # multipart/mixed : chaque format part dès qu'il est terminé
+    boundary = uuid.uuid4().hex
+    async def parts():
+        pending = set(jobs.values())
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for job in done:
+                    name = names[job]
+                    try:
+                        ext, content = job.result()
+                    except Exception as e:
+                        logger.exception("Format %s en échec", name)
+                        ext, content = "txt", f"Erreur de formatage : {e}".encode("utf-8")
+                        name = f"{name}.error"
+                    yield _multipart_part(boundary, name, ext, content)
+            yield f"--{boundary}--\r\n".encode("utf-8")
+        finally:
+            for job in pending:
+                job.cancel()
+
+    return StreamingResponse(parts(), media_type=f"multipart/mixed; boundary={boundary}")
+
+
+# Application autonome (uvicorn format-offer:app) ; la passerelle (gateway.py) monte `router`
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+app.include_router(router)
+configure_logging_on_startup(app)
+instrument(app)
@@ -0,0 +1,87 @@
+"""
+Passerelle ASGI : tous les services Hireform dans un seul processus.
+
+    uvicorn gateway:app --port 8000
+
+Chaque service expose un `APIRouter` (`router`) monté ici. Leurs dépendances
+lourdes (openai, pypdfium2, pdfplumber, docxtpl, jinja2, pandas, joblib, esco…) ne sont
+importées qu'au premier appel d'une route qui en a besoin ; clients OpenAI et
+HTTP, cache singleflight et pools de processus sont partagés par tous.
+
+Journaux : JSON sur stderr via hireform.logs (HIREFORM_LOG_LEVEL, HIREFORM_LOG_SAMPLE…).
+
+HIREFORM_SERVICES=main,transform-cv,translate-cv… restreint les services
+montés (noms de modules : `main` pour /extract-cv/).
+
+Quand `main` et `transform-cv` sont montés ensemble, /transform-cv/ appelle
+l'extraction dans le processus (main.extract_cv_data) plutôt qu'en HTTP sur
+HIREFORM_BASE_URL.
+"""
+import importlib
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from hireform.http import close_http_client
+from hireform.llm import close_openai_clients
+from hireform.logs import configure_logging_on_startup
+from hireform.metrics import instrument
+from hireform.responses import ORJSONResponse
+from hireform.singleflight import stats_router
+
+SERVICES = [
+    "main",                  # /extract-cv/
+    "transform-cv",          # /generate-template-cv/, /generate-cv/, /transform-cv/
+    "analyze-gaps",
+    "analyze-cv",            # /analyze-cv/ : trous, rétention et anonymisation en un appel
+    "anonymize-cv",
+    "audit-bias",
+    "format-cv-template",
+    "format-offer",
+    "generate-offer",
+    "predict-cv-retention",
+    "predict-offer-perf",
+    "translate-cv",
+]
+
+
+def enabled_services() -> list:
+    selected = os.getenv("HIREFORM_SERVICES")
+    if not selected:
+        return SERVICES
+    names = [name.strip() for name in selected.split(",") if name.strip()]
+    unknown = set(names) - set(SERVICES)
+    if unknown:
+        raise ValueError(f"Services inconnus : {', '.join(sorted(unknown))}")
+    return names
+
+
+services = {name: importlib.import_module(name) for name in enabled_services()}
+if "main" in services and "transform-cv" in services:
+    services["transform-cv"].local_extract = services["main"].extract_cv_data
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Libération des ressources propres à chaque service, puis des clients partagés
+    for module in services.values():
+        shutdown = getattr(module, "shutdown", None)
+        if shutdown is not None:
+            await shutdown()
+    await close_http_client()
+    await close_openai_clients()
+
+
+app = FastAPI(title="Hireform Gateway", lifespan=lifespan, default_response_class=ORJSONResponse)
+for module in services.values():
+    app.include_router(module.router)
+app.include_router(stats_router)
+configure_logging_on_startup(app)  # un seul pipeline pour tous les services
+instrument(app)
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "services": list(services)}
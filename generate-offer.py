@@ -1,16 +1,33 @@
+import json
+import logging
 import uuid
 from datetime import date
-from typing import Optional
+from typing import AsyncIterator, Optional
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import APIRouter, FastAPI, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from fastapi.security import APIKeyHeader
 from pydantic import BaseModel
-import openai
 
-app = FastAPI()
+from hireform.admission import slot
+from hireform.llm import get_openai_client
+from hireform.logs import configure_logging_on_startup
+from hireform.metrics import instrument, record_llm_usage, stage
+from hireform.responses import ORJSONResponse
+from hireform.security import admitted
+from hireform.singleflight import llm_flight, request_key, stats_router
+
+logger = logging.getLogger(__name__)
+router = APIRouter(tags=["generate-offer"], default_response_class=ORJSONResponse)
+
+MODEL = "gpt-4.1"
+PROMPT_VERSION = "generate-offer-v1"  # à incrémenter à chaque modification du prompt
+TEMPERATURE = 0.7
+MAX_TOKENS = 1000
 
 # Définition de l'en-tête attendu pour la clé API
 api_key_header = APIKeyHeader(name="X-OpenAI-Key", auto_error=True)
+openai_key = admitted(api_key_header)  # quota d'admission par clé
 
 # Exemple de json
 """- **Corps de la requête (JSON)** :
@@ -38,9 +55,9 @@ class JobInput(BaseModel):
     company_logo: Optional[str] = None
     valid_through: Optional[str] = None
 
-# Fonction pour générer la description de l'offre d'emploi
-def generate_job_description(job: JobInput, api_key: str) -> str:
-    prompt = (
+# Prompt de génération de la description
+def build_prompt(job: JobInput) -> str:
+    return (
         f"Rédige une offre d'emploi complète pour le poste suivant :\n"
         f"Titre : {job.title}\n"
         f"Lieu : {job.location}\n"
@@ -53,26 +70,48 @@ def generate_job_description(job: JobInput, api_key: str) -> str:
         f"L'offre doit inclure une description du poste, les responsabilités, les qualifications requises et les avantages offerts."
     )
 
-    try:
-        openai.api_key = api_key
-        response = openai.ChatCompletion.create(
-            model="gpt-4.1",
-            messages=[
-                {"role": "system", "content": "Tu es un assistant RH expert en rédaction d'offres d'emploi."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+def build_messages(job: JobInput) -> list:
+    return [
+        {"role": "system", "content": "Tu es un assistant RH expert en rédaction d'offres d'emploi."},
+        {"role": "user", "content": build_prompt(job)}
+    ]
 
-# Endpoint pour générer l'offre d'emploi
-@app.post("/generate-offer")
-async def generate_offer(job: JobInput, api_key: str = Depends(api_key_header)):
-    description = generate_job_description(job, api_key)
+# Fonction pour générer la description de l'offre d'emploi (appel non bloquant)
+async def generate_job_description(job: JobInput, api_key: str) -> str:
+    async with slot("llm"):  # 429/503 si le pool LLM est saturé
+        try:
+            with stage("llm"):
+                response = await get_openai_client(api_key).chat.completions.create(
+                    model=MODEL,
+                    messages=build_messages(job),
+                    temperature=TEMPERATURE,
+                    max_tokens=MAX_TOKENS
+                )
+            record_llm_usage(MODEL, response.usage)
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            logger.exception("Génération de l'offre en échec")
+            raise HTTPException(status_code=500, detail=str(e))
 
+# Variante streaming : renvoie les fragments de texte au fil de la génération
+async def stream_job_description(job: JobInput, api_key: str) -> AsyncIterator[str]:
+    async with slot("llm"):  # tenu jusqu'au dernier fragment
+        stream = await get_openai_client(api_key).chat.completions.create(
+            model=MODEL,
+            messages=build_messages(job),
+            temperature=TEMPERATURE,
+            max_tokens=MAX_TOKENS,
+            stream=True,
+            stream_options={"include_usage": True}  # usage dans le dernier fragment
+        )
+        async for chunk in stream:
+            if chunk.usage:
+                record_llm_usage(MODEL, chunk.usage)
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+# Objet schema.org JobPosting à partir de l'entrée et de la description générée
+def build_job_posting(job: JobInput, description: str) -> dict:
     job_id = str(uuid.uuid4())
     today = date.today().isoformat()
 
@@ -115,6 +154,46 @@ async def generate_offer(job: JobInput, api_key: str = Depends(api_key_header)):
     }
 
     # Suppression des champs avec des valeurs None
-    job_posting = {k: v for k, v in job_posting.items() if v is not None}
+    return {k: v for k, v in job_posting.items() if v is not None}
+
+# Endpoint pour générer l'offre d'emploi
+@router.post("/generate-offer")
+async def generate_offer(job: JobInput, api_key: str = Depends(openai_key)):
+    # Même offre demandée plusieurs fois en parallèle → une seule génération
+    key = request_key("generate-offer", MODEL, PROMPT_VERSION, job.dict(), api_key)
+    description = await llm_flight.do(
+        key, lambda: generate_job_description(job, api_key), label="generate-offer"
+    )
+    return build_job_posting(job, description)
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+# Endpoint streaming (SSE) : fragments de description puis JobPosting final
+@router.post("/generate-offer/stream")
+async def generate_offer_stream(job: JobInput, api_key: str = Depends(openai_key)):
+    async def events():
+        parts = []
+        try:
+            async for delta in stream_job_description(job, api_key):
+                parts.append(delta)
+                yield _sse("token", {"delta": delta})
+        except Exception as e:
+            logger.exception("Génération en streaming interrompue")
+            yield _sse("error", {"detail": str(e)})
+            return
+        yield _sse("job_posting", build_job_posting(job, "".join(parts).strip()))
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 
-    return job_posting
+# Application autonome (uvicorn generate-offer:app) ; la passerelle (gateway.py) monte `router`
+app = FastAPI(default_response_class=ORJSONResponse)
+app.include_router(router)
+app.include_router(stats_router)
+configure_logging_on_startup(app)
+instrument(app)
@@ -0,0 +1,6 @@
+"""
+Briques partagées entre les services Hireform (features, index, utilitaires).
+
+Les services eux-mêmes restent des scripts FastAPI à la racine du dépôt ;
+ce paquet ne contient que le code importable qu'ils réutilisent.
+"""
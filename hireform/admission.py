@@ -0,0 +1,299 @@
+"""
+Contrôle d'admission : quotas par clé API et pools globaux des ressources coûteuses.
+
+    async with slot("llm"):
+        response = await client.chat.completions.create(...)
+
+- Par clé `api-key` (appliqué par les dépendances de hireform.security) : seau à
+  jetons (requêtes/minute) et nombre de requêtes simultanées, avec une file
+  d'attente bornée. Seau vide → 429 immédiat.
+- Pools globaux du processus : `llm` (appels OpenAI), `pdf_convert`
+  (LibreOffice), `pdf_parse` (extraction du texte PDF). Une requête peut attendre
+  ADMISSION_MAX_WAIT secondes ; file pleine → 429 immédiat, attente dépassée → 503.
+
+Les refus portent un `Retry-After` estimé à partir de la durée moyenne
+d'occupation d'une place. Profondeur des files, places occupées et refus sont
+exportés dans /metrics (hireform_admission_*), par pool.
+
+Variables (défauts entre parenthèses) :
+    ADMISSION                          0 pour tout désactiver (1)
+    ADMISSION_KEY_CONCURRENCY / _QUEUE requêtes simultanées et en attente par clé (8 / 32)
+    ADMISSION_KEY_RPM                  requêtes par minute et par clé, 0 = illimité (600)
+    ADMISSION_KEY_LIMITS               exceptions par clé : « sk-a=32/3000,sk-b=2/60 »
+    ADMISSION_<POOL>_CONCURRENCY / _QUEUE  (llm 64 / 256, pdf_convert et pdf_parse : nb de CPU / 64)
+    ADMISSION_MAX_WAIT                 attente maximale en file, en secondes (30)
+    HIREFORM_INTERNAL_TOKEN            jeton des appels internes (transform-cv → extract-cv…)
+                                       à partager entre processus et entre machines
+
+Les appels internes portant `internal_headers()` ne consomment pas le quota de
+la clé : /transform-cv/ occupe déjà une place et attendrait sinon ses propres
+sous-requêtes. Sans HIREFORM_INTERNAL_TOKEN, le jeton est tiré au hasard au
+premier besoin, une fois par machine et utilisateur, dans un fichier 0600 d'un
+répertoire privé (XDG_RUNTIME_DIR, sinon `hireform-<uid>` en 0700 dans le
+répertoire temporaire), et relu par tous les workers (`uvicorn --workers N`,
+gunicorn) : une sous-requête reçue par un autre worker reste reconnue.
+Répertoire ou fichier appartenant à un autre utilisateur ou accessible à
+d'autres : refus (RuntimeError), définir la variable. Plusieurs machines
+derrière un même répartiteur doivent la définir.
+
+Quotas par clé et pools sont tenus par processus : avec N workers, la limite
+effective d'une clé est N fois la limite configurée (à diviser en conséquence).
+"""
+import asyncio
+import math
+import os
+import secrets
+import stat
+import tempfile
+import time
+from collections import deque
+from contextlib import asynccontextmanager, nullcontext
+from typing import Dict, Mapping, Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+from hireform import metrics
+from hireform.rate_limiter import TokenBucket
+
+ENABLED = os.getenv("ADMISSION", "1") != "0"
+MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", "30"))
+INTERNAL_HEADER = "x-hireform-internal"
+TOKEN_NAME = "internal.token"
+
+
+def _private_dir() -> str:
+    """Répertoire propre à l'utilisateur, inaccessible aux autres (créé en 0700 au besoin)."""
+    runtime = os.getenv("XDG_RUNTIME_DIR")
+    path = runtime if runtime else os.path.join(tempfile.gettempdir(), f"hireform-{os.getuid()}")
+    if not runtime:
+        try:
+            os.mkdir(path, 0o700)
+        except FileExistsError:
+            pass
+    _check_private(os.lstat(path), path, stat.S_ISDIR)
+    return path
+
+
+def _check_private(info: os.stat_result, path: str, kind) -> None:
+    # Créé d'avance par un autre utilisateur, lien symbolique ou lisible par d'autres : jeton non fiable
+    if not kind(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise RuntimeError(f"{path} n'est pas privé (propriétaire, type ou droits) : "
+                           "définir HIREFORM_INTERNAL_TOKEN")
+
+
+def _shared_token(directory: Optional[str] = None) -> str:
+    """Jeton aléatoire commun aux processus de l'utilisateur : le premier l'écrit, les autres le lisent."""
+    path = os.path.join(directory or _private_dir(), TOKEN_NAME)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600)
+    except FileExistsError:
+        fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW)
+        with os.fdopen(fd, encoding="ascii") as f:
+            _check_private(os.fstat(f.fileno()), path, stat.S_ISREG)
+            for _ in range(100):  # un autre worker est peut-être en train de l'écrire
+                token = f.read().strip()
+                if token:
+                    return token
+                time.sleep(0.01)
+                f.seek(0)
+        raise RuntimeError(f"Jeton interne vide dans {path} : définir HIREFORM_INTERNAL_TOKEN")
+    token = secrets.token_hex(16)
+    with os.fdopen(fd, "w", encoding="ascii") as f:
+        f.write(token)
+    return token
+
+
+_internal_token: Optional[bytes] = None
+
+
+def _token() -> bytes:
+    # Au premier appel interne seulement : importer un service (CLI, tests) n'écrit rien
+    global _internal_token
+    if _internal_token is None:
+        _internal_token = (os.getenv("HIREFORM_INTERNAL_TOKEN") or _shared_token()).encode()
+    return _internal_token
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+class Pool:
+    """
+    Sémaphore à file d'attente bornée. Une place libérée est transmise
+    directement au premier en attente (ordre FIFO, pas de resquille).
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, max_wait: float = MAX_WAIT):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.active = 0
+        self.waiters: deque = deque()
+        self.hold_seconds = 1.0  # moyenne glissante de la durée d'occupation
+
+    def retry_after(self) -> int:
+        """Secondes estimées avant qu'une place se libère pour un nouvel arrivant."""
+        estimate = self.hold_seconds * (len(self.waiters) + 1) / max(self.limit, 1)
+        return min(60, max(1, math.ceil(estimate)))
+
+    def _reject(self, status: int, reason: str, detail: str):
+        if metrics.ADMISSION_SHED is not None:
+            metrics.ADMISSION_SHED.labels(self.name, reason).inc()
+        raise HTTPException(status, detail, headers={"Retry-After": str(self.retry_after())})
+
+    def _gauge(self, gauge, delta: int):
+        if gauge is not None:
+            gauge.labels(self.name).inc(delta)
+
+    async def acquire(self):
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            self._gauge(metrics.ADMISSION_ACTIVE, 1)
+            return
+        if len(self.waiters) >= self.queue_size:
+            self._reject(429, "queue_full", f"Capacité {self.name} saturée, réessayez plus tard")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        self._gauge(metrics.ADMISSION_QUEUED, 1)
+        try:
+            with metrics.stage(f"queue.{self.name}"):
+                await asyncio.wait_for(waiter, self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # place transmise pendant l'annulation : on la rend
+            else:
+                self.waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._reject(503, "timeout", f"Attente {self.name} trop longue, réessayez plus tard")
+        finally:
+            self._gauge(metrics.ADMISSION_QUEUED, -1)
+
+    def release(self, held: Optional[float] = None):
+        if held is not None:
+            self.hold_seconds += 0.2 * (held - self.hold_seconds)
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # la place change de main, `active` inchangé
+                return
+        self.active -= 1
+        self._gauge(metrics.ADMISSION_ACTIVE, -1)
+
+
+@asynccontextmanager
+async def _held(pool: Pool):
+    await pool.acquire()
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        pool.release(time.monotonic() - start)
+
+
+_POOL_DEFAULTS = {"llm": (64, 256), "pdf_convert": (os.cpu_count() or 2, 64), "pdf_parse": (os.cpu_count() or 2, 64)}
+POOLS: Dict[str, Pool] = {
+    name: Pool(name, _env_int(f"ADMISSION_{name.upper()}_CONCURRENCY", limit),
+               _env_int(f"ADMISSION_{name.upper()}_QUEUE", queue))
+    for name, (limit, queue) in _POOL_DEFAULTS.items()
+}
+_NOOP = nullcontext()
+
+
+def slot(name: str):
+    """Contexte asynchrone occupant une place du pool global `name`."""
+    return _held(POOLS[name]) if ENABLED else _NOOP
+
+
+# --- Quotas par clé API
+
+def _parse_key_limits(value: Optional[str]) -> Dict[str, Tuple[int, float]]:
+    """« sk-a=32/3000,sk-b=2/60 » → {clé: (requêtes simultanées, requêtes/minute)}."""
+    limits = {}
+    for item in (value or "").split(","):
+        key, _, spec = item.strip().partition("=")
+        if key and spec:
+            concurrency, _, rpm = spec.partition("/")
+            limits[key] = (int(concurrency), float(rpm or 0))
+    return limits
+
+
+KEY_CONCURRENCY = _env_int("ADMISSION_KEY_CONCURRENCY", 8)
+KEY_QUEUE = _env_int("ADMISSION_KEY_QUEUE", 32)
+KEY_RPM = float(os.getenv("ADMISSION_KEY_RPM", "600"))
+KEY_LIMITS = _parse_key_limits(os.getenv("ADMISSION_KEY_LIMITS"))
+MAX_CLIENTS = 10_000  # au-delà, les quotas inactifs puis les plus anciens sont oubliés
+
+
+class ClientQuota:
+    __slots__ = ("pool", "bucket")
+
+    def __init__(self, concurrency: int, rpm: float):
+        # Pool nommé « client » : les métriques agrègent toutes les clés
+        self.pool = Pool("client", concurrency, KEY_QUEUE)
+        self.bucket = TokenBucket(rpm) if rpm > 0 else None
+
+    def idle(self) -> bool:
+        return self.pool.active == 0 and not self.pool.waiters
+
+    def take_token(self):
+        if self.bucket is None:
+            return
+        wait = self.bucket.wait_time(1)
+        if wait > 0:
+            if metrics.ADMISSION_SHED is not None:
+                metrics.ADMISSION_SHED.labels("client", "rate").inc()
+            raise HTTPException(429, "Quota de requêtes par minute atteint",
+                                headers={"Retry-After": str(max(1, math.ceil(wait)))})
+        self.bucket.level -= 1
+
+
+_clients: Dict[str, ClientQuota] = {}
+
+
+def client_quota(api_key: str) -> ClientQuota:
+    quota = _clients.get(api_key)
+    if quota is None:
+        if len(_clients) >= MAX_CLIENTS:
+            for key in [k for k, q in _clients.items() if q.idle()]:
+                del _clients[key]
+            # Aucune clé inactive : les plus anciennes sont oubliées. Leurs requêtes
+            # en cours libèrent leur place sur l'ancien quota, sans effet sur le nouveau.
+            while len(_clients) >= MAX_CLIENTS:
+                del _clients[next(iter(_clients))]
+        quota = _clients[api_key] = ClientQuota(*KEY_LIMITS.get(api_key, (KEY_CONCURRENCY, KEY_RPM)))
+    return quota
+
+
+def internal_headers() -> dict:
+    """En-têtes des appels d'un service Hireform à un autre (hors quota de la clé)."""
+    return {INTERNAL_HEADER: _token().decode()}
+
+
+def is_internal(headers: Mapping[str, str]) -> bool:
+    token = headers.get(INTERNAL_HEADER)
+    return bool(token) and secrets.compare_digest(token.encode(), _token())
+
+
+async def require_internal(request: Request) -> None:
+    """
+    Dépendance des routes d'exploitation (statistiques internes) : réservées
+    aux porteurs du jeton interne, 403 sinon, même si ADMISSION=0.
+    """
+    if not is_internal(request.headers):
+        raise HTTPException(status_code=403, detail="Route réservée aux appels internes")
+
+
+@asynccontextmanager
+async def admit_client(api_key: str, headers: Mapping[str, str]):
+    """Admet une requête sous le quota de `api_key` (débit puis concurrence)."""
+    if not ENABLED or is_internal(headers):
+        yield
+        return
+    quota = client_quota(api_key)
+    quota.take_token()
+    async with _held(quota.pool):
+        yield
@@ -0,0 +1,205 @@
+"""
+Représentation compacte d'un CV, normalisée une fois pour plusieurs analyses.
+
+    cv = compact_cv(payload)                  # une passe sur le JSON
+    career_gaps(cv.timeline, 3)               # trous de carrière
+    retention_features(cv, esco_labels)       # features du modèle de rétention
+    anonymize(cv)                             # copie anonymisée du JSON d'origine
+
+Accepte la forme produite par /extract-cv/ (`personal_information`,
+`education[].institution`, compétences par catégorie) comme la forme plate
+d'/anonymize-cv/ (`name`, `email`, `education[].school`, liste de compétences).
+
+Chaque poste devient un `Position` à slots dont les dates sont parsées au
+chargement : index de mois (année × 12 + mois, pour les trous de carrière) et
+ordinal du jour (pour les durées en jours / 30 du modèle de rétention).
+"YYYY-MM" passe par un chemin rapide, les autres formats par dateutil (mois et
+jour absents → 1er janvier / 1er du mois) ; une fin vide ou « présent »
+vaut aujourd'hui, un début absent laisse le poste non daté.
+"""
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+BREAK_MONTHS = 3          # pause comptée au-delà de 3 mois (modèle de rétention)
+DAYS_PER_MONTH = 30
+
+NAME_MASK = "[Nom masqué]"
+EMAIL_MASK = "[Email masqué]"
+PHONE_MASK = "[Téléphone masqué]"
+SCHOOL_MASK = "[École masquée]"
+
+ONGOING = frozenset({"", "present", "présent", "aujourd'hui", "à ce jour", "en cours", "actuel",
+                     "current", "now", "today"})
+
+_YEAR_MONTH = re.compile(r"\s*(\d{4})-(\d{1,2})\s*$")
+_DEFAULT_DAY = datetime(2000, 1, 1)
+
+
+class Position:
+    __slots__ = ("company", "role", "start_date", "end_date", "start_month", "end_month", "start_day", "end_day")
+
+    def __init__(self, company, role, start_date, end_date):
+        self.company = company
+        self.role = role
+        self.start_date = start_date
+        self.end_date = end_date
+        start = parse_month(start_date) if start_date else None
+        end = parse_month(end_date, ongoing=True) if start is not None else None
+        self.start_month, self.start_day = start or (None, None)
+        self.end_month, self.end_day = end or (None, None)
+
+
+class CompactCV:
+    __slots__ = ("source", "name", "positions", "timeline", "skills")
+
+    def __init__(self, source: dict, name: Optional[str], positions: List[Position], skills):
+        self.source = source
+        self.name = name
+        self.positions = positions
+        # Postes datés, du plus ancien au plus récent
+        self.timeline = sorted((p for p in positions if p.start_month is not None), key=lambda p: p.start_day)
+        self.skills = skills
+
+
+def parse_month(value, ongoing: bool = False) -> Tuple[int, int]:
+    """(index de mois, ordinal du jour) d'une date de CV ; ValueError si illisible."""
+    if not isinstance(value, str):
+        if value is None and ongoing:
+            value = ""
+        else:
+            raise ValueError(f"Format invalide pour la date : {value!r}")
+    match = _YEAR_MONTH.match(value)
+    if match:
+        year, month = int(match.group(1)), int(match.group(2))
+        if 1 <= month <= 12:
+            return year * 12 + month, date(year, month, 1).toordinal()
+    elif ongoing and value.strip().lower() in ONGOING:
+        today = date.today()
+        return today.year * 12 + today.month, today.toordinal()
+    try:
+        from dateutil.parser import parse as parse_date
+
+        parsed = parse_date(value, default=_DEFAULT_DAY)
+    except (ValueError, OverflowError):
+        raise ValueError(f"Format invalide pour la date : {value}")
+    return parsed.year * 12 + parsed.month, parsed.toordinal()
+
+
+def parse_year_month(value) -> int:
+    """Index de mois d'une date stricte "YYYY-MM" (contrat d'/analyze-gaps/) ; ValueError sinon."""
+    match = _YEAR_MONTH.match(value) if isinstance(value, str) else None
+    if match is None or value != value.strip() or not 1 <= int(match.group(2)) <= 12:
+        raise ValueError(f"Format invalide pour la date : {value}")
+    return int(match.group(1)) * 12 + int(match.group(2))
+
+
+def compact_cv(cv: dict) -> CompactCV:
+    """Normalise un CV JSON ; ValueError si la structure ou une date est illisible."""
+    if not isinstance(cv, dict):
+        raise ValueError("Le CV doit être un objet JSON")
+    personal = cv.get("personal_information")
+    name = (personal if isinstance(personal, dict) else cv).get("name")
+
+    experience = cv.get("experience") or []
+    if not isinstance(experience, list):
+        raise ValueError("`experience` doit être une liste")
+    positions = []
+    for e in experience:
+        if not isinstance(e, dict):
+            raise ValueError("Chaque expérience doit être un objet JSON")
+        positions.append(Position(e.get("company"), e.get("role"), e.get("start_date"), e.get("end_date")))
+    return CompactCV(cv, name if isinstance(name, str) else None, positions, cv.get("skills") or [])
+
+
+# --- Trous de carrière (cf. analyze-gaps)
+def career_gaps(timeline: List[Position], threshold_months: int) -> list:
+    """
+    Interruptions de plus de `threshold_months` mois entre la fin d'un poste et
+    le début du suivant, du plus récent au plus ancien.
+    """
+    gaps = []
+    for older, newer in zip(timeline, timeline[1:]):
+        months_gap = newer.start_month - older.end_month
+        if months_gap > threshold_months:
+            gaps.append({
+                "start": older.end_date,
+                "end": newer.start_date,
+                "duration_months": months_gap,
+                "description": f"Inactivité de {months_gap} mois entre {month_label(older.end_month)} "
+                               f"et {month_label(newer.start_month)}",
+            })
+    gaps.reverse()
+    return gaps
+
+
+@lru_cache(maxsize=1024)
+def month_label(index: int) -> str:
+    """« janvier 2024 » (mois et année de la locale) pour un index de mois."""
+    year, month = divmod(index - 1, 12)
+    return date(year, month + 1, 1).strftime("%B %Y")
+
+
+# --- Features de rétention (cf. hireform.cv_features)
+def skill_labels(skills) -> List[str]:
+    """Libellés de compétences tels que lus par le modèle (clés si dict, éléments si liste)."""
+    if not skills:
+        return []
+    return [s for s in skills if isinstance(s, str)]
+
+
+def retention_features(cv: CompactCV, esco_labels) -> dict:
+    """
+    Features de rétention ; durées et pauses en jours / 30 sur les postes datés.
+    Lève ValueError si le CV n'a pas d'expérience datée.
+    """
+    timeline = cv.timeline
+    if not timeline:
+        raise ValueError("Pas d'expériences dans le CV")
+
+    durations = [(p.end_day - p.start_day) / DAYS_PER_MONTH for p in timeline]
+    breaks = sum(
+        1
+        for previous, current in zip(timeline, timeline[1:])
+        if (current.start_day - previous.end_day) / DAYS_PER_MONTH > BREAK_MONTHS
+    )
+    labels = skill_labels(cv.skills)
+    return {
+        "avg_tenure_months": sum(durations) / len(durations),
+        "num_positions": len(timeline),
+        "num_breaks": breaks,
+        "num_skills": len(cv.skills),
+        "esco_skills_mapped": sum(1 for s in labels if s.lower() in esco_labels),
+        "esco_titles_mapped": sum(
+            1 for p in cv.positions if isinstance(p.role, str) and p.role.lower() in esco_labels
+        ),
+    }
+
+
+# --- Anonymisation (cf. anonymize-cv)
+def mask_name(name: Optional[str]) -> str:
+    """Initiale du prénom + 2 lettres du nom (ex. "Sarah Khelifi" → "SKh")."""
+    parts = name.strip().split() if name else []
+    if len(parts) >= 2:
+        return parts[0][0] + parts[-1][:2]
+    return NAME_MASK
+
+
+def anonymize(cv: CompactCV) -> dict:
+    """Copie du JSON d'origine, identité et écoles masquées ; l'original n'est pas modifié."""
+    masked = {"name": mask_name(cv.name), "email": EMAIL_MASK, "phone": PHONE_MASK, "photo": None}
+    out = dict(cv.source)
+    personal = out.get("personal_information")
+    if isinstance(personal, dict):
+        out["personal_information"] = {**personal, **masked}
+    else:
+        out.update(masked)
+
+    education = out.get("education")
+    if isinstance(education, list):
+        out["education"] = [
+            {**e, **{k: SCHOOL_MASK for k in ("school", "institution") if k in e}} if isinstance(e, dict) else e
+            for e in education
+        ]
+    return out
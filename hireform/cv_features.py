@@ -0,0 +1,169 @@
+"""
+Features des CV partagées entre l'API de rétention et le scoring hors ligne.
+
+Deux implémentations d'une même définition :
+- `retention_features` : un CV (dict) à la fois, pour l'endpoint HTTP
+  (sur la représentation compacte de hireform.cv_compact, comme /analyze-cv/) ;
+- `chunk_features` : un lot de CV en colonnes (pandas), pour le scoring en masse.
+
+Toute modification d'une feature doit être reportée dans les deux.
+tests/test_cv_features.py vérifie qu'elles donnent les mêmes valeurs.
+
+Règles de dates communes (cf. hireform.cv_compact) : une fin absente, vide ou
+« présent » (ONGOING) vaut aujourd'hui, un poste sans début n'est pas daté et
+ne compte que pour les intitulés ESCO. Seule différence : une date illisible
+fait échouer l'appel unitaire (ValueError → 400), alors que le lot écarte le
+poste.
+"""
+import numpy as np
+import pandas as pd
+
+from hireform import cv_compact
+from hireform.cv_compact import BREAK_MONTHS, DAYS_PER_MONTH, ONGOING, skill_labels
+
+# Ordre des colonnes attendu par cv_retention_model.pkl
+FEATURE_COLUMNS = [
+    "avg_tenure_months",
+    "num_positions",
+    "num_breaks",
+    "num_skills",
+    "esco_skills_mapped",
+    "esco_titles_mapped",
+]
+
+
+# --- Référentiel ESCO
+def load_esco_labels() -> frozenset:
+    """
+    Ensemble des libellés ESCO (minuscules), équivalent à `LocalDB.search_products`
+    pour une recherche exacte, mais en O(1) par libellé.
+    """
+    from esco import LocalDB
+
+    db = LocalDB()
+    return frozenset().union(*db.skills.allLabel)
+
+
+def normalize_skills(skills) -> list:
+    """
+    Ramène `skills` à la forme JSON d'origine quelle que soit la source :
+    les structs Parquet ajoutent des clés à None, les maps deviennent des tuples.
+    """
+    if isinstance(skills, dict):
+        return [k for k, v in skills.items() if v is not None]
+    if isinstance(skills, (list, tuple, np.ndarray)):
+        return [s[0] if isinstance(s, tuple) else s for s in skills]
+    return []
+
+
+# --- Version unitaire (un CV)
+def retention_features(cv: dict, esco_labels) -> dict:
+    """
+    Calcule les features de rétention d'un CV extrait (cf. hireform.cv_compact).
+    Lève ValueError si le CV n'a pas d'expérience exploitable.
+    """
+    return cv_compact.retention_features(cv_compact.compact_cv(cv), esco_labels)
+
+
+# --- Version colonnaire (un lot de CV)
+def parse_dates(values: pd.Series, ongoing: bool = False) -> pd.Series:
+    """
+    Parse vectorisé : format "YYYY-MM" en chemin rapide, formats libres ensuite.
+    Les dates illisibles deviennent NaT ; avec `ongoing`, une date absente, vide
+    ou « présent » vaut aujourd'hui (fin d'un poste en cours).
+    """
+    values = values.astype("string")
+    parsed = pd.to_datetime(values, format="%Y-%m", errors="coerce")
+    current = pd.Series(False, index=values.index)
+    if ongoing:
+        current = values.isna() | values.str.strip().str.lower().isin(ONGOING).fillna(False).astype(bool)
+        parsed[current] = pd.Timestamp.today().normalize()
+    missing = parsed.isna() & values.notna() & ~current
+    if missing.any():
+        parsed[missing] = pd.to_datetime(values[missing], format="mixed", errors="coerce")
+    return parsed
+
+
+def explode_experiences(experience: pd.Series) -> pd.DataFrame:
+    """
+    Aplatit la colonne `experience` (liste de dicts par CV) en une ligne par poste.
+    La colonne `cv` porte la position du CV dans le lot.
+    """
+    exploded = experience.reset_index(drop=True).explode().dropna()
+    records = [e if isinstance(e, dict) else {} for e in exploded]
+    return pd.DataFrame({
+        "cv": exploded.index.to_numpy(),
+        "role": pd.Series([r.get("role") for r in records], dtype="string"),
+        "start": parse_dates(pd.Series([r.get("start_date") for r in records], dtype="object")),
+        "end": parse_dates(pd.Series([r.get("end_date") for r in records], dtype="object"), ongoing=True),
+    })
+
+
+def _count_in_esco(labels: pd.Series, owners: np.ndarray, n: int, esco_labels) -> np.ndarray:
+    """Compte, par CV, les libellés présents dans ESCO (chaque libellé unique n'est testé qu'une fois)."""
+    if labels.empty:
+        return np.zeros(n, dtype=np.int64)
+    lowered = labels.str.lower()
+    uniques = lowered.dropna().unique()
+    known = {u for u in uniques if u in esco_labels}
+    hits = lowered.isin(known).to_numpy(dtype=bool)
+    return np.bincount(owners[hits], minlength=n)
+
+
+def chunk_features(chunk: pd.DataFrame, esco_labels, gap_threshold: int = 3) -> pd.DataFrame:
+    """
+    Features de rétention et de trous de carrière pour un lot de CV.
+
+    Reprend `retention_features` (rétention) et `detect_career_gaps` d'analyze-gaps
+    (trous > `gap_threshold` mois entre deux postes consécutifs).
+    Les CV sans expérience datée ont des features NaN.
+    """
+    n = len(chunk)
+    experience = chunk["experience"] if "experience" in chunk else pd.Series([None] * n)
+    exp = explode_experiences(experience)
+    owners = exp["cv"].to_numpy()
+
+    # Titres ESCO : tous les postes, datés ou non, comme l'endpoint
+    esco_titles = _count_in_esco(exp["role"].fillna(""), owners, n, esco_labels)
+
+    dated = exp.dropna(subset=["start", "end"]).sort_values(["cv", "start"], kind="stable")
+    durations = (dated["end"] - dated["start"]).dt.days / DAYS_PER_MONTH
+    grouped = durations.groupby(dated["cv"])
+
+    prev_end = dated.groupby("cv")["end"].shift()
+    break_months = (dated["start"] - prev_end).dt.days / DAYS_PER_MONTH
+    is_break = (break_months > BREAK_MONTHS).groupby(dated["cv"]).sum()
+
+    month_index = lambda s: s.dt.year * 12 + s.dt.month
+    gap_months = month_index(dated["start"]) - month_index(prev_end)
+    gaps = gap_months.where(gap_months > gap_threshold)
+    gap_groups = gaps.groupby(dated["cv"])
+
+    skills = chunk["skills"] if "skills" in chunk else pd.Series([None] * n)
+    skills = skills.reset_index(drop=True).map(normalize_skills)
+    num_skills = skills.map(len).to_numpy()
+    labels = skills.map(skill_labels).explode().dropna()
+    esco_skills = _count_in_esco(
+        labels.astype("string"), labels.index.to_numpy(dtype=np.int64), n, esco_labels
+    )
+
+    index = pd.RangeIndex(n)
+    out = pd.DataFrame({
+        "avg_tenure_months": grouped.mean().reindex(index),
+        "num_positions": grouped.size().reindex(index),
+        "num_breaks": is_break.reindex(index),
+        "num_skills": num_skills,
+        "esco_skills_mapped": esco_skills,
+        "esco_titles_mapped": esco_titles,
+        "num_career_gaps": gap_groups.count().reindex(index),
+        "max_gap_months": gap_groups.max().reindex(index),
+    }, index=index)
+    has_exp = out["num_positions"].notna()
+    out.loc[has_exp, "num_career_gaps"] = out.loc[has_exp, "num_career_gaps"].fillna(0)
+    out.loc[has_exp, "max_gap_months"] = out.loc[has_exp, "max_gap_months"].fillna(0)
+    return out
+
+
+def feature_matrix(features: pd.DataFrame) -> np.ndarray:
+    """Matrice (n, 6) dans l'ordre attendu par le modèle."""
+    return features[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
@@ -0,0 +1,64 @@
+"""
+Index compact des libellés ESCO, partageable entre workers.
+
+Les libellés sont réduits à des empreintes 64 bits triées dans un fichier .npy,
+ouvert avec `np.load(mmap_mode="r")` : les pages sont partagées par le cache
+du système entre tous les processus qui l'ouvrent (et copy-on-write après fork),
+au lieu d'un DataFrame pandas par worker.
+"""
+import hashlib
+import os
+import tempfile
+from typing import Iterable
+
+import numpy as np
+
+DEFAULT_PATH = os.getenv("ESCO_INDEX_PATH", "esco_labels.npy")
+
+
+def label_hash(label: str) -> int:
+    """Empreinte 64 bits stable d'un libellé (déjà normalisé en minuscules)."""
+    return int.from_bytes(hashlib.blake2b(label.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class EscoIndex:
+    """Test d'appartenance exact d'un libellé à ESCO, sur un tableau trié mmappé."""
+
+    def __init__(self, hashes: np.ndarray):
+        self.hashes = hashes
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def __contains__(self, label: str) -> bool:
+        h = np.uint64(label_hash(label))
+        i = int(np.searchsorted(self.hashes, h))
+        return i < len(self.hashes) and self.hashes[i] == h
+
+    def isin(self, labels: Iterable[str]) -> np.ndarray:
+        """Version vectorisée de `in` pour un lot de libellés."""
+        h = np.fromiter((label_hash(l) for l in labels), dtype=np.uint64)
+        i = np.searchsorted(self.hashes, h)
+        found = i < len(self.hashes)
+        found[found] = self.hashes[i[found]] == h[found]
+        return found
+
+    @classmethod
+    def from_labels(cls, labels: Iterable[str]) -> "EscoIndex":
+        return cls(np.unique(np.fromiter((label_hash(l) for l in labels), dtype=np.uint64)))
+
+    def save(self, path: str = DEFAULT_PATH):
+        # Écriture atomique : les workers qui ouvrent le fichier ne le voient jamais à moitié écrit
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".npy")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, self.hashes)
+        os.replace(tmp, path)
+
+    @classmethod
+    def open(cls, path: str = DEFAULT_PATH) -> "EscoIndex":
+        """Ouvre l'index en mémoire partagée, en le construisant depuis `esco` s'il n'existe pas."""
+        if not os.path.exists(path):
+            from hireform.cv_features import load_esco_labels
+
+            cls.from_labels(load_esco_labels()).save(path)
+        return cls(np.load(path, mmap_mode="r"))
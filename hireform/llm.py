@@ -0,0 +1,114 @@
+"""
+Clients OpenAI asynchrones partagés.
+
+Les services reçoivent la clé OpenAI de l'appelant à chaque requête ; on garde
+un client (et donc un pool de connexions HTTP keep-alive) par clé plutôt que
+d'en recréer un à chaque appel. Le SDK openai n'est importé qu'au premier appel.
+
+Au plus OPENAI_CLIENTS_MAX clients (64), les moins récemment utilisés sortent
+en premier. Un client évincé est fermé (pool et sockets libérés) après
+CLOSE_GRACE_S, le temps que ses requêtes en cours se terminent ;
+`close_openai_clients()` ferme tout à l'arrêt.
+
+`complete_json` encadre les appels dont la réponse est un JSON : place du pool
+`llm`, validation par un schéma compilé (hireform.validation) et une seule
+relance ciblée si la sortie reste invalide après réparation.
+"""
+import asyncio
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from hireform.admission import slot
+from hireform.metrics import record_llm_usage, stage
+from hireform.validation import InvalidOutput, parse_llm_json
+
+logger = logging.getLogger(__name__)
+
+REASK = (
+    "Ta réponse précédente ne respecte pas le format demandé :\n{errors}\n"
+    "Renvoie la réponse complète corrigée, uniquement le JSON, sans commentaire."
+)
+
+
+OPENAI_CLIENTS_MAX = int(os.getenv("OPENAI_CLIENTS_MAX", "64"))
+CLOSE_GRACE_S = 600.0  # délai par défaut d'une requête du SDK
+
+_clients: OrderedDict = OrderedDict()
+_closing: dict = {}  # fermeture différée → client évincé
+
+
+def get_openai_client(api_key: str):
+    client = _clients.get(api_key)
+    if client is not None and not client.is_closed():
+        _clients.move_to_end(api_key)
+        return client
+    from openai import AsyncOpenAI
+
+    client = _clients[api_key] = AsyncOpenAI(api_key=api_key)
+    _clients.move_to_end(api_key)
+    while len(_clients) > OPENAI_CLIENTS_MAX:
+        _close_later(_clients.popitem(last=False)[1])
+    return client
+
+
+def _close_later(client):
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # hors boucle : aucune requête n'a pu ouvrir de connexion
+    task = loop.create_task(_close_after_grace(client))
+    _closing[task] = client
+    task.add_done_callback(lambda t: _closing.pop(t, None))
+
+
+async def _close_after_grace(client):
+    await asyncio.sleep(CLOSE_GRACE_S)
+    await client.close()
+
+
+async def close_openai_clients():
+    """Ferme les clients en cache et ceux dont la fermeture était différée."""
+    clients = [*_clients.values(), *_closing.values()]
+    _clients.clear()
+    for task in list(_closing):
+        task.cancel()
+    _closing.clear()
+    for client in clients:
+        if not client.is_closed():
+            await client.close()
+
+
+async def complete_json(client, validate: Callable, *, model: str, messages: list,
+                        function: Optional[dict] = None, **kwargs):
+    """
+    Réponse JSON validée de `client.chat.completions.create`. Le JSON est lu dans
+    le contenu du message, ou dans les arguments de `function` (function calling).
+    Sortie invalide → une relance avec la liste des erreurs, puis InvalidOutput.
+    Les erreurs de l'API remontent telles quelles.
+    """
+    if function is not None:
+        kwargs.update(functions=[function], function_call={"name": function["name"]})
+    for attempt in range(2):
+        async with slot("llm"):
+            with stage("llm" if attempt == 0 else "llm_reask"):
+                response = await client.chat.completions.create(model=model, messages=messages, **kwargs)
+        record_llm_usage(model, response.usage)
+        message = response.choices[0].message
+        raw = getattr(message.function_call, "arguments", None) if function is not None else message.content
+        try:
+            with stage("validate"):
+                return validate(parse_llm_json(raw))
+        except InvalidOutput as e:
+            if attempt:
+                raise
+            logger.warning("Sortie %s invalide, relance : %s", model, e)
+            if function is not None:
+                previous = {"role": "assistant", "content": None,
+                            "function_call": {"name": function["name"], "arguments": raw or ""}}
+            else:
+                previous = {"role": "assistant", "content": raw if isinstance(raw, str) else json.dumps(raw)}
+            errors = "\n".join(f"- {error}" for error in e.errors)
+            messages = [*messages, previous, {"role": "user", "content": REASK.format(errors=errors)}]
@@ -0,0 +1,240 @@
+"""
+Journalisation commune des services.
+
+Enregistrements JSON écrits par un thread dédié (QueueHandler → QueueListener),
+formatage paresseux, échantillonnage par logger et masquage des clés API et
+données personnelles.
+
+    configure_logging()                  # point d'entrée (CLI, gateway)
+    configure_logging_on_startup(app)    # app autonome d'un service
+    logger = logging.getLogger(__name__)
+    logger.debug("CV extrait", extra={"cv": data})   # sérialisé seulement si émis
+
+Le thread appelant crée l'enregistrement et le met en file, rien de plus :
+interpolation `%` du message, masquage, sérialisation JSON et écriture ont lieu
+dans le thread du listener. Les données passées dans `extra` ne doivent donc
+plus être modifiées après l'appel.
+
+Variables :
+    HIREFORM_LOG_LEVEL   niveau racine (INFO)
+    HIREFORM_LOG_FORMAT  json | text (json)
+    HIREFORM_LOG_SAMPLE  part des enregistrements DEBUG conservés par logger,
+                         ex. « main=0.01,translate-cv=0.1 », « * » pour les autres
+    HIREFORM_LOG_REDACT  1 | 0 (1)
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# Attributs standard d'un LogRecord (et doublon coloré d'uvicorn) : tout le reste vient de `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName",
+                                                                            "color_message"}
+
+SENSITIVE_KEYS = {"api_key", "api-key", "apikey", "authorization", "x-openai-key", "openai_key",
+                  "password", "email", "phone", "name"}
+# (indices, sonde, motif, remplacement) : le motif ne s'applique qu'aux chaînes
+# qui contiennent l'un des indices, test bien moins coûteux que la regex
+# elle-même. Quand l'indice est trop fréquent (« 0 » est dans presque tous les
+# messages : dates, durées, codes HTTP), une sonde plus stricte mais encore
+# bon marché (préfixe littéral) écarte le reste avant le motif complet.
+_RULES = [
+    (("sk-",), None, re.compile(r"\bsk-[A-Za-z0-9_\-]{3,}"), "sk-***"),
+    (("Bearer", "bearer", "DeepL"), None, re.compile(r"\b(DeepL-Auth-Key|[Bb]earer)\s+\S+"), r"\1 ***"),
+    (("@",), None, re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+"), "[email]"),
+    (("+", "0"), re.compile(r"\+\d|0[1-9][ .-]?\d\d[ .-]?\d\d"),
+     re.compile(r"\+\d{1,3}(?:[ .-]?\d{1,4}){3,5}\b|\b0\d(?:[ .-]?\d{2}){4}\b"), "[téléphone]"),
+]
+REDACTED = "[masqué]"
+
+
+def redact(value):
+    """Copie de `value` sans clés API, e-mails, téléphones ni champs sensibles."""
+    if isinstance(value, str):
+        for hints, probe, pattern, replacement in _RULES:
+            if any(h in value for h in hints) and (probe is None or probe.search(value)):
+                value = pattern.sub(replacement, value)
+        return value
+    if isinstance(value, dict):
+        return {k: REDACTED if str(k).lower() in SENSITIVE_KEYS else redact(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value]
+    return value
+
+
+def _extra(record: logging.LogRecord) -> dict:
+    return {k: v for k, v in record.__dict__.items() if k not in _RECORD_ATTRS}
+
+
+class JsonFormatter(logging.Formatter):
+    def __init__(self, redact_values: bool = True):
+        super().__init__()
+        self.redact_values = redact_values
+
+    def format(self, record: logging.LogRecord) -> str:
+        message, extra = record.getMessage(), _extra(record)
+        if self.redact_values:
+            message, extra = redact(message), redact(extra)
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": message,
+        }
+        for key, value in extra.items():
+            entry.setdefault(key, value)
+        if record.exc_info:
+            # les messages d'erreur amont peuvent citer la clé (« Incorrect API key provided: sk-… »)
+            exc = self.formatException(record.exc_info)
+            entry["exc"] = redact(exc) if self.redact_values else exc
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Format lisible pour le développement ; champs `extra` en JSON en fin de ligne."""
+
+    def __init__(self, redact_values: bool = True):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+        self.redact_values = redact_values
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extra = _extra(record)
+        if extra:
+            line += " " + json.dumps(redact(extra) if self.redact_values else extra, ensure_ascii=False, default=str)
+        return redact(line) if self.redact_values else line
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Conserve une part des enregistrements verbeux (≤ `max_level`) par logger.
+    Taux du logger ou de son ancêtre le plus proche, sinon « * », sinon 1.
+    """
+
+    def __init__(self, rates: Dict[str, float], max_level: int = logging.DEBUG):
+        super().__init__()
+        self.rates = rates
+        self.max_level = max_level
+        self._resolved: Dict[str, float] = {}
+
+    def rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            parts = name.split(".")
+            candidates = [".".join(parts[:i]) for i in range(len(parts), 0, -1)] + ["*"]
+            rate = next((self.rates[c] for c in candidates if c in self.rates), 1.0)
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        rate = self.rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+def parse_sample_rates(value: Optional[str]) -> Dict[str, float]:
+    """« main=0.01,*=0.5 » → {"main": 0.01, "*": 0.5}."""
+    rates = {}
+    for item in (value or "").split(","):
+        name, _, rate = item.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+class _DeferredQueueHandler(QueueHandler):
+    # QueueHandler.prepare() formate le message dans le thread appelant : ici
+    # l'enregistrement part tel quel, le listener s'occupe du formatage
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_listener: Optional[QueueListener] = None
+_settings: dict = {}
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None, sample: Optional[str] = None,
+                      redact_values: Optional[bool] = None, stream=None) -> QueueListener:
+    """
+    Installe le pipeline sur le logger racine (une seule fois par processus ;
+    les appels suivants sont sans effet). Les loggers d'uvicorn y sont
+    redirigés. Renvoie le QueueListener.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+    _settings.update(level=level, fmt=fmt, sample=sample, redact_values=redact_values, stream=stream)
+
+    level = (level or os.getenv("HIREFORM_LOG_LEVEL", "INFO")).upper()
+    fmt = fmt or os.getenv("HIREFORM_LOG_FORMAT", "json")
+    if redact_values is None:
+        redact_values = os.getenv("HIREFORM_LOG_REDACT", "1") != "0"
+    rates = parse_sample_rates(sample if sample is not None else os.getenv("HIREFORM_LOG_SAMPLE"))
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter(redact_values) if fmt == "json" else TextFormatter(redact_values))
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    handler = _DeferredQueueHandler(records)
+    if rates:
+        handler.addFilter(SamplingFilter(rates))
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+    _listener = QueueListener(records, output)
+    _listener.start()
+    return _listener
+
+
+def configure_logging_on_startup(app, **settings):
+    """
+    Installe le pipeline au démarrage de `app` (lifespan), pas à l'import :
+    importer un service comme bibliothèque (bulk-generate-offer, analyze-cv →
+    predict-cv-retention, tests) laisse le logger racine intact. Sans effet si
+    le logger racine a déjà des handlers (`basicConfig` d'un script, gateway).
+    """
+    lifespan_context = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app_):
+        if not logging.getLogger().handlers:
+            configure_logging(**settings)
+        async with lifespan_context(app_) as state:
+            yield state
+
+    app.router.lifespan_context = lifespan
+
+
+def stop_logging():
+    """Vide la file et arrête le thread d'écriture."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_after_fork():
+    # Le thread du listener ne survit pas au fork (gunicorn --preload) :
+    # chaque worker reconstruit son pipeline avec les mêmes réglages
+    global _listener
+    if _listener is not None:
+        _listener = None
+        configure_logging(**_settings)
+
+
+atexit.register(stop_logging)
+os.register_at_fork(after_in_child=_restart_after_fork)
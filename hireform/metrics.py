@@ -0,0 +1,224 @@
+"""
+Instrumentation des services : durée de chaque étape d'une requête.
+
+    with stage("pdf_parse"):
+        raw_text = extract_text_columns(path)
+
+    @timed("docx_render")
+    def render(...): ...
+
+Chaque étape est ajoutée à l'en-tête `Server-Timing` de la requête en cours
+et observée dans l'histogramme Prometheus `hireform_stage_seconds`
+(étiquettes endpoint = chemin de la route, stage). `record_llm_usage` compte
+les tokens consommés par endpoint et modèle ; les jauges et compteurs
+`hireform_admission_*` sont tenus par hireform.admission. `/metrics` expose le tout.
+
+HIREFORM_METRICS=0 désactive l'instrumentation : `stage` renvoie un contexte
+vide partagé, `timed` renvoie la fonction telle quelle et `instrument` ne
+monte ni middleware ni route. prometheus_client est optionnel : sans lui,
+seul l'en-tête Server-Timing est produit.
+"""
+import functools
+import inspect
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse, Response
+
+try:
+    import prometheus_client
+except ImportError:  # dépendance optionnelle
+    prometheus_client = None
+
+ENABLED = os.getenv("HIREFORM_METRICS", "1") != "0"
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+STAGE_SECONDS = REQUEST_SECONDS = LLM_TOKENS = None
+ADMISSION_ACTIVE = ADMISSION_QUEUED = ADMISSION_SHED = None
+if ENABLED and prometheus_client is not None:
+    STAGE_SECONDS = prometheus_client.Histogram(
+        "hireform_stage_seconds", "Durée des étapes de traitement",
+        ["endpoint", "stage"], buckets=BUCKETS,
+    )
+    REQUEST_SECONDS = prometheus_client.Histogram(
+        "hireform_request_seconds", "Durée des requêtes HTTP (jusqu'aux en-têtes de réponse)",
+        ["endpoint", "method", "status"], buckets=BUCKETS,
+    )
+    LLM_TOKENS = prometheus_client.Counter(
+        "hireform_llm_tokens", "Tokens consommés par les appels LLM",
+        ["endpoint", "model", "kind"],
+    )
+    # Contrôle d'admission (hireform.admission) : pool = llm, pdf_convert,
+    # pdf_parse ou client (somme des quotas par clé)
+    ADMISSION_ACTIVE = prometheus_client.Gauge(
+        "hireform_admission_active", "Traitements admis en cours", ["pool"], multiprocess_mode="livesum",
+    )
+    ADMISSION_QUEUED = prometheus_client.Gauge(
+        "hireform_admission_queued", "Traitements en file d'attente", ["pool"], multiprocess_mode="livesum",
+    )
+    ADMISSION_SHED = prometheus_client.Counter(
+        "hireform_admission_shed", "Requêtes refusées (429/503)", ["pool", "reason"],
+    )
+
+
+class _RequestTimings:
+    __slots__ = ("scope", "stages")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.stages = []  # (nom, secondes), dans l'ordre de fin
+
+
+_current: ContextVar[Optional[_RequestTimings]] = ContextVar("hireform_request_timings", default=None)
+_NOOP = nullcontext()
+
+
+def _endpoint(timings: Optional[_RequestTimings]) -> str:
+    # Chemin de la route (/translate-cv/) plutôt que l'URL : cardinalité bornée
+    if timings is None:
+        return "none"
+    return getattr(timings.scope.get("route"), "path", "unmatched")
+
+
+def _observe(name: str, seconds: float):
+    timings = _current.get()
+    if timings is not None:
+        timings.stages.append((name, seconds))
+    if STAGE_SECONDS is not None:
+        STAGE_SECONDS.labels(_endpoint(timings), name).observe(seconds)
+
+
+@contextmanager
+def _stage(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _observe(name, time.perf_counter() - start)
+
+
+def stage(name: str):
+    """Contexte mesurant l'étape `name` (utilisable autour de code async)."""
+    return _stage(name) if ENABLED else _NOOP
+
+
+def timed(name: str):
+    """Décorateur équivalent à `with stage(name)` autour de la fonction (sync ou async)."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with _stage(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def merge_server_timing(header: Optional[str], prefix: str):
+    """
+    Reprend le Server-Timing d'une réponse amont (ex. /extract-cv/ appelé par
+    /transform-cv/) dans la requête en cours, étapes préfixées. Pas
+    d'histogramme : le service amont a déjà observé ses étapes.
+    """
+    timings = _current.get()
+    if not ENABLED or timings is None or not header:
+        return
+    for entry in header.split(","):
+        name, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "dur":
+                try:
+                    timings.stages.append((f"{prefix}.{name}", float(value) / 1000))
+                except ValueError:
+                    pass
+
+
+def record_llm_usage(model: str, usage):
+    """Compte les tokens d'une réponse OpenAI (`response.usage`) pour l'endpoint courant."""
+    if LLM_TOKENS is None or usage is None:
+        return
+    endpoint = _endpoint(_current.get())
+    LLM_TOKENS.labels(endpoint, model, "prompt").inc(getattr(usage, "prompt_tokens", 0) or 0)
+    LLM_TOKENS.labels(endpoint, model, "completion").inc(getattr(usage, "completion_tokens", 0) or 0)
+
+
+def _server_timing(stages, total: float) -> str:
+    durations = {}
+    for name, seconds in stages:  # étapes répétées : durées cumulées
+        durations[name] = durations.get(name, 0.0) + seconds
+    durations["total"] = total
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in durations.items())
+
+
+class ServerTimingMiddleware:
+    """Middleware ASGI : collecte des étapes, en-tête Server-Timing, durée des requêtes."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timings = _RequestTimings(scope)
+        token = _current.set(timings)
+        start = time.perf_counter()
+        status, elapsed = 500, None
+
+        async def send_with_timing(message):
+            nonlocal status, elapsed
+            if message["type"] == "http.response.start":
+                # Les étapes terminées après les en-têtes (streaming) ne sont
+                # que dans les histogrammes
+                status, elapsed = message["status"], time.perf_counter() - start
+                header = _server_timing(timings.stages, elapsed)
+                message = {**message, "headers": [*message.get("headers", []),
+                                                  (b"server-timing", header.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if REQUEST_SECONDS is not None:
+                REQUEST_SECONDS.labels(_endpoint(timings), scope["method"], str(status)).observe(
+                    elapsed if elapsed is not None else time.perf_counter() - start
+                )
+
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def metrics():
+    if prometheus_client is None:
+        return PlainTextResponse("prometheus_client non installé\n", status_code=501)
+    registry = prometheus_client.REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # Plusieurs workers gunicorn : agrégation des fichiers de chaque processus
+        from prometheus_client import multiprocess
+
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(prometheus_client.generate_latest(registry), media_type=prometheus_client.CONTENT_TYPE_LATEST)
+
+
+def instrument(app):
+    """Monte le middleware Server-Timing et /metrics sur `app` (rien si désactivé)."""
+    if ENABLED:
+        app.add_middleware(ServerTimingMiddleware)
+        app.include_router(metrics_router)
+    return app
@@ -0,0 +1,29 @@
+"""
+Chargement des modèles scikit-learn en mémoire partagée.
+
+`joblib.load(mmap_mode="r")` ne mappe que les tableaux numpy d'un dump non
+compressé : le .pkl d'origine est donc converti une fois en .joblib à côté,
+puis ouvert en lecture seule par chaque worker.
+"""
+import os
+
+import joblib
+
+
+def mmap_path(pkl_path: str) -> str:
+    return os.path.splitext(pkl_path)[0] + ".joblib"
+
+
+def convert_for_mmap(pkl_path: str) -> str:
+    """Convertit `pkl_path` en dump non compressé s'il est absent ou plus ancien."""
+    target = mmap_path(pkl_path)
+    if not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(pkl_path):
+        tmp = target + f".{os.getpid()}.tmp"
+        joblib.dump(joblib.load(pkl_path), tmp, compress=0)
+        os.replace(tmp, target)
+    return target
+
+
+def load_shared_model(pkl_path: str):
+    """Modèle dont les tableaux numpy sont mappés en lecture seule (partagés entre processus)."""
+    return joblib.load(convert_for_mmap(pkl_path), mmap_mode="r")
@@ -0,0 +1,175 @@
+"""
+Scoring local d'une annonce (mode `fast` de /predict-offer-perf/).
+
+Features déterministes calculées sur le JSON de l'annonce, puis modèle
+linéaire embarqué (offer_perf_model.json, ajustable avec
+calibrate-offer-perf.py). Même forme de réponse que le mode GPT-4.1.
+"""
+import json
+import math
+import os
+import re
+import unicodedata
+from typing import Dict, List
+
+MODEL_PATH = os.getenv(
+    "OFFER_PERF_MODEL_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "offer_perf_model.json"),
+)
+
+FEATURES = [
+    "title_words",
+    "title_in_range",
+    "has_salary",
+    "has_location",
+    "section_coverage",
+    "keyword_coverage",
+    "readability",
+    "log_words",
+    "has_cta",
+    "bullet_ratio",
+]
+
+# Sections recommandées par le prompt du mode complet : Contexte, Responsabilités, Avantages
+SECTIONS = {
+    "Contexte": ("contexte", "entreprise", "qui sommes-nous", "about", "context"),
+    "Responsabilités": ("responsabilit", "missions", "vos missions", "responsibilit", "tâches"),
+    "Avantages": ("avantages", "benefits", "nous offrons", "ce que nous offrons", "package"),
+}
+
+KEYWORDS = (
+    "télétravail", "salaire", "cdi", "avantages", "formation", "équipe", "évolution",
+    "mutuelle", "autonomie", "flexible", "rtt", "projet", "collaboration", "carrière",
+)
+
+CTA = ("postulez", "postuler", "candidatez", "envoyez votre", "apply", "rejoignez")
+
+SALARY_KEYS = {"salary", "basesalary", "salaire", "remuneration", "rémunération"}
+LOCATION_KEYS = {"location", "joblocation", "lieu", "addresslocality", "ville"}
+
+CATEGORIES = ((80, "Excellent"), (60, "Bon"), (40, "Moyen"), (0, "Faible"))
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_SENTENCE = re.compile(r"[.!?]+|\n")
+_VOWELS = re.compile(r"[aeiouyàâäéèêëîïôöùûü]+")
+
+
+# --- Extraction des features
+def _walk(obj, key=None):
+    """Itère sur (clé, valeur) de toutes les feuilles non vides du JSON."""
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            yield from _walk(v, k)
+    elif isinstance(obj, list):
+        for v in obj:
+            yield from _walk(v, key)
+    elif obj not in (None, ""):
+        yield (key or "").lower(), obj
+
+
+def _normalize(text: str) -> str:
+    return unicodedata.normalize("NFC", text.lower())
+
+
+def _readability(words: List[str], text: str) -> float:
+    """Flesch adapté au français (Kandel & Moles), ramené sur 0–1."""
+    if not words:
+        return 0.0
+    sentences = max(1, len([s for s in _SENTENCE.split(text) if s.strip()]))
+    syllables = sum(max(1, len(_VOWELS.findall(w))) for w in words)
+    score = 207 - 1.015 * (len(words) / sentences) - 73.6 * (syllables / len(words))
+    return min(max(score, 0.0), 100.0) / 100
+
+
+def extract_features(ad: dict) -> Dict[str, float]:
+    leaves = list(_walk(ad))
+    title = str(ad.get("title") or ad.get("titre") or "")
+    text = "\n".join(str(v) for _, v in leaves if isinstance(v, str))
+    norm = _normalize(text)
+    words = _WORD.findall(norm)
+    keys = {k for k, _ in leaves} | {k.lower() for k in ad.keys()}
+    lines = [l.strip() for l in text.splitlines() if l.strip()]
+
+    title_words = len(_WORD.findall(title))
+    return {
+        "title_words": float(title_words),
+        "title_in_range": 1.0 if 5 <= title_words <= 8 else 0.0,
+        "has_salary": 1.0 if keys & SALARY_KEYS or "€" in text else 0.0,
+        "has_location": 1.0 if keys & LOCATION_KEYS else 0.0,
+        "section_coverage": sum(
+            any(m in norm or m in keys for m in markers) for markers in SECTIONS.values()
+        ) / len(SECTIONS),
+        "keyword_coverage": sum(k in norm for k in KEYWORDS) / len(KEYWORDS),
+        "readability": _readability(words, text),
+        "log_words": math.log1p(len(words)),
+        "has_cta": 1.0 if any(c in norm for c in CTA) else 0.0,
+        "bullet_ratio": sum(l[0] in "-•*" for l in lines) / len(lines) if lines else 0.0,
+    }
+
+
+# --- Modèle linéaire embarqué
+_models: Dict[str, dict] = {}
+
+
+def load_model(path: str = MODEL_PATH) -> dict:
+    """Coefficients du modèle, lus une seule fois par processus."""
+    if path not in _models:
+        with open(path, encoding="utf-8") as f:
+            _models[path] = json.load(f)
+    return _models[path]
+
+
+def _linear(head: dict, x: List[float]) -> float:
+    return head["intercept"] + sum(w * v for w, v in zip(head["weights"], x))
+
+
+def _sigmoid(z: float) -> float:
+    return 1 / (1 + math.exp(-z)) if z > -700 else 0.0
+
+
+def category_for(score: float) -> str:
+    return next(label for threshold, label in CATEGORIES if score >= threshold)
+
+
+def suggestions_for(ad: dict, features: Dict[str, float]) -> dict:
+    """Conseils déterministes, même structure que les suggestions du mode complet."""
+    title = str(ad.get("title") or ad.get("titre") or "")
+    n = int(features["title_words"])
+    if n < 5:
+        title_hint = f"Titre trop court ({n} mots) : précisez le poste, le niveau ou le contrat (5 à 8 mots)."
+    elif n > 8:
+        title_hint = f"Titre trop long ({n} mots) : resserrez-le à 5 à 8 mots."
+    else:
+        title_hint = f"Longueur du titre correcte ({n} mots) : « {title} »."
+
+    norm = _normalize(json.dumps(ad, ensure_ascii=False))
+    missing_kw = [k for k in KEYWORDS if k not in norm][:5]
+    missing_sections = [
+        name for name, markers in SECTIONS.items() if not any(m in norm for m in markers)
+    ]
+    if missing_sections:
+        structure = "Ajoutez les sections : " + ", ".join(missing_sections) + "."
+    else:
+        structure = "Structure complète (Contexte, Responsabilités, Avantages)."
+    if features["bullet_ratio"] < 0.2:
+        structure += " Présentez les missions en listes à puces."
+    if not features["has_cta"]:
+        structure += " Terminez par un appel à l'action explicite (« Postulez »)."
+    return {"title": title_hint, "keywords": missing_kw, "structure": structure}
+
+
+def score_offer(ad: dict, model: dict = None) -> dict:
+    """Réponse complète du mode fast : score, category, probabilités et suggestions."""
+    model = model or load_model()
+    features = extract_features(ad)
+    raw = [features[name] for name in model["features"]]
+    x = [(v - m) / s for v, m, s in zip(raw, model["mean"], model["scale"])]
+
+    score = min(max(_linear(model["score"], x), 0.0), 100.0)
+    return {
+        "score": round(score),
+        "category": category_for(score),
+        "click_probability": round(_sigmoid(_linear(model["click"], x)), 4),
+        "apply_probability": round(_sigmoid(_linear(model["apply"], x)), 4),
+        "suggestions": suggestions_for(ad, features),
+    }
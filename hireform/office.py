@@ -0,0 +1,26 @@
+"""
+Conversion DOCX → PDF par LibreOffice headless, commune aux services.
+
+Chaque appel lance `libreoffice` avec son propre profil utilisateur
+(`-env:UserInstallation`) : sur le profil par défaut, un second `soffice`
+passe la main à l'instance déjà lancée ou s'arrête sans écrire le PDF, et les
+conversions simultanées (pool `pdf_convert`, processus de format-offer)
+échouent au hasard. Le profil, créé à chaque appel, est supprimé ensuite.
+"""
+import os
+import pathlib
+import subprocess
+import tempfile
+
+
+def convert_to_pdf(path: str, outdir: str) -> str:
+    """Convertit `path` dans `outdir` et renvoie le chemin du PDF (bloquant)."""
+    with tempfile.TemporaryDirectory(prefix="lo-profile-") as profile:
+        subprocess.run([
+            "libreoffice", f"-env:UserInstallation={pathlib.Path(profile).as_uri()}",
+            "--headless", "--convert-to", "pdf", "--outdir", outdir, path,
+        ], check=True, stdout=subprocess.DEVNULL)
+    pdf_path = os.path.join(outdir, os.path.splitext(os.path.basename(path))[0] + ".pdf")
+    if not os.path.exists(pdf_path):
+        raise RuntimeError(f"LibreOffice n'a pas produit de PDF pour {os.path.basename(path)}")
+    return pdf_path
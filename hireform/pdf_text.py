@@ -0,0 +1,158 @@
+"""
+Extraction des mots d'un PDF avec leurs boîtes, pour la reconstruction en colonnes.
+
+    pages = page_words("cv.pdf")               # backend par défaut
+    pages = page_words("cv.pdf", "pdfplumber")
+
+Une liste de mots par page, au format de `pdfplumber.Page.extract_words`
+(`text`, `x0`, `x1`, `top`, `bottom`, `doctop`, `height`, `width`, `upright`,
+`direction`), coordonnées en points depuis le haut de la page.
+
+Backends :
+- `pdfium` : API texte de pypdfium2. Le texte de la page est lu en un appel, les
+  mots sont découpés sur les blancs (pdfium insère espaces et fins de ligne
+  d'après la géométrie) et seules les boîtes du premier et du dernier
+  caractère de chaque mot sont demandées. Aucun objet Python par caractère.
+  pdfium n'étant pas thread-safe, les appels sont sérialisés dans le processus.
+- `pdfplumber` : `extract_words(use_text_flow=True)` sur les objets caractère de
+  pdfminer, l'implémentation historique, plus lente.
+
+Les deux suivent l'ordre du flux de contenu, coordonnées dans le repère de
+pdfplumber : x depuis l'origine de la page, `top` depuis la hauteur de la
+MediaBox (CropBox ignorée), taille de police mise à l'échelle par la matrice du
+texte. Un document dont une page est tournée (/Rotate) ou dont un mot n'est pas
+horizontal passe entièrement par pdfplumber. Écarts connus de pdfium :
+- `top`/`bottom` à environ 0,2 pt près (métriques de police) ;
+- deux caractères collés sans espace mais séparés de plus de 3 pt restent un
+  seul mot si pdfium n'a pas inséré d'espace ;
+- sur une même ligne de base, mots rangés de gauche à droite quel que soit le
+  flux (sans effet sur la reconstruction en colonnes, qui trie par position).
+Parité vérifiée par tests/test_pdf_text.py (MediaBox décalée, CropBox, texte
+mis à l'échelle, pages et texte tournés) ; parité et débit sur le corpus
+synthétique dans bench/pdf_text.py.
+
+PDF_TEXT_BACKEND choisit le backend par défaut (`pdfium`, repli sur
+`pdfplumber` si pypdfium2 n'est pas installé).
+"""
+import importlib.util
+import os
+import re
+import threading
+from typing import List, Optional
+
+BACKENDS = ("pdfium", "pdfplumber")
+
+_WORD = re.compile(r"\S+")  # pdfium insère déjà espaces et fins de ligne
+
+_pdfium_lock = threading.Lock()
+
+
+def default_backend() -> str:
+    name = os.getenv("PDF_TEXT_BACKEND", "pdfium")
+    if name not in BACKENDS:
+        raise ValueError(f"PDF_TEXT_BACKEND inconnu : {name} (choix : {', '.join(BACKENDS)})")
+    if name == "pdfium" and importlib.util.find_spec("pypdfium2") is None:
+        return "pdfplumber"  # dépendance optionnelle
+    return name
+
+
+def page_words(pdf_path: str, backend: Optional[str] = None) -> List[List[dict]]:
+    """Mots de chaque page de `pdf_path` ; ValueError si le backend est inconnu."""
+    backend = backend or default_backend()
+    if backend == "pdfium":
+        return _pdfium_words(pdf_path)
+    if backend == "pdfplumber":
+        return _pdfplumber_words(pdf_path)
+    raise ValueError(f"Backend PDF inconnu : {backend} (choix : {', '.join(BACKENDS)})")
+
+
+def _pdfplumber_words(pdf_path: str) -> List[List[dict]]:
+    import pdfplumber  # chargé au premier PDF
+
+    pages = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            pages.append(page.extract_words(use_text_flow=True))
+            page.close()  # libère les objets caractère de la page
+    return pages
+
+
+class _NotUpright(Exception):
+    """Page tournée (/Rotate) ou texte non horizontal : hors du chemin pdfium."""
+
+
+def _pdfium_words(pdf_path: str) -> List[List[dict]]:
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as raw
+
+    pages = []
+    try:
+        with _pdfium_lock:
+            document = pdfium.PdfDocument(pdf_path)
+            try:
+                doctop = 0.0
+                for index in range(len(document)):
+                    page = document[index]
+                    textpage = page.get_textpage()
+                    try:
+                        if page.get_rotation():
+                            raise _NotUpright
+                        # Hauteur de la MediaBox, comme pdfplumber (get_height() est celle de la CropBox)
+                        _, bottom, _, top = page.get_mediabox()
+                        height = top - bottom
+                        pages.append(_textpage_words(raw, textpage, height, doctop))
+                        doctop += height
+                    finally:
+                        textpage.close()
+                        page.close()
+            finally:
+                document.close()
+    except _NotUpright:
+        # Mots verticaux ou caractère par caractère côté pdfplumber : le
+        # découpage de pdfium n'y correspond pas, tout le document y passe
+        return _pdfplumber_words(pdf_path)
+    return pages
+
+
+def _textpage_words(raw, textpage, page_height: float, doctop: float) -> List[dict]:
+    count = textpage.count_chars()
+    if count <= 0:
+        return []
+    text = textpage.get_text_range()
+    if len(text) != count:
+        # Caractères exclus ou insérés par pdfium : lecture alignée sur les index
+        text = "".join(chr(raw.FPDFText_GetUnicode(textpage, i)) for i in range(count))
+
+    rect = raw.FS_RECTF()
+    matrix = raw.FS_MATRIX()
+    words = []
+    for match in _WORD.finditer(text):
+        start, end = match.span()
+        # Matrice effective du premier caractère (Tm × CTM) : texte horizontal
+        # seulement ; son échelle verticale donne la taille réelle de la police
+        raw.FPDFText_GetMatrix(textpage, start, matrix)
+        if matrix.b or matrix.c or matrix.a <= 0 or matrix.d <= 0:
+            raise _NotUpright
+        # Boîte « large » (hauteur de police) du premier et du dernier caractère
+        # pdfium calcule en simple précision : arrondi au millième de point pour
+        # que deux mots alignés aient le même x0 (coupure des colonnes à la médiane)
+        raw.FPDFText_GetLooseCharBox(textpage, start, rect)
+        x0, lower = round(rect.left, 3), rect.bottom
+        raw.FPDFText_GetLooseCharBox(textpage, end - 1, rect)
+        x1 = round(rect.right, 3)
+        size = round(raw.FPDFText_GetFontSize(textpage, start) * matrix.d, 3)
+        bottom = round(page_height - lower, 3)
+        top = bottom - size
+        words.append({
+            "text": match.group(),
+            "x0": x0,
+            "x1": x1,
+            "top": top,
+            "doctop": doctop + top,
+            "bottom": bottom,
+            "upright": True,
+            "height": size,
+            "width": x1 - x0,
+            "direction": "ltr",
+        })
+    return words
@@ -0,0 +1,120 @@
+"""
+Ordonnancement des appels OpenAI sous limites de débit.
+
+Deux seaux à jetons (requêtes/minute et tokens/minute) : chaque appel réserve
+une requête et une estimation de ses tokens, corrigée ensuite avec l'usage
+réel. Les en-têtes `x-ratelimit-*` des réponses recalent capacité et niveau
+des seaux sur ce que le serveur annonce ; les 429 sont réessayés avec un
+backoff exponentiel à gigue complète.
+"""
+import asyncio
+import random
+import re
+import time
+from typing import Mapping, Optional
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Durée OpenAI (« 6m0s », « 20ms », « 1.5s ») ou nombre de secondes → secondes."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION.findall(value)
+    return sum(float(n) * _UNITS[u] for n, u in parts) if parts else None
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Secondes avant de pouvoir prélever `amount` (0 si disponible)."""
+        self.refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def sync(self, limit: Optional[float], remaining: Optional[float], reset: Optional[float]):
+        """Recale le seau sur les valeurs annoncées par le serveur."""
+        self.refill()
+        if limit:
+            self.capacity = limit
+            self.rate = limit / 60.0
+        if remaining is not None:
+            self.level = min(self.level, remaining)
+            if reset and remaining < self.capacity:
+                # Le serveur indique quand le seau sera plein : on suit son rythme
+                self.rate = max(self.rate, (self.capacity - remaining) / reset)
+
+
+class RateLimiter:
+    def __init__(self, requests_per_minute: float = 500, tokens_per_minute: float = 30_000,
+                 max_retries: int = 6, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = asyncio.Lock()
+        self.stats = {"acquired": 0, "waited_s": 0.0, "retries": 0, "header_syncs": 0}
+
+    async def acquire(self, estimated_tokens: int):
+        """Attend qu'une requête et `estimated_tokens` soient disponibles, puis les réserve."""
+        async with self._lock:  # FIFO : pas de famine des gros appels
+            while True:
+                wait = max(self.requests.wait_time(1), self.tokens.wait_time(estimated_tokens))
+                if wait <= 0:
+                    break
+                self.stats["waited_s"] += wait
+                await asyncio.sleep(wait)
+            self.requests.level -= 1
+            self.tokens.level -= estimated_tokens
+            self.stats["acquired"] += 1
+
+    def settle(self, estimated_tokens: int, used_tokens: Optional[int]):
+        """Rend au seau la part de l'estimation non consommée (ou prélève le dépassement)."""
+        if used_tokens is not None:
+            self.tokens.refill()
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level + estimated_tokens - used_tokens)
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        def number(name):
+            value = headers.get(name)
+            try:
+                return float(value) if value is not None else None
+            except ValueError:
+                return None
+
+        if not any(k.lower().startswith("x-ratelimit-") for k in headers.keys()):
+            return
+        self.requests.sync(number("x-ratelimit-limit-requests"), number("x-ratelimit-remaining-requests"),
+                           parse_duration(headers.get("x-ratelimit-reset-requests")))
+        self.tokens.sync(number("x-ratelimit-limit-tokens"), number("x-ratelimit-remaining-tokens"),
+                         parse_duration(headers.get("x-ratelimit-reset-tokens")))
+        self.stats["header_syncs"] += 1
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Délai avant la tentative `attempt` (>= 1) : gigue complète, au moins `retry_after`."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if retry_after:
+            delay = max(delay, retry_after + random.uniform(0, self.base_delay))
+        self.stats["retries"] += 1
+        return delay
+
+
+def estimate_tokens(messages, max_tokens: int) -> int:
+    """Estimation grossière (≈ 4 caractères par token) + complétion maximale."""
+    return sum(len(m.get("content") or "") for m in messages) // 4 + max_tokens
@@ -0,0 +1,24 @@
+"""
+Réponse JSON sérialisée par orjson, commune aux services.
+
+Classe par défaut des routeurs (`APIRouter(default_response_class=ORJSONResponse)`).
+Les endpoints qui renvoient une sortie LLM déjà validée construisent la réponse
+eux-mêmes (`return ORJSONResponse(data)`) : FastAPI saute alors aussi
+`jsonable_encoder`, qui reparcourt tout le document. Sans orjson, repli sur la
+sérialisation de Starlette.
+"""
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
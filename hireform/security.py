@@ -0,0 +1,32 @@
+"""
+Authentification commune des services : clé `api-key` au format OpenAI (sk-…).
+
+Chaque requête authentifiée passe aussi le contrôle d'admission de sa clé
+(hireform.admission) : le quota est tenu jusqu'à la fin de la réponse.
+"""
+from typing import AsyncIterator
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import APIKeyHeader
+
+from hireform.admission import admit_client
+
+api_key_header = APIKeyHeader(name="api-key", auto_error=True)
+
+
+async def validate_api_key(request: Request, api_key: str = Depends(api_key_header)) -> AsyncIterator[str]:
+    if not api_key.startswith("sk-"):
+        raise HTTPException(status_code=401, detail="Clé API invalide")
+    async with admit_client(api_key, request.headers):
+        yield api_key
+
+
+def admitted(key_dependency):
+    """
+    Dépendance pour les services à authentification propre (X-OpenAI-Key,
+    clé partagée…) : la clé renvoyée par `key_dependency`, admise sous son quota.
+    """
+    async def dependency(request: Request, api_key: str = Depends(key_dependency)) -> AsyncIterator[str]:
+        async with admit_client(api_key, request.headers):
+            yield api_key
+    return dependency
@@ -0,0 +1,110 @@
+"""
+Coalescence des appels LLM identiques (« singleflight ») avec cache court.
+
+Les requêtes concurrentes dont la clé canonique est identique attendent le
+même appel amont au lieu d'en lancer un chacune ; le résultat reste ensuite
+en cache `ttl` secondes pour absorber les retries clients.
+
+La clé inclut une empreinte de la clé OpenAI de l'appelant : chaque client paie
+ses propres appels, et une erreur d'authentification ou de quota n'est jamais
+transmise à un appelant dont la clé est différente. Chaque appelant reçoit sa
+propre copie du résultat.
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable
+
+from fastapi import APIRouter, Depends
+
+from hireform.admission import require_internal
+
+
+def request_key(endpoint: str, model: str, prompt_version: str, payload: Any, api_key: str) -> str:
+    """
+    Clé canonique : JSON à clés triées du payload + endpoint + modèle + version
+    du prompt + empreinte de la clé API (jamais la clé elle-même).
+    """
+    key_digest = hashlib.blake2b(api_key.encode("utf-8"), digest_size=16).hexdigest()
+    canonical = json.dumps(
+        [endpoint, model, prompt_version, key_digest, payload],
+        sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    def __init__(self, ttl: float = 30.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._inflight: dict = {}
+        self._cache: OrderedDict = OrderedDict()
+        self._counters = defaultdict(lambda: {"requests": 0, "upstream": 0, "coalesced": 0, "cache_hits": 0})
+
+    def _cached(self, key: str):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._cache[key]
+            return None
+        return entry
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]], label: str = "default") -> Any:
+        """
+        Renvoie le résultat de `fn()` pour `key`, en partageant l'appel en cours
+        ou le résultat récent. Les erreurs sont propagées à tous les appelants
+        en attente mais jamais mises en cache. Chaque appelant reçoit une copie.
+        """
+        counters = self._counters[label]
+        counters["requests"] += 1
+
+        entry = self._cached(key)
+        if entry is not None:
+            counters["cache_hits"] += 1
+            return copy.deepcopy(entry[1])
+
+        task = self._inflight.get(key)
+        if task is not None:
+            counters["coalesced"] += 1
+        else:
+            counters["upstream"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._settle(key, t))
+        # shield : l'annulation d'un client n'interrompt pas l'appel des autres
+        return copy.deepcopy(await asyncio.shield(task))
+
+    def _settle(self, key: str, task: asyncio.Future):
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        self._cache[key] = (time.monotonic() + self.ttl, task.result())
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "inflight": len(self._inflight),
+            "cached": len(self._cache),
+            "endpoints": {label: dict(c) for label, c in self._counters.items()},
+        }
+
+
+# Instance partagée par les services d'un même processus
+llm_flight = SingleFlight()
+
+# Route de statistiques, montée une seule fois (application autonome ou passerelle).
+# Réservée au jeton interne (en-tête x-hireform-internal = HIREFORM_INTERNAL_TOKEN) :
+# les compteurs par endpoint renseignent sur le trafic des autres clients.
+stats_router = APIRouter(dependencies=[Depends(require_internal)])
+
+
+@stats_router.get("/coalescing-stats", include_in_schema=False)
+async def coalescing_stats():
+    return llm_flight.stats()
@@ -0,0 +1,189 @@
+"""
+Mémoire de traduction persistante pour translate-cv.
+
+SQLite en mode WAL (lectures concurrentes pendant les écritures) avec un LRU
+en mémoire devant. Clé : (texte source normalisé, langue cible, glossary_id).
+
+Import / export JSONL pour amorcer la mémoire avec des traductions passées :
+    python -m hireform.translation_memory export tm.jsonl
+    python -m hireform.translation_memory import tm.jsonl
+Lignes : {"source": ..., "target_lang": "EN", "glossary_id": "", "translation": ...}
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_PATH = os.getenv("TRANSLATION_MEMORY_PATH", "translation_memory.sqlite3")
+LRU_SIZE = int(os.getenv("TRANSLATION_MEMORY_LRU", "20000"))
+SQL_CHUNK = 500  # limite de variables par requête IN (...)
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """Forme canonique d'un texte source : NFC, espaces compactés, sans espaces de bord."""
+    return _SPACES.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class TranslationMemory:
+    def __init__(self, path: str = DEFAULT_PATH, lru_size: int = LRU_SIZE):
+        self.path = path
+        self.lru_size = lru_size
+        self._lru: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"lookups": 0, "lru_hits": 0, "db_hits": 0, "misses": 0, "stored": 0}
+
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " source TEXT NOT NULL,"
+            " target_lang TEXT NOT NULL,"
+            " glossary_id TEXT NOT NULL DEFAULT '',"
+            " translation TEXT NOT NULL,"
+            " updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,"
+            " PRIMARY KEY (source, target_lang, glossary_id)"
+            ") WITHOUT ROWID"
+        )
+
+    # --- LRU
+    def _lru_get(self, key):
+        value = self._lru.get(key)
+        if value is not None:
+            self._lru.move_to_end(key)
+        return value
+
+    def _lru_put(self, key, value):
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    # --- Lecture / écriture
+    def get_many(self, texts: Iterable[str], target_lang: str, glossary_id: Optional[str] = None) -> Dict[str, str]:
+        """Traductions connues, indexées par texte source normalisé."""
+        lang, glossary = target_lang.upper(), glossary_id or ""
+        found, missing = {}, []
+        with self._lock:
+            for source in {normalize(t) for t in texts}:
+                self._counters["lookups"] += 1
+                value = self._lru_get((source, lang, glossary))
+                if value is not None:
+                    self._counters["lru_hits"] += 1
+                    found[source] = value
+                else:
+                    missing.append(source)
+
+            for i in range(0, len(missing), SQL_CHUNK):
+                chunk = missing[i:i + SQL_CHUNK]
+                rows = self._db.execute(
+                    "SELECT source, translation FROM translations"
+                    f" WHERE target_lang = ? AND glossary_id = ? AND source IN ({','.join('?' * len(chunk))})",
+                    (lang, glossary, *chunk),
+                ).fetchall()
+                for source, translation in rows:
+                    found[source] = translation
+                    self._lru_put((source, lang, glossary), translation)
+                self._counters["db_hits"] += len(rows)
+            self._counters["misses"] += len(missing) - sum(1 for s in missing if s in found)
+        return found
+
+    def put_many(self, pairs: Iterable[Tuple[str, str]], target_lang: str, glossary_id: Optional[str] = None):
+        lang, glossary = target_lang.upper(), glossary_id or ""
+        self._store([(normalize(s), lang, glossary, t) for s, t in pairs])
+
+    def _store(self, rows: List[tuple]):
+        # Une transaction par lot : un seul commit WAL quel que soit le nombre de lignes
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO translations (source, target_lang, glossary_id, translation)"
+                    " VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            for source, lang, glossary, translation in rows:
+                self._lru_put((source, lang, glossary), translation)
+            self._counters["stored"] += len(rows)
+
+    # --- Import / export
+    def import_jsonl(self, path: str, batch_size: int = 5000) -> int:
+        count, rows = 0, []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                rows.append((normalize(row["source"]), row["target_lang"].upper(),
+                             row.get("glossary_id") or "", row["translation"]))
+                if len(rows) >= batch_size:
+                    self._store(rows)
+                    count += len(rows)
+                    rows = []
+        if rows:
+            self._store(rows)
+            count += len(rows)
+        return count
+
+    def export_jsonl(self, path: str) -> int:
+        count = 0
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT source, target_lang, glossary_id, translation FROM translations"
+                " ORDER BY target_lang, glossary_id, source"
+            ).fetchall()
+        with open(path, "w", encoding="utf-8") as f:
+            for source, lang, glossary, translation in rows:
+                f.write(json.dumps({"source": source, "target_lang": lang, "glossary_id": glossary,
+                                    "translation": translation}, ensure_ascii=False) + "\n")
+                count += 1
+        return count
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            counters["entries"] = self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        hits = counters["lru_hits"] + counters["db_hits"]
+        counters["lru_size"] = len(self._lru)
+        counters["hit_ratio"] = round(hits / counters["lookups"], 4) if counters["lookups"] else 0.0
+        return counters
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Import / export de la mémoire de traduction")
+    parser.add_argument("action", choices=["import", "export", "stats"])
+    parser.add_argument("file", nargs="?", help="Fichier JSONL")
+    parser.add_argument("--db", default=DEFAULT_PATH)
+    args = parser.parse_args(argv)
+
+    tm = TranslationMemory(args.db)
+    if args.action == "stats":
+        print(json.dumps(tm.stats(), indent=2))
+    elif not args.file:
+        parser.error("Fichier JSONL requis")
+    elif args.action == "import":
+        print(f"{tm.import_jsonl(args.file)} traductions importées dans {args.db}")
+    else:
+        print(f"{tm.export_jsonl(args.file)} traductions exportées vers {args.file}")
+    tm.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""
+Validation des sorties LLM : schémas JSON compilés une fois, réparations bon marché.
+
+    validate_cv = compile_schema(extract_cv_schema["parameters"])   # à l'import
+    data = validate_cv(parse_llm_json(arguments))                   # quelques µs
+
+`compile_schema` transforme un sous-ensemble de JSON Schema (type, properties,
+required, items, additionalProperties, enum, minimum, maximum) en fonctions
+Python imbriquées : pas d'interprétation du schéma à chaque appel. Le
+validateur renvoie une copie réparée de la valeur ou lève `InvalidOutput` avec
+la liste des problèmes restants, que l'appelant renvoie au modèle
+(cf. hireform.llm.complete_json).
+
+Réparations :
+- texte : bloc ```json … ```, texte autour de l'objet, virgules finales ;
+- tableau null ou requis absent → [] ; objet de type dictionnaire
+  (additionalProperties) requis absent → {} ; valeur isolée → [valeur] ;
+- chaîne requise null (hors enum) → gardée à None (fin d'un poste en cours,
+  CV sans e-mail : le champ est présent, sans valeur) ;
+- autre champ optionnel null → absent ; nombre ↔ chaîne, « true »/« false » ;
+  valeur d'enum à la casse près.
+
+Une erreur au plus par chemin.
+"""
+import json
+import re
+from typing import Any, Callable, List
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # dépendance optionnelle
+    _loads = json.loads
+
+MAX_ERRORS = 20  # au-delà, le message de relance n'apprend plus rien au modèle
+
+
+class InvalidOutput(ValueError):
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+# --- Texte → JSON
+
+_FENCE = re.compile(r"^\s*```[a-zA-Z]*\s*|\s*```\s*$")
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def repair_json_text(text: str) -> str:
+    text = _FENCE.sub("", text)
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=0)
+    end = max(text.rfind("}"), text.rfind("]")) + 1
+    if end > start:
+        text = text[start:end]
+    return _TRAILING_COMMA.sub(r"\1", text)
+
+
+def parse_llm_json(text) -> Any:
+    """Décode une sortie de modèle ; réparation seulement si le décodage direct échoue."""
+    if not isinstance(text, (str, bytes)):
+        return text  # arguments déjà décodés par le SDK
+    try:
+        return _loads(text)
+    except ValueError:
+        pass
+    try:
+        return _loads(repair_json_text(text if isinstance(text, str) else text.decode("utf-8", "replace")))
+    except ValueError as e:
+        raise InvalidOutput([f"JSON mal formé : {e}"])
+
+
+# --- Schéma → validateur
+# Chaque nœud compilé : check(valeur, chemin, erreurs) → valeur réparée. Le
+# chemin est une chaîne de tuples (parent, clé), mise en forme seulement en cas
+# d'erreur.
+
+def _path(path) -> str:
+    parts = []
+    while path:
+        path, key = path
+        parts.append(f"[{key}]" if isinstance(key, int) else f".{key}")
+    return "$" + "".join(reversed(parts))
+
+
+def _error(errors: list, path, message: str):
+    if len(errors) < MAX_ERRORS:
+        errors.append(f"{_path(path)} : {message}")
+
+
+def _any(value, path, errors):
+    return value
+
+
+def _compile_string(schema: dict):
+    enum = schema.get("enum")
+    canonical = {str(v).lower(): v for v in enum} if enum else None
+
+    def check(value, path, errors):
+        if not isinstance(value, str):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                value = str(value)
+            else:
+                _error(errors, path, f"chaîne attendue, {type(value).__name__} reçu")
+                return value
+        if canonical is not None and value not in enum:
+            fixed = canonical.get(value.strip().lower())
+            if fixed is None:
+                _error(errors, path, f"valeur hors liste {list(enum)}")
+                return value
+            value = fixed
+        return value
+    return check
+
+
+def _compile_number(schema: dict):
+    integer = schema.get("type") == "integer"
+    minimum, maximum = schema.get("minimum"), schema.get("maximum")
+
+    def check(value, path, errors):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            try:
+                value = float(str(value).strip().rstrip("%").replace(",", "."))
+            except ValueError:
+                _error(errors, path, f"nombre attendu, {type(value).__name__} reçu")
+                return value
+        if integer and not isinstance(value, int):
+            if not float(value).is_integer():
+                _error(errors, path, "entier attendu")
+                return value
+            value = int(value)
+        if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+            _error(errors, path, f"hors de l'intervalle [{minimum}, {maximum}]")
+        return value
+    return check
+
+
+def _check_boolean(value, path, errors):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        return value.strip().lower() == "true"
+    _error(errors, path, "booléen attendu")
+    return value
+
+
+def _compile_array(schema: dict):
+    item = compile_node(schema.get("items", {}))
+
+    def check(value, path, errors):
+        if value is None:
+            return []
+        if not isinstance(value, list):
+            value = [value]
+        return [item(v, (path, i), errors) for i, v in enumerate(value) if v is not None]
+    return check
+
+
+def _compile_object(schema: dict):
+    properties = {k: compile_node(s) for k, s in schema.get("properties", {}).items()}
+    required = tuple(schema.get("required", ()))
+    extra = schema.get("additionalProperties", True)
+    extra_check = compile_node(extra) if isinstance(extra, dict) else None
+    arrays = {k for k, s in schema.get("properties", {}).items() if s.get("type") == "array"}
+    # Chaînes requises libres (hors enum) : null accepté tel quel
+    nullable = {k for k in required if schema.get("properties", {}).get(k, {}).get("type") == "string"
+                and "enum" not in schema["properties"][k]}
+    # Défauts des champs requis réparables : tableaux et dictionnaires
+    defaults = {}
+    for key in required:
+        sub = schema.get("properties", {}).get(key, {})
+        if sub.get("type") == "array":
+            defaults[key] = list
+        elif sub.get("type") == "object" and "additionalProperties" in sub and not sub.get("required"):
+            defaults[key] = dict
+
+    def check(value, path, errors):
+        if not isinstance(value, dict):
+            _error(errors, path, f"objet attendu, {type(value).__name__} reçu")
+            return value
+        out = {}
+        for key, item in value.items():
+            check_item = properties.get(key)
+            if check_item is not None:
+                if item is None and key not in arrays:
+                    if key in nullable:
+                        out[key] = None
+                    continue  # optionnel → absent ; requis → signalé une fois plus bas
+                out[key] = check_item(item, (path, key), errors)
+            elif extra_check is not None:
+                out[key] = extra_check(item, (path, key), errors)
+            elif extra is not False:
+                out[key] = item
+        for key in required:
+            if key not in out:
+                factory = defaults.get(key)
+                if factory is not None:
+                    out[key] = factory()
+                else:
+                    _error(errors, (path, key), "champ requis manquant")
+        return out
+    return check
+
+
+def compile_node(schema: dict) -> Callable:
+    kind = schema.get("type")
+    if kind == "object":
+        return _compile_object(schema)
+    if kind == "array":
+        return _compile_array(schema)
+    if kind in ("number", "integer"):
+        return _compile_number(schema)
+    if kind == "string":
+        return _compile_string(schema)
+    if kind == "boolean":
+        return _check_boolean
+    return _any
+
+
+def compile_schema(schema: dict) -> Callable[[Any], Any]:
+    """Validateur (valeur → valeur réparée, ou InvalidOutput) compilé depuis `schema`."""
+    root = compile_node(schema)
+
+    def validate(value):
+        errors = []
+        value = root(value, None, errors)
+        if errors:
+            raise InvalidOutput(errors)
+        return value
+    validate.schema = schema
+    return validate
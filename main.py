@@ -1,16 +1,25 @@
+import asyncio
 import logging
-from fastapi import FastAPI, File, UploadFile, Header, HTTPException
-import pdfplumber
-import openai
+from fastapi import APIRouter, FastAPI, File, UploadFile, Depends, HTTPException, Query
+from typing import Optional
 import tempfile
 import os
-import json
 
-# --- 0. Configuration du logging DEBUG
-logging.basicConfig(level=logging.DEBUG)
+from hireform.admission import slot
+from hireform.llm import complete_json, get_openai_client
+from hireform.logs import configure_logging_on_startup
+from hireform.metrics import instrument, stage
+from hireform.pdf_text import BACKENDS, page_words
+from hireform.responses import ORJSONResponse
+from hireform.security import validate_api_key
+from hireform.validation import InvalidOutput, compile_schema
+
+# --- 0. Logging (hireform.logs) : niveau par HIREFORM_LOG_LEVEL ; les contenus de CV
+# passent par `payload_logger`, échantillonnable (HIREFORM_LOG_SAMPLE=main.payload=0.01)
 logger = logging.getLogger(__name__)
+payload_logger = logging.getLogger(f"{__name__}.payload")
 
-app = FastAPI(title="CV Extractor API")
+router = APIRouter(tags=["extract-cv"], default_response_class=ORJSONResponse)
 
 # --- 1. Schéma JSON pour function-calling
 extract_cv_schema = {
@@ -82,96 +91,99 @@ extract_cv_schema = {
         "required": ["personal_information", "experience", "skills", "languages"]
     }
 }
+validate_cv = compile_schema(extract_cv_schema["parameters"])
 
 # --- 2. Extraction PDF avec gestion de colonnes
-def extract_text_columns(pdf_path: str) -> str:
+def extract_text_columns(pdf_path: str, backend: Optional[str] = None) -> str:
+    # Mots et boîtes par page : pdfium par défaut, pdfplumber au choix (cf. hireform.pdf_text)
     pages_text = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            words = page.extract_words(use_text_flow=True)
-            if not words:
-                continue
-            xs = sorted(w["x0"] for w in words)
-            x_mid = xs[len(xs) // 2]
-            left  = [w for w in words if w["x0"] < x_mid]
-            right = [w for w in words if w["x0"] >= x_mid]
-
-            def reconstruct(col_words):
-                col_words = sorted(col_words, key=lambda w: (w["top"], w["x0"]))
-                paras, line, cur_top = [], [], None
-                for w in col_words:
-                    if cur_top and abs(w["top"] - cur_top) > 8:
-                        paras.append(" ".join(line))
-                        line = []
-                    line.append(w["text"])
-                    cur_top = w["top"]
-                if line:
+    for words in page_words(pdf_path, backend):
+        if not words:
+            continue
+        xs = sorted(w["x0"] for w in words)
+        x_mid = xs[len(xs) // 2]
+        left  = [w for w in words if w["x0"] < x_mid]
+        right = [w for w in words if w["x0"] >= x_mid]
+
+        def reconstruct(col_words):
+            col_words = sorted(col_words, key=lambda w: (w["top"], w["x0"]))
+            paras, line, cur_top = [], [], None
+            for w in col_words:
+                if cur_top and abs(w["top"] - cur_top) > 8:
                     paras.append(" ".join(line))
-                return "\n".join(paras)
-
-            pages_text.append(reconstruct(left) + "\n" + reconstruct(right))
+                    line = []
+                line.append(w["text"])
+                cur_top = w["top"]
+            if line:
+                paras.append(" ".join(line))
+            return "\n".join(paras)
+
+        pages_text.append(reconstruct(left) + "\n" + reconstruct(right))
     return "\n\n".join(pages_text)
 
-# --- 3. Endpoint /extract-cv/ avec header api-key et debug logging
-@app.post("/extract-cv/")
-async def extract_cv(
-    file: UploadFile = File(...),
-    api_key: str = Header(..., alias="api-key")  # <-- api-key passé ici
-):
-    logger.debug("=== /extract-cv/ called ===")
-    logger.debug(f"Received api-key: {api_key[:5]}... (length={len(api_key)})")
-    if not api_key.startswith("sk-"):
-        logger.error("API key invalide ou manquante")
-        raise HTTPException(status_code=401, detail="Clé API invalide ou manquante")
-
-    openai.api_key = api_key
-
+# --- 3. Extraction d'un CV : texte du PDF puis JSON structuré par OpenAI
+async def extract_cv_data(content: bytes, api_key: str, pdf_backend: Optional[str] = None) -> dict:
+    """
+    JSON structuré du CV PDF `content` (HTTPException 502 si OpenAI échoue).
+    Appelée par /extract-cv/ et, dans la passerelle, directement par /transform-cv/.
+    """
     # Sauvegarde temporaire du PDF
     with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        content = await file.read()
         tmp.write(content)
         temp_path = tmp.name
-    logger.debug(f"PDF temporaire enregistré sous {temp_path} ({len(content)} bytes)")
+    logger.debug("PDF temporaire enregistré sous %s (%d bytes)", temp_path, len(content))
 
     try:
-        # Extraction du texte
-        raw_text = extract_text_columns(temp_path)
-        logger.debug(f"Raw text extrait (premiers 200 chars): {raw_text[:200]!r}")
-
-        # Appel API OpenAI : syntaxe `openai.chat.completions.create(...)`
+        # Extraction du texte, hors de la boucle d'événements, bornée par le pool pdf_parse
+        async with slot("pdf_parse"):
+            with stage("pdf_parse"):
+                raw_text = await asyncio.to_thread(extract_text_columns, temp_path, pdf_backend)
+        payload_logger.debug("Raw text extrait (%d chars)", len(raw_text), extra={"excerpt": raw_text[:200]})
+
+        # Appel API OpenAI (client asynchrone partagé pour cette clé)
+        # Arguments validés contre extract_cv_schema, une relance ciblée si invalides
         logger.info("Appel openai.chat.completions.create() …")
         try:
-            response = openai.chat.completions.create(
+            data = await complete_json(
+                get_openai_client(api_key), validate_cv,
                 model="gpt-4.1",
                 messages=[
                     {"role": "system", "content": "Tu es un assistant d’extraction de CV. Réponds seulement via la fonction extract_cv."},
                     {"role": "user",   "content": raw_text}
                 ],
-                functions=[extract_cv_schema],
-                function_call={"name": "extract_cv"}
+                function=extract_cv_schema
             )
+        except HTTPException:
+            raise
+        except InvalidOutput as e:
+            logger.error("function_call invalide après relance : %s", e)
+            raise HTTPException(status_code=502, detail=f"Réponse OpenAI invalide : {e}")
         except Exception as e:
             logger.exception("Erreur lors de l'appel à OpenAI")
             raise HTTPException(status_code=502, detail=f"Erreur OpenAI: {e}")
 
-        logger.info("Réponse reçue de l'API OpenAI")
-        msg = response.choices[0].message
-        if not hasattr(msg, "function_call"):
-            logger.error("Aucun function_call dans la réponse")
-            raise HTTPException(status_code=500, detail="OpenAI n’a pas renvoyé de function_call")
-
-        args = msg.function_call.arguments
-        logger.debug(f"function_call.arguments (type={type(args)}): {args!r}")
-
-        # Parsing JSON
-        if isinstance(args, str):
-            data = json.loads(args)
-        else:
-            data = args
-
-        logger.debug("Extraction JSON réussie, renvoi du résultat")
+        payload_logger.debug("Extraction JSON réussie, renvoi du résultat", extra={"cv": data})
         return data
 
     finally:
         os.remove(temp_path)
-        logger.debug(f"PDF temporaire supprimé : {temp_path}")
+        logger.debug("PDF temporaire supprimé : %s", temp_path)
+
+# --- 4. Endpoint /extract-cv/ avec header api-key et debug logging
+@router.post("/extract-cv/")
+async def extract_cv(
+    file: UploadFile = File(...),
+    pdf_backend: Optional[str] = Query(None, description="Extraction du texte : pdfium ou pdfplumber (défaut : PDF_TEXT_BACKEND)"),
+    api_key: str = Depends(validate_api_key)  # <-- api-key passé ici
+):
+    logger.debug("=== /extract-cv/ called ===")
+    if pdf_backend is not None and pdf_backend not in BACKENDS:
+        raise HTTPException(status_code=400, detail=f"pdf_backend inconnu : {pdf_backend} (choix : {', '.join(BACKENDS)})")
+    return ORJSONResponse(await extract_cv_data(await file.read(), api_key, pdf_backend))
+
+
+# Application autonome (uvicorn main:app) ; la passerelle (gateway.py) monte `router`
+app = FastAPI(title="CV Extractor API", default_response_class=ORJSONResponse)
+app.include_router(router)
+configure_logging_on_startup(app)
+instrument(app)
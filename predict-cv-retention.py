@@ -1,98 +1,136 @@
-from fastapi import FastAPI, Request, HTTPException, Depends
-from fastapi.security import APIKeyHeader
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI, Request, HTTPException, Depends
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from dateutil.parser import parse as parse_date
-from esco import LocalDB
-import pandas as pd
-import numpy as np
-import joblib
-import json
-
-app = FastAPI(title="Hireform CV Retention Predictor")
-
-# --- Sécurité simple par clé API (OpenAI-style sk-…)
-api_key_header = APIKeyHeader(name="api-key", auto_error=True)
-def validate_key(key: str = Depends(api_key_header)):
-    if not key.startswith("sk-"):
-        raise HTTPException(401, "API key invalide")
-    return key
-
-# --- Chargement ML model
-model = joblib.load("cv_retention_model.pkl")  # modèle scikit-learn entraîné au préalable
-
-# --- Initialisation ESCO local DB
-esco_db = LocalDB()  # charge les JSON embarqués  [oai_citation:5‡PyPI](https://pypi.org/project/pyEscoAPI/?utm_source=chatgpt.com)
-
-# --- Fonction d’alignement ESCO
-def map_to_esco(label: str) -> int:
-    """
-    Recherche l’item ESCO le plus proche pour un label (intitulé poste ou skill).
-    Retourne 1 si trouvé, 0 sinon (on peut aussi retourner l’ID).
-    """
-    results = esco_db.search_products({label})
-    return 1 if not results.empty else 0  # binaire pour simplifier
+import threading
+import asyncio
+import logging
+import os
+
+from hireform.logs import configure_logging_on_startup
+from hireform.metrics import instrument, stage
+from hireform.responses import ORJSONResponse
+from hireform.security import validate_api_key
+
+MODEL_PATH = os.getenv("RETENTION_MODEL_PATH", "cv_retention_model.pkl")  # modèle scikit-learn entraîné au préalable
+# RETENTION_PRELOAD=1 : chargement à l'import, à combiner avec `gunicorn --preload`
+# pour que les workers forkés partagent modèle et index ESCO en copy-on-write.
+PRELOAD = os.getenv("RETENTION_PRELOAD", "0") == "1"
+
+# --- Ressources partagées (modèle mmappé + index ESCO compact)
+# numpy, pandas, joblib et esco ne sont importés qu'au chargement
+model = None
+esco_labels = None
+_load_lock = threading.Lock()
+_loading = None
+
+def load_resources():
+    global model, esco_labels
+    from hireform.esco_index import EscoIndex
+    from hireform.model_store import load_shared_model
+
+    with _load_lock:
+        if model is None:
+            model = load_shared_model(MODEL_PATH)
+        if esco_labels is None:
+            esco_labels = EscoIndex.open()
+
+def _start_loading():
+    # Relance le chargement si la tentative précédente a échoué
+    global _loading
+    if _loading is None or (_loading.done() and _loading.exception()):
+        _loading = asyncio.get_running_loop().run_in_executor(None, load_resources)
+    return _loading
+
+async def ensure_loaded():
+    """Attend la fin du chargement en arrière-plan (immédiat une fois prêt)."""
+    if model is not None and esco_labels is not None:
+        return
+    await _start_loading()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Le port s'ouvre tout de suite, le chargement se fait en tâche de fond
+    if not PRELOAD:
+        _start_loading()
+    yield
+
+if PRELOAD:
+    load_resources()
+
+logger = logging.getLogger(__name__)
+router = APIRouter(tags=["predict-cv-retention"], default_response_class=ORJSONResponse)
+
+# --- Readiness : 503 tant que modèle et index ESCO ne sont pas chargés
+# (dans la passerelle, la première sonde déclenche le chargement)
+@router.get("/ready")
+async def ready():
+    if model is None or esco_labels is None:
+        if _loading is None:
+            _start_loading()
+        if _loading is not None and _loading.done() and _loading.exception():
+            return JSONResponse({"status": "error", "detail": str(_loading.exception())}, status_code=503)
+        return JSONResponse({"status": "loading"}, status_code=503)
+    return {"status": "ready"}
 
 # --- Endpoint principal
-@app.post("/predict-cv-retention/", dependencies=[Depends(validate_key)])
+@router.post("/predict-cv-retention/", dependencies=[Depends(validate_api_key)])
 async def predict_cv_retention(request: Request):
     try:
         cv = await request.json()
     except:
         raise HTTPException(400, "JSON invalide")
 
-    # 1) Parcours des expériences pour extraire biodata
-    exp = cv.get("experience", [])
-    if not isinstance(exp, list) or len(exp) == 0:
-        raise HTTPException(400, "Pas d'expériences dans le CV")
-
-    periods = []
-    for e in exp:
-        start = parse_date(e["start_date"])
-        end = parse_date(e["end_date"])
-        periods.append((start, end))
-    # Trier par date
-    periods.sort(key=lambda x: x[0])
-    # Durée moyenne (en mois)
-    durations = [(e[1] - e[0]).days / 30 for e in periods]
-    avg_tenure = np.mean(durations)
-    # Nombre de postes (biodata item)
-    num_positions = len(periods)
-    # Nombre de pauses (breaks > 3 mois)
-    breaks = sum(
-        1 
-        for (s0, e0), (s1, e1) in zip(periods, periods[1:])
-        if (s1 - e0).days / 30 > 3
-    )
-
-    # 2) Compétences et ESCO
-    skills = cv.get("skills", [])
-    num_skills = len(skills)
-    esco_skills = sum(map_to_esco(s) for s in skills)  # count skills alignés  [oai_citation:6‡GitHub](https://github.com/par-tec/esco-playground?utm_source=chatgpt.com)
-
-    # 3) Intitulés de postes ESCO
-    num_esco_titles = sum(map_to_esco(e.get("role", "")) for e in exp)
-
-    # 4) Construction du vecteur de features
-    X = np.array([[avg_tenure, num_positions, breaks, num_skills, esco_skills, num_esco_titles]])
-
-    # 5) Prédiction de probabilité
     try:
-        prob = float(model.predict_proba(X)[0][1])
+        with stage("model_load"):
+            await ensure_loaded()
     except Exception as e:
+        logger.exception("Chargement du modèle de rétention en échec")
+        raise HTTPException(503, f"Modèle indisponible : {e}")
+
+    from hireform.cv_features import retention_features
+
+    # 1) Biodata, compétences et intitulés ESCO (cf. hireform.cv_features). Un poste
+    # en cours (fin absente, vide ou « présent ») compte jusqu'à aujourd'hui et un
+    # poste sans début est ignoré, comme dans bulk-score-cv ; auparavant, ces CV
+    # recevaient une erreur (400 ou 500)
+    try:
+        with stage("features"):
+            features = retention_features(cv, esco_labels)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    # 2) Prédiction et catégorisation
+    return score(features)
+
+
+def score(features: dict) -> dict:
+    """Probabilité de départ et catégorie pour des features de rétention (modèle chargé)."""
+    import numpy as np
+    from hireform.cv_features import FEATURE_COLUMNS
+
+    X = np.array([[features[c] for c in FEATURE_COLUMNS]])
+    try:
+        with stage("predict"):
+            prob = float(model.predict_proba(X)[0][1])
+    except Exception as e:
+        logger.exception("Prédiction de rétention en échec")
         raise HTTPException(500, f"Erreur modèle : {e}")
 
-    # 6) Catégorisation
     category = "High risk" if prob > 0.5 else "Low risk"
 
     return {
         "risk_score": round(prob, 3),
         "risk_category": category,
         "features": {
-            "avg_tenure_months": round(avg_tenure, 1),
-            "num_positions": num_positions,
-            "num_breaks": breaks,
-            "num_skills": num_skills,
-            "esco_skills_mapped": esco_skills,
-            "esco_titles_mapped": num_esco_titles
+            **features,
+            "avg_tenure_months": round(features["avg_tenure_months"], 1),
         }
     }
+
+# Application autonome (uvicorn predict-cv-retention:app) : chargement dès le démarrage.
+# La passerelle (gateway.py) monte seulement `router` : chargement au premier appel.
+app = FastAPI(title="Hireform CV Retention Predictor", lifespan=lifespan, default_response_class=ORJSONResponse)
+app.include_router(router)
+configure_logging_on_startup(app)
+instrument(app)
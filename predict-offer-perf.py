@@ -1,32 +1,65 @@
-from fastapi import FastAPI, Request, HTTPException, Depends, Header
-from fastapi.security import APIKeyHeader
+from fastapi import APIRouter, FastAPI, Request, HTTPException, Depends, Header, Query
 import json
-from openai import OpenAI
+import logging
 from typing import Optional
 
-app = FastAPI(title="Hireform Job Ad Performance Predictor")
+from hireform.llm import complete_json, get_openai_client
+from hireform.logs import configure_logging_on_startup
+from hireform.metrics import instrument, stage
+from hireform.offer_scoring import score_offer
+from hireform.responses import ORJSONResponse
+from hireform.security import validate_api_key
+from hireform.singleflight import llm_flight, request_key, stats_router
+from hireform.validation import InvalidOutput, compile_schema
 
-# On récupère la clé OpenAI depuis le header "api-key"
-api_key_header = APIKeyHeader(name="api-key", auto_error=True)
+logger = logging.getLogger(__name__)
+router = APIRouter(tags=["predict-offer-perf"], default_response_class=ORJSONResponse)
 
-@app.post("/predict-offer-perf/")
+MODEL = "gpt-4.1"
+PROMPT_VERSION = "offer-perf-v1"  # à incrémenter à chaque modification du prompt
+
+# Forme de la réponse demandée dans le prompt, compilée une fois
+OFFER_PERF_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "number", "minimum": 0, "maximum": 100},
+        "category": {"type": "string", "enum": ["Faible", "Moyen", "Bon", "Excellent"]},
+        "click_probability": {"type": "number", "minimum": 0, "maximum": 1},
+        "apply_probability": {"type": "number", "minimum": 0, "maximum": 1},
+        "suggestions": {
+            "type": "object",
+            "properties": {
+                "title": {"type": "string"},
+                "keywords": {"type": "array", "items": {"type": "string"}},
+                "structure": {"type": "string"}
+            },
+            "required": ["title", "keywords", "structure"]
+        }
+    },
+    "required": ["score", "category", "click_probability", "apply_probability", "suggestions"]
+}
+validate_offer_perf = compile_schema(OFFER_PERF_SCHEMA)
+
+@router.post("/predict-offer-perf/")
 async def predict_offer_perf(
     request: Request,
-    openai_key: str = Depends(api_key_header),
-    target_lang: Optional[str] = Header("EN", alias="target-lang")
+    openai_key: str = Depends(validate_api_key),  # clé OpenAI (header "api-key")
+    target_lang: Optional[str] = Header("EN", alias="target-lang"),
+    mode: str = Query("full", pattern="^(full|fast)$",
+                      description="full : analyse GPT-4.1, fast : modèle local en quelques ms")
 ):
-    # Validation basique du format de la clé
-    if not openai_key.startswith("sk-"):
-        raise HTTPException(status_code=401, detail="OpenAI API key invalide")
-
     # Lecture dynamique du JSON de l'annonce
     try:
         ad = await request.json()
     except Exception:
         raise HTTPException(status_code=400, detail="JSON invalide")
+    if not isinstance(ad, dict):
+        raise HTTPException(status_code=400, detail="L'annonce doit être un objet JSON")
 
-    # Instanciation du client OpenAI avec la clé reçue
-    client = OpenAI(api_key=openai_key)
+    # Mode fast : features déterministes + modèle embarqué, sans appel OpenAI
+    if mode == "fast":
+        with stage("score"):
+            return score_offer(ad)
 
     # Prompt exactement comme souhaité
     prompt = f"""
@@ -54,18 +87,35 @@ Analysez l'annonce ci-dessous et renvoyez un objet JSON avec :
 - Répondez uniquement en JSON, sans autre texte.
 """
 
-    # Appel à l’API GPT-4.1
-    try:
-        response = await client.chat.completions.create(
-            model="gpt-4.1",
-            messages=[
-                {"role": "system", "content": "Vous êtes un assistant expert en marketing RH."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erreur OpenAI : {e}")
+    async def call_llm():
+        # Appel à l’API GPT-4.1 (client partagé pour la clé reçue) ; JSON validé
+        # contre OFFER_PERF_SCHEMA, une relance ciblée si invalide
+        try:
+            return await complete_json(
+                get_openai_client(openai_key), validate_offer_perf,
+                model=MODEL,
+                messages=[
+                    {"role": "system", "content": "Vous êtes un assistant expert en marketing RH."},
+                    {"role": "user", "content": prompt}
+                ]
+            )
+        except HTTPException:
+            raise
+        except InvalidOutput as e:
+            logger.warning("Réponse OpenAI invalide après relance : %s", e)
+            raise HTTPException(status_code=502, detail=f"Réponse OpenAI non valide : {e}")
+        except Exception as e:
+            logger.exception("Appel OpenAI en échec")
+            raise HTTPException(status_code=500, detail=f"Erreur OpenAI : {e}")
+
+    # Les analyses identiques en cours (retries, recruteurs simultanés) partagent un seul appel
+    key = request_key("predict-offer-perf", MODEL, PROMPT_VERSION, ad, openai_key)
+    return ORJSONResponse(await llm_flight.do(key, call_llm, label="predict-offer-perf"))
+
 
-    # Retour direct du JSON généré
-    content = response.choices[0].message["content"]
-    return json.loads(content)
+# Application autonome (uvicorn predict-offer-perf:app) ; la passerelle (gateway.py) monte `router`
+app = FastAPI(title="Hireform Job Ad Performance Predictor", default_response_class=ORJSONResponse)
+app.include_router(router)
+app.include_router(stats_router)
+configure_logging_on_startup(app)
+instrument(app)
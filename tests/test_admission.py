@@ -0,0 +1,179 @@
+"""
+Contrôle d'admission (hireform.admission) : jeton interne, passage de relais
+et délai d'attente des pools, quotas par clé.
+
+    python -m pytest tests/test_admission.py
+"""
+import asyncio
+import os
+import stat
+import sys
+
+import pytest
+from fastapi import HTTPException
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hireform import admission  # noqa: E402
+from hireform.admission import INTERNAL_HEADER, ClientQuota, Pool  # noqa: E402
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+# --- Jeton interne
+@pytest.fixture
+def runtime_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "run"
+    directory.mkdir(mode=0o700)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(directory))
+    monkeypatch.delenv("HIREFORM_INTERNAL_TOKEN", raising=False)
+    monkeypatch.setattr(admission, "_internal_token", None)
+    return directory
+
+
+def test_token_created_lazily_private_and_shared(runtime_dir):
+    path = runtime_dir / admission.TOKEN_NAME
+    assert not path.exists()  # rien d'écrit à l'import
+    token = admission.internal_headers()[INTERNAL_HEADER]
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    assert path.read_text() == token
+    assert admission._shared_token() == token  # relu par les autres workers
+
+
+def test_token_from_environment(runtime_dir, monkeypatch):
+    monkeypatch.setenv("HIREFORM_INTERNAL_TOKEN", "secret")
+    assert admission.internal_headers() == {INTERNAL_HEADER: "secret"}
+    assert not (runtime_dir / admission.TOKEN_NAME).exists()
+
+
+def test_token_readable_by_others_rejected(runtime_dir):
+    path = runtime_dir / admission.TOKEN_NAME
+    path.write_text("planted")
+    path.chmod(0o644)
+    with pytest.raises(RuntimeError, match="privé"):
+        admission.internal_headers()
+
+
+def test_token_symlink_rejected(runtime_dir, tmp_path):
+    target = tmp_path / "elsewhere"
+    target.write_text("planted")
+    (runtime_dir / admission.TOKEN_NAME).symlink_to(target)
+    with pytest.raises(OSError):
+        admission.internal_headers()
+
+
+def test_shared_directory_rejected(runtime_dir):
+    runtime_dir.chmod(0o755)
+    with pytest.raises(RuntimeError, match="privé"):
+        admission.internal_headers()
+
+
+# --- Pools
+def test_released_slot_handed_to_first_waiter():
+    async def main():
+        pool = Pool("test", 1, 4, max_wait=1)
+        order = []
+
+        async def worker(name):
+            await pool.acquire()
+            order.append(name)
+            await asyncio.sleep(0.01)
+            pool.release()
+
+        await pool.acquire()
+        tasks = [asyncio.create_task(worker(n)) for n in ("b", "c")]
+        await asyncio.sleep(0.01)
+        assert len(pool.waiters) == 2 and pool.active == 1
+        pool.release()
+        await asyncio.gather(*tasks)
+        assert order == ["b", "c"]  # FIFO
+        assert pool.active == 0 and not pool.waiters
+    run(main())
+
+
+def test_queue_timeout_and_full_queue():
+    async def main():
+        pool = Pool("test", 1, 1, max_wait=0.05)
+        await pool.acquire()
+        waiting = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as full:
+            await pool.acquire()
+        assert full.value.status_code == 429 and "Retry-After" in full.value.headers
+        with pytest.raises(HTTPException) as timeout:
+            await waiting
+        assert timeout.value.status_code == 503
+        assert not pool.waiters and pool.active == 1  # l'attente abandonnée ne garde rien
+        pool.release()
+        assert pool.active == 0
+    run(main())
+
+
+def test_cancelled_waiter_gives_slot_back():
+    async def main():
+        pool = Pool("test", 1, 2, max_wait=1)
+        await pool.acquire()
+        waiting = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        pool.release()
+        assert pool.active == 0 and not pool.waiters
+    run(main())
+
+
+# --- Quotas par clé
+@pytest.fixture
+def quotas(monkeypatch):
+    monkeypatch.setattr(admission, "ENABLED", True)
+    monkeypatch.setattr(admission, "_clients", {})
+    monkeypatch.setattr(admission, "KEY_QUEUE", 0)
+    monkeypatch.setattr(admission, "KEY_LIMITS", {"sk-big": (4, 0)})
+    monkeypatch.setattr(admission, "KEY_CONCURRENCY", 1)
+    monkeypatch.setattr(admission, "KEY_RPM", 2)
+    monkeypatch.setattr(admission, "_internal_token", b"internal")
+    return admission
+
+
+def test_key_rate_limit(quotas):
+    async def main():
+        for _ in range(2):
+            async with quotas.admit_client("sk-a", {}):
+                pass
+        with pytest.raises(HTTPException) as limited:
+            async with quotas.admit_client("sk-a", {}):
+                pass
+        assert limited.value.status_code == 429 and int(limited.value.headers["Retry-After"]) >= 1
+        async with quotas.admit_client("sk-b", {}):  # quota propre à chaque clé
+            pass
+    run(main())
+
+
+def test_key_concurrency_and_overrides(quotas):
+    async def main():
+        async with quotas.admit_client("sk-a", {}):
+            with pytest.raises(HTTPException) as busy:
+                async with quotas.admit_client("sk-a", {}):
+                    pass
+            assert busy.value.status_code == 429
+            # Sous-requête interne : hors quota
+            async with quotas.admit_client("sk-a", {INTERNAL_HEADER: "internal"}):
+                pass
+            with pytest.raises(HTTPException):
+                async with quotas.admit_client("sk-a", {INTERNAL_HEADER: "forged"}):
+                    pass
+        assert quotas.client_quota("sk-big").pool.limit == 4
+        assert quotas.client_quota("sk-big").bucket is None  # rpm 0 : illimité
+    run(main())
+
+
+def test_quota_table_bounded(quotas, monkeypatch):
+    monkeypatch.setattr(quotas, "MAX_CLIENTS", 3)
+    for i in range(5):
+        quotas.client_quota(f"sk-{i}")
+    assert len(quotas._clients) <= 3 and "sk-4" in quotas._clients
+    assert isinstance(quotas._clients["sk-4"], ClientQuota)
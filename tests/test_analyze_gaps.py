@@ -0,0 +1,54 @@
+"""
+Trous de carrière d'/analyze-gaps/ (hireform.cv_compact.career_gaps).
+
+    python -m pytest tests/test_analyze_gaps.py
+"""
+import importlib
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+HEADERS = {"api-key": "sk-test"}
+
+
+@pytest.fixture(scope="module")
+def client():
+    module = importlib.import_module("analyze-gaps")
+    with TestClient(module.app) as client:
+        yield client
+
+
+def experience(start, end, company="Acme"):
+    return {"company": company, "role": "Développeur", "start_date": start, "end_date": end}
+
+
+def test_gap_measured_from_older_end_to_newer_start(client):
+    cv = {"experience": [
+        experience("2021-02", "2022-01", "C"),
+        experience("2018-01", "2019-06", "A"),
+        experience("2019-12", "2021-01", "B"),
+    ]}
+    response = client.post("/analyze-gaps/", json=cv, headers=HEADERS)
+    assert response.status_code == 200
+    gaps = response.json()["career_gaps"]
+    assert [(g["start"], g["end"], g["duration_months"]) for g in gaps] == [("2019-06", "2019-12", 6)]
+
+
+def test_gaps_listed_newest_first(client):
+    cv = {"experience": [experience("2010-01", "2011-01"), experience("2012-01", "2013-01"),
+                         experience("2014-01", "2015-01")]}
+    response = client.post("/analyze-gaps/", params={"gap_threshold": 6}, json=cv, headers=HEADERS)
+    assert [g["start"] for g in response.json()["career_gaps"]] == ["2013-01", "2011-01"]
+
+
+@pytest.mark.parametrize("start, end", [("2020/01", "2021-01"), ("2020-01", "présent"), ("2020-13", "2021-01")])
+def test_unreadable_date_is_422(client, start, end):
+    cv = {"experience": [experience(start, end), experience("2022-01", "2023-01")]}
+    response = client.post("/analyze-gaps/", json=cv, headers=HEADERS)
+    assert response.status_code == 422
+    assert "Format invalide" in response.json()["detail"]
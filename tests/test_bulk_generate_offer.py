@@ -0,0 +1,87 @@
+"""
+Reprise de bulk-generate-offer sur checkpoint : les lignes déjà faites ne sont
+pas régénérées, les échecs le sont à la reprise. L'appel OpenAI (generate_one)
+est remplacé par une fonction locale.
+
+    python -m pytest tests/test_bulk_generate_offer.py
+"""
+import asyncio
+import importlib
+import json
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("openai")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hireform.rate_limiter import RateLimiter  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def bulk():
+    return importlib.import_module("bulk-generate-offer")
+
+
+@pytest.fixture
+def files(tmp_path):
+    jobs = tmp_path / "jobs.jsonl"
+    lines = [json.dumps({"title": f"Poste {n}", "location": "Lyon", "company_name": "Acme"}) for n in range(1, 6)]
+    lines.insert(2, "")  # ligne vide : numéro 3, ignorée
+    jobs.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(jobs), str(tmp_path / "postings.jsonl")
+
+
+def generator(monkeypatch, bulk, fail=()):
+    """Remplace l'appel OpenAI ; renvoie la liste des titres générés."""
+    calls = []
+
+    async def generate_one(job, api_key, limiter):
+        calls.append(job.title)
+        if job.title in fail:
+            raise RuntimeError("quota")
+        return f"Description de {job.title}"
+
+    monkeypatch.setattr(bulk, "generate_one", generate_one)
+    return calls
+
+
+def run(bulk, files, concurrency=2) -> dict:
+    return asyncio.run(bulk.run(*files, "sk-test", RateLimiter(), concurrency))
+
+
+def read_lines(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [line for line in f.read().splitlines() if line]
+
+
+def test_resume_skips_checkpointed_lines(bulk, files, monkeypatch):
+    jobs, output = files
+    with open(output + ".checkpoint", "w", encoding="utf-8") as f:
+        f.write("1\n4\n")  # lot interrompu : lignes 1 et 4 déjà écrites
+    calls = generator(monkeypatch, bulk)
+    counts = run(bulk, files)
+    assert sorted(calls) == ["Poste 2", "Poste 4", "Poste 5"]  # lignes 2, 5 et 6
+    assert (counts["skipped"], counts["generated"], counts["failed"]) == (2, 3, 0)
+    assert sorted(bulk.load_checkpoint(output + ".checkpoint")) == [1, 2, 4, 5, 6]
+    assert sorted(json.loads(line)["line"] for line in read_lines(output)) == [2, 5, 6]
+
+
+def test_failures_retried_on_resume(bulk, files, monkeypatch):
+    jobs, output = files
+    calls = generator(monkeypatch, bulk, fail={"Poste 3"})
+    counts = run(bulk, files)
+    assert (counts["generated"], counts["failed"]) == (4, 1)
+    assert [json.loads(line)["line"] for line in read_lines(output + ".errors.jsonl")] == [4]
+    assert 4 not in bulk.load_checkpoint(output + ".checkpoint")
+
+    calls = generator(monkeypatch, bulk)
+    counts = run(bulk, files)
+    assert calls == ["Poste 3"]  # seul l'échec est repris
+    assert (counts["skipped"], counts["generated"], counts["failed"]) == (4, 1, 0)
+    postings = [json.loads(line) for line in read_lines(output)]
+    assert sorted(p["line"] for p in postings) == [1, 2, 4, 5, 6]  # chaque offre une seule fois
+    assert all(p["job_posting"]["title"] == f"Poste {p['line'] - (p['line'] > 3)}" for p in postings)
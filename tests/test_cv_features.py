@@ -0,0 +1,73 @@
+"""
+Features de rétention : la version unitaire (/predict-cv-retention/, /analyze-cv/)
+et la version en lot (bulk-score-cv) donnent les mêmes valeurs sur les mêmes CV.
+
+    python -m pytest tests/test_cv_features.py
+"""
+import os
+import sys
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hireform.cv_features import FEATURE_COLUMNS, chunk_features, retention_features  # noqa: E402
+
+ESCO = frozenset({"développeur", "python", "sql"})
+
+
+def job(role, start, end="2021-01", **extra):
+    return {"role": role, "company": "Acme", "start_date": start, "end_date": end, **extra}
+
+
+CVS = {
+    "closed_positions": {"experience": [job("Développeur", "2015-03", "2017-02"), job("Chef de projet", "2017-09")],
+                         "skills": ["Python", "SQL", "Excel"]},
+    "current_job_present": {"experience": [job("Développeur", "2018-01", "2020-01"), job("Lead", "2020-06", "present")],
+                            "skills": {"Python": ["langage"], "Docker": ["outil"]}},
+    "current_job_variants": {"experience": [job("a", "2012-01", "2014-06"), job("b", "2014-07", "En cours"),
+                                            job("c", "2016-01", ""), job("d", "2019-04", None)],
+                             "skills": []},
+    "current_job_without_end_key": {"experience": [{"role": "Développeur", "start_date": "2022-02"}],
+                                    "skills": ["sql"]},
+    "undated_role": {"experience": [job("Développeur", None, None), job("Stagiaire", "2019-01", "2019-07")],
+                     "skills": ["python"]},
+    "free_form_dates": {"experience": [job("Analyste", "Jan 2016", "2018"), job("Développeur", "2018-09", "2023-03-15")],
+                        "skills": ["Python"]},
+    "unordered": {"experience": [job("b", "2020-01", "2022-01"), job("a", "2010-05", "2011-05")],
+                  "skills": ["SQL"]},
+}
+
+
+@pytest.fixture(scope="module")
+def batch():
+    frame = pd.DataFrame({"experience": [cv["experience"] for cv in CVS.values()],
+                          "skills": [cv["skills"] for cv in CVS.values()]})
+    return chunk_features(frame, ESCO)
+
+
+@pytest.mark.parametrize("position, name", list(enumerate(CVS)))
+def test_single_and_batch_features_match(batch, position, name):
+    single = retention_features(CVS[name], ESCO)
+    row = batch.iloc[position]
+    for column in FEATURE_COLUMNS:
+        assert row[column] == pytest.approx(single[column]), column
+
+
+def test_current_job_counts_until_today(batch):
+    # Poste en cours gardé : 2 postes et une pause, comme l'endpoint
+    row = batch.iloc[list(CVS).index("current_job_present")]
+    assert (row["num_positions"], row["num_breaks"]) == (2, 1)
+    assert row["avg_tenure_months"] > 24
+
+
+def test_no_dated_experience():
+    cv = {"experience": [job("Développeur", None, None)], "skills": ["python"]}
+    with pytest.raises(ValueError):
+        retention_features(cv, ESCO)
+    row = chunk_features(pd.DataFrame({"experience": [cv["experience"]], "skills": [cv["skills"]]}), ESCO).iloc[0]
+    assert row[["avg_tenure_months", "num_positions", "num_breaks"]].isna().all()
+    assert row["esco_titles_mapped"] == 1
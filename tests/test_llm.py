@@ -0,0 +1,59 @@
+"""
+Cache des clients OpenAI par clé (hireform.llm) : éviction et fermeture.
+
+    python -m pytest tests/test_llm.py
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hireform import llm  # noqa: E402
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(llm, "OPENAI_CLIENTS_MAX", 2)
+    monkeypatch.setattr(llm, "CLOSE_GRACE_S", 0.01)
+    monkeypatch.setattr(llm, "_clients", type(llm._clients)())
+    monkeypatch.setattr(llm, "_closing", {})
+    return llm
+
+
+def test_client_reused_per_key(cache):
+    async def main():
+        client = cache.get_openai_client("sk-a")
+        assert cache.get_openai_client("sk-a") is client
+        assert cache.get_openai_client("sk-b") is not client
+        await cache.close_openai_clients()
+    asyncio.run(main())
+
+
+def test_evicted_client_closed_after_grace(cache):
+    async def main():
+        a = cache.get_openai_client("sk-a")
+        b = cache.get_openai_client("sk-b")
+        cache.get_openai_client("sk-a")  # sk-b devient le moins récent
+        cache.get_openai_client("sk-c")
+        assert list(cache._clients) == ["sk-a", "sk-c"]
+        assert not b.is_closed()  # requêtes en cours : fermeture différée
+        await asyncio.sleep(0.05)
+        assert b.is_closed() and not a.is_closed()
+        await cache.close_openai_clients()
+        assert a.is_closed()
+    asyncio.run(main())
+
+
+def test_shutdown_closes_pending_evictions(cache, monkeypatch):
+    monkeypatch.setattr(cache, "CLOSE_GRACE_S", 60)
+
+    async def main():
+        clients = [cache.get_openai_client(f"sk-{i}") for i in range(3)]
+        await cache.close_openai_clients()
+        assert all(client.is_closed() for client in clients)
+        assert not cache._closing
+    asyncio.run(main())
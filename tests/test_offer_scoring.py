@@ -0,0 +1,109 @@
+"""
+Scoring local des annonces (hireform.offer_scoring, /predict-offer-perf/?mode=fast) :
+features et scores figés sur des annonces connues. Une recalibration de
+offer_perf_model.json doit mettre à jour EXPECTED.
+
+    python -m pytest tests/test_offer_scoring.py
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hireform.offer_scoring import FEATURES, extract_features, load_model, score_offer  # noqa: E402
+
+OFFERS = {
+    "complete": {
+        "title": "Développeur Python senior en CDI à Lyon",
+        "location": "Lyon",
+        "salary": "55 000 € brut annuel",
+        "description": (
+            "Contexte : Acme est une entreprise de 40 personnes qui édite un logiciel RH.\n"
+            "Vos missions :\n"
+            "- Concevoir les API du produit.\n"
+            "- Revoir le code de l'équipe.\n"
+            "- Accompagner la formation des juniors.\n"
+            "Avantages : télétravail deux jours par semaine, mutuelle, RTT, évolution de carrière.\n"
+            "Postulez en envoyant votre CV."
+        ),
+    },
+    "medium": {
+        "title": "Chargé de recrutement H/F",
+        "jobLocation": {"addressLocality": "Nantes"},
+        "description": "Vos missions : sourcer les candidats, mener les entretiens et suivre l'intégration. "
+                       "Rejoignez une équipe en croissance.",
+    },
+    "minimal": {"title": "Dev", "description": "Nous cherchons un dev."},
+    "empty": {},
+}
+
+# (score, category, click_probability, apply_probability) avec le modèle embarqué
+EXPECTED = {
+    "complete": (94, "Excellent", 0.0974, 0.0291),
+    "medium": (44, "Moyen", 0.0248, 0.0052),
+    "minimal": (18, "Faible", 0.0113, 0.0019),
+    "empty": (0, "Faible", 0.007, 0.0007),
+}
+
+
+def test_features_of_known_offers():
+    complete = extract_features(OFFERS["complete"])
+    assert {k: v for k, v in complete.items() if k not in ("keyword_coverage", "readability", "log_words")} == {
+        "title_words": 7, "title_in_range": 1, "has_salary": 1, "has_location": 1,
+        "section_coverage": 1, "has_cta": 1, "bullet_ratio": 0.3,
+    }
+    assert complete["keyword_coverage"] == pytest.approx(9 / 14)
+    assert complete["readability"] == pytest.approx(0.61296, abs=1e-5)
+    assert complete["log_words"] == pytest.approx(4.09434, abs=1e-5)  # 59 mots
+
+    medium = extract_features(OFFERS["medium"])
+    assert (medium["title_words"], medium["has_location"], medium["has_salary"]) == (5, 1, 0)  # clé imbriquée
+    assert medium["section_coverage"] == pytest.approx(1 / 3) and medium["has_cta"] == 1
+
+    assert extract_features(OFFERS["empty"]) == dict.fromkeys(FEATURES, 0.0)
+
+
+@pytest.mark.parametrize("name", list(OFFERS))
+def test_scores_pinned_with_embedded_model(name):
+    result = score_offer(OFFERS[name])
+    assert (result["score"], result["category"], result["click_probability"], result["apply_probability"]) \
+        == EXPECTED[name]
+    assert set(result["suggestions"]) == {"title", "keywords", "structure"}
+
+
+def test_suggestions():
+    complete = score_offer(OFFERS["complete"])["suggestions"]
+    assert complete["structure"] == "Structure complète (Contexte, Responsabilités, Avantages)."
+    assert complete["keywords"] == ["salaire", "autonomie", "flexible", "projet", "collaboration"]
+    minimal = score_offer(OFFERS["minimal"])["suggestions"]
+    assert minimal["title"].startswith("Titre trop court (1 mots)")
+    assert "Contexte, Responsabilités, Avantages" in minimal["structure"] and "Postulez" in minimal["structure"]
+
+
+def test_linear_model_and_clamping():
+    # Modèle fixe, indépendant des coefficients embarqués
+    n = len(FEATURES)
+    model = {
+        "features": FEATURES, "mean": [0.0] * n, "scale": [1.0] * n,
+        "score": {"intercept": 10.0, "weights": [0, 20, 15, 5, 30, 0, 0, 0, 10, 0]},
+        "click": {"intercept": 0.0, "weights": [0.0] * n},
+        "apply": {"intercept": -800.0, "weights": [0.0] * n},
+    }
+    result = score_offer(OFFERS["medium"], model)
+    assert result["score"] == 55 and result["category"] == "Moyen"  # 10 + 20 + 5 + 30 × 1/3 + 10
+    assert (result["click_probability"], result["apply_probability"]) == (0.5, 0.0)
+    assert score_offer(OFFERS["complete"], model)["score"] == 90
+    model["score"]["intercept"] = 500.0
+    assert score_offer(OFFERS["empty"], model)["score"] == 100  # borné à [0, 100]
+    model["score"]["intercept"] = -500.0
+    assert score_offer(OFFERS["complete"], model)["score"] == 0
+
+
+def test_embedded_model_matches_features():
+    model = load_model()
+    assert model["features"] == FEATURES
+    assert len(model["mean"]) == len(model["scale"]) == len(FEATURES)
+    assert all(len(model[head]["weights"]) == len(FEATURES) for head in ("score", "click", "apply"))
@@ -0,0 +1,83 @@
+"""
+Parité des backends d'extraction des mots PDF (hireform.pdf_text) : mêmes
+mots, coordonnées à 0,5 pt près et même texte en colonnes (main.extract_text_columns)
+avec pdfium et pdfplumber, y compris sur les pages hors du cas simple.
+
+    python -m pytest tests/test_pdf_text.py
+"""
+import importlib
+import os
+import random
+import sys
+
+import pytest
+
+pytest.importorskip("pypdfium2")
+pytest.importorskip("pdfplumber")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench.corpus import cv_pdf, make_cv, pdf_bytes  # noqa: E402
+from hireform.pdf_text import page_words  # noqa: E402
+
+TOLERANCE = 0.5
+COORDINATES = ("x0", "x1", "top", "bottom", "doctop", "height")
+
+TWO_COLUMNS = [(40, 800, "Sarah Khelifi"), (40, 786, "Compétences"), (300, 800, "Expériences"),
+               (300, 786, "Développeuse – Acme"), (300, 772, "2019-05 – 2023-01")]
+VERTICAL = (0, 1, -1, 0)
+
+CASES = {
+    "mediabox_offset": ([TWO_COLUMNS], [b"/MediaBox [20 30 615 872]"]),
+    "mediabox_negative": ([TWO_COLUMNS], [b"/MediaBox [-20 -100 575 742]"]),
+    "cropbox": ([TWO_COLUMNS], [b"/MediaBox [10 20 605 862] /CropBox [30 40 565 812]"]),
+    "scaled_text": ([TWO_COLUMNS + [(40, 600, "note réduite", (0.7, 0, 0, 0.7)),
+                                    (300, 600, "Titre agrandi", (1.8, 0, 0, 1.8))]], None),
+    "rotated_page": ([TWO_COLUMNS, TWO_COLUMNS], [b"/MediaBox [0 0 595 842]", b"/MediaBox [0 0 595 842] /Rotate 90"]),
+    "rotated_text": ([TWO_COLUMNS + [(570, 300, "Texte vertical", VERTICAL)]], None),
+}
+
+
+@pytest.fixture(scope="module")
+def main():
+    return importlib.import_module("main")
+
+
+def write(tmp_path, name: str, data: bytes) -> str:
+    path = tmp_path / f"{name}.pdf"
+    path.write_bytes(data)
+    return str(path)
+
+
+def assert_parity(path: str, main, same_order: bool = True):
+    reference, candidate = page_words(path, "pdfplumber"), page_words(path, "pdfium")
+    if not same_order:
+        reference, candidate = ([sorted(words, key=lambda w: w["x0"]) for words in pages]
+                                for pages in (reference, candidate))
+    assert [[w["text"] for w in words] for words in candidate] == [[w["text"] for w in words] for words in reference]
+    for ref, cand in zip(reference, candidate):
+        for a, b in zip(ref, cand):
+            assert a["upright"] == b["upright"], a["text"]
+            for key in COORDINATES:
+                assert abs(a[key] - b[key]) <= TOLERANCE, (a["text"], key, a[key], b[key])
+    assert main.extract_text_columns(path, "pdfium") == main.extract_text_columns(path, "pdfplumber")
+
+
+@pytest.mark.parametrize("columns", [1, 2])
+def test_parity_on_cv(tmp_path, main, columns):
+    path = write(tmp_path, "cv", cv_pdf(make_cv(random.Random(7), 40), columns))
+    assert_parity(path, main)
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_parity_on_page_geometry(tmp_path, main, name):
+    pages, boxes = CASES[name]
+    assert_parity(write(tmp_path, name, pdf_bytes(pages, boxes=boxes)), main)
+
+
+def test_same_baseline_written_right_to_left(tmp_path, main):
+    # pdfium range par x les mots d'une même ligne de base, pdfplumber suit le
+    # flux : seul l'ordre brut diffère, le texte en colonnes est le même
+    lines = [(300, 600, "Titre agrandi", (1.8, 0, 0, 1.8)), (40, 600, "note réduite")]
+    assert_parity(write(tmp_path, "right_to_left", pdf_bytes([lines])), main, same_order=False)
@@ -0,0 +1,126 @@
+"""
+Ordonnanceur OpenAI (hireform.rate_limiter) sur horloge factice : rafale et
+remplissage des seaux, attente de RateLimiter.acquire, recalage sur les
+en-têtes x-ratelimit-*, backoff.
+
+    python -m pytest tests/test_rate_limiter.py
+"""
+import asyncio
+import os
+import sys
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hireform import rate_limiter  # noqa: E402
+from hireform.rate_limiter import RateLimiter, TokenBucket, parse_duration  # noqa: E402
+
+
+class Clock:
+    """Horloge factice : `sleep` avance le temps au lieu d'attendre."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Seules les références du module sont remplacées : la boucle asyncio garde la vraie horloge
+    monkeypatch.setattr(rate_limiter, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def test_parse_duration():
+    assert parse_duration("6m0s") == 360
+    assert parse_duration("20ms") == pytest.approx(0.02)
+    assert parse_duration("1.5s") == 1.5
+    assert parse_duration("2") == 2
+    assert parse_duration("") is None and parse_duration("bientôt") is None
+
+
+def test_bucket_burst_then_refill(clock):
+    bucket = TokenBucket(60)  # 1 par seconde, rafale de 60
+    for _ in range(60):
+        assert bucket.wait_time(1) == 0
+        bucket.level -= 1
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    clock.now += 0.25
+    assert bucket.wait_time(1) == pytest.approx(0.75)
+    clock.now += 30
+    bucket.refill()
+    assert bucket.level == pytest.approx(30.25)
+    clock.now += 3600
+    bucket.refill()
+    assert bucket.level == 60  # plafonné à la capacité
+    assert bucket.wait_time(500) == 0  # demande plafonnée : jamais d'attente infinie
+
+
+def test_bucket_sync_on_headers(clock):
+    bucket = TokenBucket(60)
+    bucket.sync(limit=120, remaining=10, reset=5)
+    assert (bucket.capacity, bucket.level) == (120, 10)
+    assert bucket.rate == pytest.approx(110 / 5)  # plein dans 5 s, comme annoncé
+    bucket.sync(limit=None, remaining=50, reset=None)
+    assert bucket.level == 10  # jamais relevé par le serveur, seulement abaissé
+
+
+def test_acquire_waits_for_tokens(clock, monkeypatch):
+    async def main():
+        limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=1200)
+        monkeypatch.setattr(rate_limiter, "asyncio", types.SimpleNamespace(sleep=clock.sleep))
+        await limiter.acquire(500)
+        await limiter.acquire(500)
+        assert clock.sleeps == []  # rafale
+        await limiter.acquire(500)  # 200 tokens restants, 20/s : 15 s
+        assert clock.sleeps == [pytest.approx(15.0)]
+        assert limiter.stats["acquired"] == 3 and limiter.stats["waited_s"] == pytest.approx(15.0)
+
+        limiter.settle(500, 100)  # usage réel inférieur à l'estimation : rendu au seau
+        assert limiter.tokens.level == pytest.approx(400)
+        await limiter.acquire(400)
+        assert len(clock.sleeps) == 1
+    asyncio.run(main())
+
+
+def test_acquire_waits_for_requests(clock, monkeypatch):
+    async def main():
+        limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=100_000)
+        monkeypatch.setattr(rate_limiter, "asyncio", types.SimpleNamespace(sleep=clock.sleep))
+        for _ in range(3):
+            await limiter.acquire(10)
+        assert clock.sleeps == [pytest.approx(30.0)]  # 2/min : une requête toutes les 30 s
+    asyncio.run(main())
+
+
+def test_update_from_headers(clock):
+    limiter = RateLimiter(requests_per_minute=500, tokens_per_minute=30_000)
+    limiter.update_from_headers({"content-type": "application/json"})
+    assert limiter.stats["header_syncs"] == 0
+    limiter.update_from_headers({
+        "x-ratelimit-limit-requests": "100", "x-ratelimit-remaining-requests": "0",
+        "x-ratelimit-reset-requests": "600ms",
+        "x-ratelimit-limit-tokens": "10000", "x-ratelimit-remaining-tokens": "abc",
+    })
+    assert (limiter.requests.capacity, limiter.requests.level) == (100, 0)
+    assert limiter.requests.wait_time(1) == pytest.approx(0.006)
+    assert limiter.tokens.capacity == 10_000 and limiter.stats["header_syncs"] == 1
+
+
+def test_backoff_bounds(monkeypatch):
+    limiter = RateLimiter(base_delay=1.0, max_delay=8.0)
+    monkeypatch.setattr(rate_limiter, "random", types.SimpleNamespace(uniform=lambda low, high: high))
+    assert [limiter.backoff(attempt) for attempt in (1, 2, 3, 4, 5)] == [1, 2, 4, 8, 8]
+    assert limiter.backoff(1, retry_after=20) == 21
+    assert limiter.stats["retries"] == 6
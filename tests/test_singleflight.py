@@ -0,0 +1,119 @@
+"""
+Coalescence des appels LLM (hireform.singleflight) : un seul appel amont pour
+des requêtes simultanées identiques, cache court, erreurs propagées sans être
+mises en cache, route de statistiques réservée au jeton interne.
+
+    python -m pytest tests/test_singleflight.py
+"""
+import asyncio
+import os
+import sys
+import types
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hireform import admission, singleflight  # noqa: E402
+from hireform.admission import INTERNAL_HEADER  # noqa: E402
+from hireform.singleflight import SingleFlight, request_key, stats_router  # noqa: E402
+
+
+class Upstream:
+    """Appel amont factice : compte les appels, répond après `delay`."""
+
+    def __init__(self, delay: float = 0.02, error: Exception = None):
+        self.calls, self.delay, self.error = 0, delay, error
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {"score": 72, "calls": self.calls}
+
+
+def test_request_key_canonical_and_per_api_key():
+    key = request_key("/audit-bias/", "gpt-4o-mini", "v1", {"a": 1, "b": [1, 2]}, "sk-a")
+    assert key == request_key("/audit-bias/", "gpt-4o-mini", "v1", {"b": [1, 2], "a": 1}, "sk-a")
+    assert key != request_key("/audit-bias/", "gpt-4o-mini", "v1", {"a": 1, "b": [1, 2]}, "sk-b")
+    assert key != request_key("/audit-bias/", "gpt-4o-mini", "v2", {"a": 1, "b": [1, 2]}, "sk-a")
+    assert "sk-a" not in key
+
+
+def test_concurrent_requests_coalesced():
+    async def main():
+        flight, upstream = SingleFlight(ttl=30), Upstream()
+        results = await asyncio.gather(*(flight.do("k", upstream, "audit") for _ in range(10)))
+        assert upstream.calls == 1
+        assert all(r == {"score": 72, "calls": 1} for r in results)
+        results[0]["score"] = 0  # chaque appelant a sa copie
+        assert results[1]["score"] == 72
+        assert await flight.do("k", upstream, "audit") == {"score": 72, "calls": 1}  # cache
+        assert flight.stats()["endpoints"]["audit"] == {"requests": 11, "upstream": 1, "coalesced": 9, "cache_hits": 1}
+        await flight.do("other", upstream, "audit")
+        assert upstream.calls == 2
+    asyncio.run(main())
+
+
+def test_cache_expires_after_ttl(monkeypatch):
+    now = [1000.0]
+    # Horloge du module seulement : la boucle asyncio garde la vraie
+    monkeypatch.setattr(singleflight, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+
+    async def main():
+        flight, upstream = SingleFlight(ttl=30), Upstream(delay=0)
+        await flight.do("k", upstream)
+        now[0] += 29
+        assert (await flight.do("k", upstream))["calls"] == 1
+        now[0] += 2
+        assert (await flight.do("k", upstream))["calls"] == 2
+        assert flight.stats()["cached"] == 1
+    asyncio.run(main())
+
+
+def test_error_propagated_to_all_waiters_and_not_cached():
+    async def main():
+        flight, failing = SingleFlight(ttl=30), Upstream(error=RuntimeError("quota OpenAI"))
+        results = await asyncio.gather(*(flight.do("k", failing) for _ in range(5)), return_exceptions=True)
+        assert failing.calls == 1
+        assert all(isinstance(r, RuntimeError) and str(r) == "quota OpenAI" for r in results)
+        assert flight.stats()["cached"] == 0 and flight.stats()["inflight"] == 0
+        upstream = Upstream()
+        assert await flight.do("k", upstream) == {"score": 72, "calls": 1}  # nouvel essai amont
+    asyncio.run(main())
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    async def main():
+        flight, upstream = SingleFlight(ttl=30), Upstream()
+        first = asyncio.create_task(flight.do("k", upstream))
+        second = asyncio.create_task(flight.do("k", upstream))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == {"score": 72, "calls": 1}
+        assert first.cancelled() and upstream.calls == 1
+    asyncio.run(main())
+
+
+def test_cache_bounded():
+    async def main():
+        flight = SingleFlight(ttl=30, max_entries=2)
+        for key in ("a", "b", "c"):
+            await flight.do(key, Upstream(delay=0))
+        assert list(flight._cache) == ["b", "c"]
+    asyncio.run(main())
+
+
+def test_stats_route_requires_internal_token(monkeypatch):
+    monkeypatch.setattr(admission, "_internal_token", b"internal")
+    app = FastAPI()
+    app.include_router(stats_router)
+    client = TestClient(app)
+    assert client.get("/coalescing-stats").status_code == 403
+    assert client.get("/coalescing-stats", headers={INTERNAL_HEADER: "forged"}).status_code == 403
+    response = client.get("/coalescing-stats", headers={INTERNAL_HEADER: "internal"})
+    assert response.status_code == 200 and set(response.json()) == {"inflight", "cached", "endpoints"}
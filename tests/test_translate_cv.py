@@ -0,0 +1,116 @@
+"""
+Regroupement des appels DeepL de translate-cv et flux NDJSON multi-langues,
+contre le remplaçant local (bench/standins/deepl.py) lancé dans un sous-processus.
+
+    python -m pytest tests/test_translate_cv.py
+"""
+import asyncio
+import importlib
+import json
+import os
+import sys
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench.standins import serve  # noqa: E402
+from hireform.http import close_http_client, get_http_client  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def deepl_url():
+    # Latence variable : les lots se terminent dans le désordre
+    with serve("bench.standins.deepl:app",
+               env={"DEEPL_STANDIN_LATENCY_MS": "20", "DEEPL_STANDIN_JITTER_MS": "15"}) as url:
+        yield url
+
+
+@pytest.fixture
+def service(deepl_url, monkeypatch):
+    module = importlib.import_module("translate-cv")
+    monkeypatch.setattr(module, "DEEPL_API_URL", f"{deepl_url}/v2/translate")
+    monkeypatch.setattr(module, "DEEPL_API_KEY", "test")
+    monkeypatch.setattr(module, "get_memory", lambda: None)  # chaque texte va jusqu'à DeepL
+    # Sémaphore neuf : celui du module est lié à la boucle du test précédent
+    monkeypatch.setattr(module, "_deepl_slots", asyncio.Semaphore(module.DEEPL_MAX_CONCURRENCY))
+    return module
+
+
+def run(coroutine_fn, deepl_url):
+    """Exécute `coroutine_fn()` et renvoie (résultat, requêtes et textes reçus par le remplaçant)."""
+    async def main():
+        client = get_http_client()
+        before = (await client.get(f"{deepl_url}/stats")).json()
+        try:
+            result = await coroutine_fn()
+            after = (await client.get(f"{deepl_url}/stats")).json()
+        finally:
+            await close_http_client()  # client lié à cette boucle d'événements
+        return result, {k: after[k] - before[k] for k in ("requests", "texts")}
+    return asyncio.run(main())
+
+
+def test_batches_split_on_count_and_size(service, deepl_url, monkeypatch):
+    texts = [f"Responsabilité {i}" for i in range(120)]
+    _, calls = run(lambda: service.translate_texts(texts, "EN"), deepl_url)
+    assert calls == {"requests": 3, "texts": 120}  # 50 + 50 + 20
+
+    monkeypatch.setattr(service, "DEEPL_BATCH_BYTES", 100)
+    long_texts = [f"{i:02d}" + "x" * 38 for i in range(5)]  # 40 + 6 octets encodés : 2 par lot
+    _, calls = run(lambda: service.translate_texts(long_texts, "EN"), deepl_url)
+    assert calls == {"requests": 3, "texts": 5}
+
+
+def test_batches_sized_on_encoded_body(service, deepl_url, monkeypatch):
+    # 20 caractères mais 126 octets une fois urlencodés (« é » → « %C3%A9 »)
+    monkeypatch.setattr(service, "DEEPL_BATCH_BYTES", 300)
+    accented = [f"{i:02d}" + "é" * 18 for i in range(5)]
+    _, calls = run(lambda: service.translate_texts(accented, "EN"), deepl_url)
+    assert calls == {"requests": 3, "texts": 5}
+
+
+def test_order_preserved_across_batches(service, deepl_url, monkeypatch):
+    monkeypatch.setattr(service, "DEEPL_BATCH_SIZE", 3)
+    texts = [f"Tâche {i}\nligne {i}" for i in range(40)] + ["Tâche 0\nligne 0"]
+    result, calls = run(lambda: service.translate_texts(texts, "DE"), deepl_url)
+    assert result == [f"[DE] {t}" for t in texts]  # sauts de ligne conservés
+    assert calls == {"requests": 14, "texts": 40}  # doublon envoyé une seule fois
+
+
+def test_whitespace_only_strings_skipped(service, deepl_url):
+    cv = {
+        "summary": "   ",
+        "experience": [{"role": "Développeur", "responsibilities": ["\n\t", "Revue de code", ""]}],
+        "company": "Acme",  # clé exclue
+    }
+    result, calls = run(lambda: service.translate_json(cv, "EN"), deepl_url)
+    assert result == {
+        "summary": "   ",
+        "experience": [{"role": "[EN] Développeur", "responsibilities": ["\n\t", "[EN] Revue de code", ""]}],
+        "company": "Acme",
+    }
+    assert calls == {"requests": 1, "texts": 2}
+
+
+def test_stream_continues_after_failed_language(service, monkeypatch):
+    translate_batch = service._translate_batch
+
+    async def flaky(texts, target_lang, glossary_id=None):
+        if target_lang == "DE":
+            raise httpx.ConnectError("connexion refusée")
+        return await translate_batch(texts, target_lang, glossary_id)
+
+    monkeypatch.setattr(service, "_translate_batch", flaky)
+    with TestClient(service.app) as client:
+        response = client.post("/translate-cv/", params={"target_lang": "EN,DE,IT", "stream": "true"},
+                               headers={"api-key": "sk-test"}, json={"summary": "Développeur"})
+    assert response.status_code == 200
+    lines = {line["target_lang"]: line for line in map(json.loads, response.text.splitlines())}
+    assert set(lines) == {"EN", "DE", "IT"}
+    assert lines["EN"]["cv"] == {"summary": "[EN] Développeur"}
+    assert lines["IT"]["cv"] == {"summary": "[IT] Développeur"}
+    assert "ConnectError" in lines["DE"]["error"] and "cv" not in lines["DE"]
@@ -0,0 +1,116 @@
+"""
+Mémoire de traduction (hireform.translation_memory) : lecture / écriture,
+aller-retour export → import et écrivains concurrents sur la même base WAL
+(une connexion par worker, comme `uvicorn --workers N`).
+
+    python -m pytest tests/test_translation_memory.py
+"""
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hireform import translation_memory  # noqa: E402
+from hireform.translation_memory import TranslationMemory, normalize  # noqa: E402
+
+
+@pytest.fixture
+def memory(tmp_path):
+    tm = TranslationMemory(str(tmp_path / "tm.sqlite3"), lru_size=4)
+    yield tm
+    tm.close()
+
+
+def test_normalize():
+    assert normalize("  Revue\tde\n code ") == "Revue de code"
+    assert normalize("De\u0301veloppeur") == "D\u00e9veloppeur"  # NFD → NFC
+
+
+def test_get_put(memory):
+    memory.put_many([("Développeur", "Developer"), ("  Revue de  code", "Code review")], "en")
+    found = memory.get_many(["Développeur", "Revue de code", "Inconnu"], "EN")
+    assert found == {"Développeur": "Developer", "Revue de code": "Code review"}
+    # Clé : langue et glossaire
+    assert memory.get_many(["Développeur"], "DE") == {}
+    assert memory.get_many(["Développeur"], "EN", "glossaire-rh") == {}
+    memory.put_many([("Développeur", "Software developer")], "EN", "glossaire-rh")
+    assert memory.get_many(["Développeur"], "EN", "glossaire-rh") == {"Développeur": "Software developer"}
+    assert memory.get_many(["Développeur"], "EN") == {"Développeur": "Developer"}
+    # Réécriture : la dernière traduction l'emporte, LRU compris
+    memory.put_many([("Développeur", "Dev")], "EN")
+    assert memory.get_many(["Développeur"], "EN") == {"Développeur": "Dev"}
+
+
+def test_reads_past_lru_and_across_instances(memory, monkeypatch):
+    monkeypatch.setattr(translation_memory, "SQL_CHUNK", 3)  # plusieurs requêtes IN
+    pairs = [(f"Tâche {i}", f"Task {i}") for i in range(10)]
+    memory.put_many(pairs, "EN")
+    assert len(memory._lru) == 4  # LRU borné, le reste est relu en base
+    assert memory.get_many([s for s, _ in pairs], "EN") == dict(pairs)
+    stats = memory.stats()
+    assert (stats["entries"], stats["lookups"], stats["misses"]) == (10, 10, 0)
+    assert stats["lru_hits"] + stats["db_hits"] == 10 and stats["db_hits"] >= 6
+
+    other = TranslationMemory(memory.path)  # autre worker, même fichier
+    try:
+        assert other.get_many(["Tâche 7"], "EN") == {"Tâche 7": "Task 7"}
+    finally:
+        other.close()
+
+
+def test_export_import_round_trip(memory, tmp_path):
+    memory.put_many([("Développeur", "Developer"), ("Chef de projet", "Project manager")], "EN")
+    memory.put_many([("Développeur", "Entwickler")], "DE", "glossaire-rh")
+    exported = tmp_path / "tm.jsonl"
+    assert memory.export_jsonl(str(exported)) == 3
+    lines = [json.loads(line) for line in exported.read_text(encoding="utf-8").splitlines()]
+    assert lines[0] == {"source": "Développeur", "target_lang": "DE", "glossary_id": "glossaire-rh",
+                        "translation": "Entwickler"}
+
+    exported.write_text(exported.read_text(encoding="utf-8") + "\n", encoding="utf-8")  # ligne vide ignorée
+    copy = TranslationMemory(str(tmp_path / "copy.sqlite3"))
+    try:
+        assert copy.import_jsonl(str(exported), batch_size=2) == 3
+        assert copy.get_many(["Développeur", "Chef de projet"], "en") == {
+            "Développeur": "Developer", "Chef de projet": "Project manager"}
+        assert copy.get_many(["Développeur"], "DE", "glossaire-rh") == {"Développeur": "Entwickler"}
+        again = tmp_path / "again.jsonl"
+        copy.export_jsonl(str(again))
+        assert again.read_text(encoding="utf-8") == exported.read_text(encoding="utf-8").rstrip("\n") + "\n"
+    finally:
+        copy.close()
+
+
+def test_concurrent_writers(tmp_path):
+    path = str(tmp_path / "tm.sqlite3")
+    workers = [TranslationMemory(path, lru_size=0) for _ in range(4)]
+    errors = []
+
+    def write(worker_id: int, tm: TranslationMemory):
+        try:
+            for batch in range(25):
+                pairs = [(f"w{worker_id} b{batch} t{i}", f"[EN] {worker_id}-{batch}-{i}") for i in range(20)]
+                tm.put_many(pairs, "EN")
+                tm.put_many([("Développeur", f"Developer {worker_id}")], "EN")  # même clé pour tous
+                assert tm.get_many([pairs[0][0]], "EN") == {pairs[0][0]: pairs[0][1]}
+        except Exception as e:  # remonté au thread principal
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(i, tm)) for i, tm in enumerate(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    try:
+        assert errors == []
+        assert workers[0].stats()["entries"] == 4 * 25 * 20 + 1
+        assert workers[1].get_many(["Développeur"], "EN")["Développeur"] in {f"Developer {i}" for i in range(4)}
+        assert workers[2].get_many(["w3 b24 t19"], "EN") == {"w3 b24 t19": "[EN] 3-24-19"}
+    finally:
+        for tm in workers:
+            tm.close()
@@ -0,0 +1,124 @@
+"""
+Validation des sorties LLM (hireform.validation) : réparations, valeurs null et
+vrais échecs, sur le schéma d'/extract-cv/ et sur un schéma à enum.
+
+    python -m pytest tests/test_validation.py
+"""
+import importlib
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hireform.validation import InvalidOutput, compile_schema, parse_llm_json  # noqa: E402
+
+SCORE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "integer", "minimum": 0, "maximum": 100},
+        "category": {"type": "string", "enum": ["Faible", "Moyen", "Bon"]},
+        "ok": {"type": "boolean"},
+    },
+    "required": ["score", "category"],
+}
+
+
+@pytest.fixture(scope="module")
+def validate_cv():
+    return importlib.import_module("main").validate_cv
+
+
+def cv(**overrides):
+    data = {
+        "personal_information": {"name": "Sarah Khelifi", "email": "sarah@example.com"},
+        "experience": [{"role": "Développeuse", "company": "Acme", "start_date": "2020-01", "end_date": "2023-06"}],
+        "skills": {"langages": ["Python"]},
+        "languages": {"Anglais": "C1"},
+    }
+    data.update(overrides)
+    return data
+
+
+def errors_of(validate, value) -> list:
+    with pytest.raises(InvalidOutput) as info:
+        validate(value)
+    return info.value.errors
+
+
+# --- Réparations
+def test_text_repairs():
+    text = 'Voici le CV :\n```json\n{"skills": {"a": ["b",],}, "languages": {}}\n```'
+    assert parse_llm_json(text) == {"skills": {"a": ["b"]}, "languages": {}}
+
+
+def test_value_repairs(validate_cv):
+    data = validate_cv(cv(
+        personal_information={"name": "Sarah Khelifi", "email": "sarah@example.com", "phone": 612345678},
+        experience={"role": "Développeuse", "company": "Acme", "start_date": "2020-01", "end_date": "2023-06"},
+        certifications=None,
+    ))
+    assert data["personal_information"]["phone"] == "612345678"
+    assert isinstance(data["experience"], list) and len(data["experience"]) == 1
+    assert data["certifications"] == []
+
+
+def test_missing_required_collections_defaulted(validate_cv):
+    data = validate_cv({"personal_information": {"name": "Sarah Khelifi", "email": "s@example.com"}})
+    assert (data["experience"], data["skills"], data["languages"]) == ([], {}, {})
+
+
+def test_enum_and_number_repairs():
+    validate = compile_schema(SCORE_SCHEMA)
+    assert validate({"score": "72", "category": "bon", "ok": "true"}) == {"score": 72, "category": "Bon", "ok": True}
+
+
+# --- null
+def test_null_on_required_string_kept(validate_cv):
+    data = validate_cv(cv(
+        personal_information={"name": "Sarah Khelifi", "email": None},
+        experience=[{"role": "Développeuse", "company": "Acme", "start_date": "2020-01", "end_date": None}],
+    ))
+    assert data["personal_information"]["email"] is None
+    assert data["experience"][0]["end_date"] is None
+
+
+def test_null_on_optional_field_dropped(validate_cv):
+    data = validate_cv(cv(personal_information={"name": "Sarah Khelifi", "email": "s@example.com", "phone": None}))
+    assert "phone" not in data["personal_information"]
+
+
+def test_null_on_required_enum_rejected():
+    assert errors_of(compile_schema(SCORE_SCHEMA), {"score": 10, "category": None}) == [
+        "$.category : champ requis manquant"
+    ]
+
+
+# --- Vrais échecs, une erreur par chemin
+def test_missing_required_string(validate_cv):
+    assert errors_of(validate_cv, cv(personal_information={"email": "s@example.com"})) == [
+        "$.personal_information.name : champ requis manquant"
+    ]
+
+
+def test_null_required_object_reported_once(validate_cv):
+    assert errors_of(validate_cv, cv(personal_information=None)) == ["$.personal_information : champ requis manquant"]
+
+
+def test_wrong_types(validate_cv):
+    errors = errors_of(validate_cv, cv(
+        personal_information={"name": ["Sarah"], "email": "s@example.com"},
+        experience=[{"role": "Développeuse", "company": "Acme", "start_date": {"year": 2020}}],
+    ))
+    assert errors == [
+        "$.personal_information.name : chaîne attendue, list reçu",
+        "$.experience[0].start_date : chaîne attendue, dict reçu",
+        "$.experience[0].end_date : champ requis manquant",
+    ]
+
+
+def test_out_of_range_and_unknown_enum():
+    errors = errors_of(compile_schema(SCORE_SCHEMA), {"score": 140, "category": "Parfait"})
+    assert errors == ["$.score : hors de l'intervalle [0, 100]", "$.category : valeur hors liste ['Faible', 'Moyen', 'Bon']"]
@@ -1,54 +1,49 @@
 # main.py
 
+import asyncio
 import io
 import json
+import os
 import re
 import zipfile
 import tempfile
-import subprocess
+from typing import Awaitable, Callable, Optional
 
-import httpx
-from fastapi import FastAPI, UploadFile, File, Depends, HTTPException, Query
+from fastapi import APIRouter, FastAPI, UploadFile, File, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from fastapi.security import APIKeyHeader
-from docxtpl import DocxTemplate
 
-app = FastAPI(title="Hireform CV Services")
+from hireform.admission import internal_headers, slot
+from hireform.http import get_http_client
+from hireform.logs import configure_logging_on_startup
+from hireform.metrics import instrument, merge_server_timing, stage, timed
+from hireform.office import convert_to_pdf
+from hireform.responses import ORJSONResponse
+from hireform.security import validate_api_key
 
-# ---- Security ----
-api_key_header = APIKeyHeader(name="api-key", auto_error=True)
-def validate_api_key(key: str = Depends(api_key_header)):
-    if not key.startswith("sk-"):
-        raise HTTPException(status_code=401, detail="Invalid API key")
-    return key
+# /extract-cv/ appelé par l'orchestrateur : en HTTP sur BASE_URL quand transform-cv
+# tourne seul ; la passerelle, qui monte aussi `main`, branche ici son extraction
+# (main.extract_cv_data) et l'appel reste dans le processus
+BASE_URL = os.getenv("HIREFORM_BASE_URL", "http://localhost:8000")
+local_extract: Optional[Callable[..., Awaitable[dict]]] = None
 
-# ---- 2) generate-template-cv ----
-@app.post("/generate-template-cv/")
-async def generate_template_cv(
-    model_file: UploadFile = File(..., description="`.docx` modèle entreprise"),
-    json_file:  UploadFile = File(..., description="JSON structuré issu de `/extract-cv`"),
-    api_key:    str        = Depends(validate_api_key)
-):
-    """
-    Injecte des balises Jinja2 dans un .docx existant, sans toucher à la mise en forme.
-    """
-    # Load JSON
-    try:
-        data = json.loads(await json_file.read())
-    except json.JSONDecodeError:
-        raise HTTPException(400, "Invalid JSON")
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
 
+router = APIRouter(tags=["transform-cv"], default_response_class=ORJSONResponse)
+
+# Réécriture d'un .docx modèle : valeurs du premier élément → balises Jinja2,
+# boucles autour des paragraphes correspondants
+@timed("template_rewrite")
+def rewrite_template(in_bytes: bytes, data: dict) -> io.BytesIO:
     # Read the .docx as a zip
-    in_bytes = await model_file.read()
     zin = zipfile.ZipFile(io.BytesIO(in_bytes), 'r')
     xml = zin.read('word/document.xml').decode('utf-8')
     zin.close()
 
     # Prepare first items
-    exp0  = data.get('experience', [{}])[0]
-    edu0  = data.get('education',   [{}])[0]
-    cert0 = data.get('certifications', [{}])[0]
-    lang0, lvl0 = next(iter(data.get('languages', {}).items()), ("",""))
+    exp0  = (data.get('experience') or [{}])[0]  # tableaux vides : validés, pas omis
+    edu0  = (data.get('education') or [{}])[0]
+    cert0 = (data.get('certifications') or [{}])[0]
+    lang0, lvl0 = next(iter((data.get('languages') or {}).items()), ("",""))
 
     # Map static → Jinja2
     mapping = {
@@ -108,15 +103,35 @@ async def generate_template_cv(
     zin.close()
     zout.close()
     out_io.seek(0)
+    return out_io
+
+# ---- 2) generate-template-cv ----
+@router.post("/generate-template-cv/")
+async def generate_template_cv(
+    model_file: UploadFile = File(..., description="`.docx` modèle entreprise"),
+    json_file:  UploadFile = File(..., description="JSON structuré issu de `/extract-cv`"),
+    api_key:    str        = Depends(validate_api_key)
+):
+    """
+    Injecte des balises Jinja2 dans un .docx existant, sans toucher à la mise en forme.
+    """
+    # Load JSON
+    try:
+        data = json.loads(await json_file.read())
+    except json.JSONDecodeError:
+        raise HTTPException(400, "Invalid JSON")
+
+    in_bytes = await model_file.read()
+    out_io = rewrite_template(in_bytes, data)
 
     return StreamingResponse(
         out_io,
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        media_type=DOCX_MEDIA_TYPE,
         headers={"Content-Disposition": "attachment; filename=template_cv.docx"}
     )
 
 # ---- 3) generate-cv ----
-@app.post("/generate-cv/")
+@router.post("/generate-cv/")
 async def generate_cv(
     template_file: UploadFile = File(..., description="`.docx` template Jinja2"),
     json_file:     UploadFile = File(..., description="JSON structuré du CV"),
@@ -127,40 +142,41 @@ async def generate_cv(
     Rend le template .docx avec les données JSON, retourne DOCX ou PDF.
     """
     data = json.loads(await json_file.read())
+    path, media_type, filename = await render_cv(await template_file.read(), data, as_pdf)
+    return StreamingResponse(
+        open(path, "rb"),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
 
+async def render_cv(template_bytes: bytes, data: dict, as_pdf: bool):
+    """Rend le template avec `data` ; renvoie (chemin, type MIME, nom du fichier)."""
     # Write template to temp file
     tmp_dir = tempfile.mkdtemp()
     tpl_path = os.path.join(tmp_dir, "template.docx")
     with open(tpl_path, "wb") as f:
-        f.write(await template_file.read())
+        f.write(template_bytes)
 
     # Render with docxtpl
-    doc = DocxTemplate(tpl_path)
-    doc.render(data)
-    out_docx = os.path.join(tmp_dir, "filled.docx")
-    doc.save(out_docx)
+    with stage("docx_render"):
+        from docxtpl import DocxTemplate  # chargé au premier rendu
+        doc = DocxTemplate(tpl_path)
+        doc.render(data)
+        out_docx = os.path.join(tmp_dir, "filled.docx")
+        doc.save(out_docx)
 
     if not as_pdf:
-        return StreamingResponse(
-            open(out_docx, "rb"),
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            headers={"Content-Disposition": "attachment; filename=final_cv.docx"}
-        )
-
-    # Convert to PDF via LibreOffice headless
-    subprocess.run([
-        "libreoffice", "--headless", "--convert-to", "pdf",
-        "--outdir", tmp_dir, out_docx
-    ], check=True)
-    out_pdf = os.path.join(tmp_dir, "filled.pdf")
-    return StreamingResponse(
-        open(out_pdf, "rb"),
-        media_type="application/pdf",
-        headers={"Content-Disposition": "attachment; filename=final_cv.pdf"}
-    )
+        return out_docx, DOCX_MEDIA_TYPE, "final_cv.docx"
+
+    # Convert to PDF via LibreOffice headless (pool pdf_convert, hors boucle d'événements)
+    async with slot("pdf_convert"):
+        with stage("pdf_convert"):
+            # profil LibreOffice propre à l'appel : conversions simultanées sûres
+            out_pdf = await asyncio.to_thread(convert_to_pdf, out_docx, tmp_dir)
+    return out_pdf, "application/pdf", "final_cv.pdf"
 
 # ---- 4) transform-cv ----
-@app.post("/transform-cv/")
+@router.post("/transform-cv/")
 async def transform_cv(
     cv_file:     UploadFile = File(..., description="CV brut (.pdf ou .docx)"),
     model_file:  UploadFile = File(..., description="Modèle entreprise `.docx`"),
@@ -173,54 +189,45 @@ async def transform_cv(
       2) /generate-template-cv → template `.docx`
       3) /generate-cv     → final `.docx` ou `.pdf`
     """
+    # Chaque appel est une étape. generate-template-cv et generate-cv sont dans ce
+    # module : appel direct, leurs étapes (docx_render, pdf_convert…) sont
+    # mesurées dans cette requête ; le détail d'un /extract-cv/ distant est repris
+    # de son Server-Timing sous le préfixe de l'étape
     # 1) extract-cv
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            "http://localhost:8000/extract-cv/",
-            files={"file": (cv_file.filename, await cv_file.read(), cv_file.content_type)},
-            headers={"api-key": api_key}
-        )
-        if resp.status_code != 200:
-            raise HTTPException(502, f"extract-cv failed: {resp.text}")
-        cv_json = resp.json()
+    cv_bytes = await cv_file.read()
+    with stage("extract_cv"):
+        if local_extract is not None:
+            cv_json = await local_extract(cv_bytes, api_key)
+        else:
+            cv_json = await extract_remote(cv_file, cv_bytes, api_key)
 
     # 2) generate-template-cv
-    async with httpx.AsyncClient() as client:
-        model_bytes = await model_file.read()
-        files = {
-            "model_file": (model_file.filename, model_bytes, model_file.content_type),
-            "json_file":  ("cv.json", json.dumps(cv_json), "application/json")
-        }
-        resp2 = await client.post(
-            "http://localhost:8000/generate-template-cv/",
-            files=files,
-            headers={"api-key": api_key}
-        )
-        if resp2.status_code != 200:
-            raise HTTPException(502, f"generate-template-cv failed: {resp2.text}")
-        template_bytes = await resp2.aread()
+    with stage("generate_template"):
+        template_io = rewrite_template(await model_file.read(), cv_json)
 
     # 3) generate-cv
-    async with httpx.AsyncClient() as client:
-        files = {
-            "template_file": ("template.docx", template_bytes, "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
-            "json_file":     ("cv.json",     json.dumps(cv_json),        "application/json")
-        }
-        params = {"as_pdf": as_pdf}
-        resp3 = await client.post(
-            "http://localhost:8000/generate-cv/",
-            files=files,
-            params=params,
-            headers={"api-key": api_key}
-        )
-        if resp3.status_code != 200:
-            raise HTTPException(502, f"generate-cv failed: {resp3.text}")
-        content = await resp3.aread()
-        content_type = resp3.headers.get("content-type")
-        disposition = resp3.headers.get("content-disposition")
+    with stage("generate_cv"):
+        path, media_type, filename = await render_cv(template_io.getvalue(), cv_json, as_pdf)
 
     return StreamingResponse(
-        io.BytesIO(content),
-        media_type=content_type,
-        headers={"Content-Disposition": disposition}
+        open(path, "rb"),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+async def extract_remote(cv_file: UploadFile, cv_bytes: bytes, api_key: str) -> dict:
+    resp = await get_http_client().post(
+        f"{BASE_URL}/extract-cv/",
+        files={"file": (cv_file.filename, cv_bytes, cv_file.content_type)},
+        headers={"api-key": api_key, **internal_headers()}  # hors quota : déjà admis
     )
+    merge_server_timing(resp.headers.get("server-timing"), "extract_cv")
+    if resp.status_code != 200:
+        raise HTTPException(502, f"extract-cv failed: {resp.text}")
+    return resp.json()
+
+# Application autonome (uvicorn transform-cv:app) ; la passerelle (gateway.py) monte `router`
+app = FastAPI(title="Hireform CV Services", default_response_class=ORJSONResponse)
+app.include_router(router)
+configure_logging_on_startup(app)
+instrument(app)
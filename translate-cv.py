@@ -1,9 +1,19 @@
-from fastapi import FastAPI, Header, HTTPException, Request, Query
-from typing import Optional, Union
-import httpx
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI, Header, HTTPException, Request, Query, Depends
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Union
+import asyncio
+import json
+import logging
 import os
+from urllib.parse import quote_plus
 
-app = FastAPI(title="Hireform CV Translation API")
+from hireform.http import close_http_client, get_http_client
+from hireform.logs import configure_logging_on_startup
+from hireform.metrics import instrument, stage
+from hireform.responses import ORJSONResponse
+from hireform.security import validate_api_key
+from hireform.translation_memory import DEFAULT_PATH, TranslationMemory, normalize
 
 DEEPL_API_KEY = os.getenv("DEEPL_API_KEY")  # Clé DeepL à définir dans l'environnement
 
@@ -13,53 +23,165 @@ EXCLUDED_KEYS = {
     "start_date", "end_date", "location", "languages", "issuer"
 }
 
-# Fonction de traduction texte avec DeepL
-async def translate_text(text: str, target_lang: str, glossary_id: Optional[str] = None) -> str:
-    url = "https://api-free.deepl.com/v2/translate"
+# Paramètres des appels DeepL
+DEEPL_API_URL = os.getenv("DEEPL_API_URL", "https://api-free.deepl.com/v2/translate")
+DEEPL_BATCH_SIZE = 50            # DeepL accepte jusqu'à 50 `text` par requête
+# et 128 Kio de corps urlencodé : taille des `text` une fois encodés (un
+# caractère accentué en vaut 6, « é » → « %C3%A9 »), 1 Kio laissé aux autres champs
+DEEPL_BATCH_BYTES = 128 * 1024 - 1024
+DEEPL_MAX_CONCURRENCY = int(os.getenv("DEEPL_MAX_CONCURRENCY", "4"))
+
+# Appels DeepL simultanés pour tout le processus (client HTTP partagé, cf. hireform.http)
+_deepl_slots = asyncio.Semaphore(DEEPL_MAX_CONCURRENCY)
+
+# Mémoire de traduction (SQLite WAL + LRU) ; TRANSLATION_MEMORY_PATH="" la désactive
+_memory: Optional[TranslationMemory] = None
+
+def get_memory() -> Optional[TranslationMemory]:
+    global _memory
+    if _memory is None and DEFAULT_PATH:
+        _memory = TranslationMemory(DEFAULT_PATH)
+    return _memory
+
+async def shutdown():
+    global _memory
+    if _memory is not None:
+        _memory.close()
+        _memory = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await shutdown()
+    await close_http_client()
+
+router = APIRouter(tags=["translate-cv"], default_response_class=ORJSONResponse)
+logger = logging.getLogger(__name__)
+
+# Traduction d'un lot de textes en une requête DeepL
+async def _translate_batch(texts: List[str], target_lang: str, glossary_id: Optional[str] = None) -> List[str]:
     headers = { "Authorization": f"DeepL-Auth-Key {DEEPL_API_KEY}" }
     data = {
-        "text": text,
+        "text": texts,
         "target_lang": target_lang.upper(),
     }
     if glossary_id:
         data["glossary_id"] = glossary_id
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, data=data, headers=headers)
-        if response.status_code != 200:
-            raise HTTPException(status_code=500, detail="Erreur DeepL : " + response.text)
-        return response.json()["translations"][0]["text"]
+    async with _deepl_slots:
+        response = await get_http_client().post(DEEPL_API_URL, data=data, headers=headers, timeout=30.0)
+    if response.status_code != 200:
+        raise HTTPException(status_code=500, detail="Erreur DeepL : " + response.text)
+    return [t["text"] for t in response.json()["translations"]]
+
+def _encoded_size(text: str) -> int:
+    return len(quote_plus(text)) + 6  # « text=…& »
+
+def _batches(texts: List[str]):
+    batch, size = [], 0
+    for text in texts:
+        encoded = _encoded_size(text)
+        if batch and (len(batch) >= DEEPL_BATCH_SIZE or size + encoded > DEEPL_BATCH_BYTES):
+            yield batch
+            batch, size = [], 0
+        batch.append(text)
+        size += encoded
+    if batch:
+        yield batch
+
+# Traduction d'une liste de textes : mémoire de traduction d'abord,
+# puis lots multi-`text` pour le reste, concurrence bornée.
+# La forme normalisée ne sert que de clé de mémoire : DeepL reçoit le texte
+# d'origine, sauts de ligne compris. SQLite est interrogé hors de la boucle.
+async def translate_texts(texts: List[str], target_lang: str, glossary_id: Optional[str] = None) -> List[str]:
+    memory = get_memory()
+    sources = list(dict.fromkeys(texts))
+    known = {}
+    if memory:
+        with stage("tm_lookup"):
+            known = await asyncio.to_thread(memory.get_many, sources, target_lang, glossary_id)
+    translations = {}
+    for text in sources if known else ():
+        key = normalize(text)
+        if key in known:
+            translations[text] = known[key]
+    todo = [t for t in sources if t not in translations]
+
+    if todo:
+        with stage("deepl"):
+            results = await asyncio.gather(*(_translate_batch(b, target_lang, glossary_id) for b in _batches(todo)))
+        translated = [t for batch in results for t in batch]
+        if memory:
+            with stage("tm_store"):
+                await asyncio.to_thread(memory.put_many, list(zip(todo, translated)), target_lang, glossary_id)
+        translations.update(zip(todo, translated))
+    return [translations[t] for t in texts]
+
+# Fonction de traduction texte avec DeepL
+async def translate_text(text: str, target_lang: str, glossary_id: Optional[str] = None) -> str:
+    return (await translate_texts([text], target_lang, glossary_id))[0]
 
-# Fonction récursive de traduction JSON
-async def translate_json(obj, target_lang: str, glossary_id: Optional[str] = None, parent_key: Optional[str] = None):
+# Parcours du JSON : applique `fn` à chaque chaîne traduisible (hors EXCLUDED_KEYS)
+def _map_strings(obj, fn, parent_key: Optional[str] = None):
     if isinstance(obj, dict):
-        return {
-            key: await translate_json(value, target_lang, glossary_id, parent_key=key)
-            for key, value in obj.items()
-        }
+        return {key: _map_strings(value, fn, parent_key=key) for key, value in obj.items()}
     elif isinstance(obj, list):
-        return [await translate_json(item, target_lang, glossary_id, parent_key=parent_key) for item in obj]
+        return [_map_strings(item, fn, parent_key=parent_key) for item in obj]
     elif isinstance(obj, str):
-        if parent_key in EXCLUDED_KEYS:
+        if parent_key in EXCLUDED_KEYS or not obj.strip():
             return obj
-        return await translate_text(obj, target_lang, glossary_id)
+        return fn(obj)
     else:
         return obj
 
+def collect_strings(obj) -> List[str]:
+    """Chaînes traduisibles du JSON, dédoublonnées, dans l'ordre de parcours."""
+    found = {}
+    _map_strings(obj, lambda text: found.setdefault(text, None))
+    return list(found)
+
+async def _translate_collected(obj, sources: List[str], target_lang: str, glossary_id: Optional[str] = None):
+    if not sources:
+        return obj
+    translations = dict(zip(sources, await translate_texts(sources, target_lang, glossary_id)))
+    return _map_strings(obj, translations.__getitem__)
+
+# Traduction du JSON en deux phases : collecte + dédoublonnage, puis lots DeepL
+async def translate_json(obj, target_lang: str, glossary_id: Optional[str] = None):
+    return await _translate_collected(obj, collect_strings(obj), target_lang, glossary_id)
+
+# Plusieurs langues : une seule collecte, lots DeepL de chaque langue en parallèle.
+# Renvoie les tâches (une par langue, résultat `(langue, CV traduit)`) pour
+# permettre de consommer chaque langue dès qu'elle est prête.
+def translate_json_tasks(obj, target_langs: List[str], glossary_id: Optional[str] = None) -> List[asyncio.Task]:
+    sources = collect_strings(obj)
+
+    async def one(lang):
+        return lang, await _translate_collected(obj, sources, lang, glossary_id)
+
+    return [asyncio.ensure_future(one(lang)) for lang in target_langs]
+
+def parse_target_langs(values: List[str]) -> List[str]:
+    """`EN,DE` ou paramètres répétés → liste de codes DeepL sans doublons."""
+    langs = [l.strip().upper() for v in values for l in v.split(",") if l.strip()]
+    return list(dict.fromkeys(langs))
+
 # Endpoint de traduction
-@app.post("/translate-cv/")
+@router.post("/translate-cv/")
 async def translate_cv(
     request: Request,
-    api_key: str = Header(..., alias="api-key"),
+    api_key: str = Depends(validate_api_key),
     header_lang: Optional[str] = Header(None, alias="target-lang"),
-    query_lang: Optional[str] = Query("EN", alias="target_lang")
+    query_lang: List[str] = Query(["EN"], alias="target_lang",
+                                  description="Une ou plusieurs langues : ?target_lang=EN&target_lang=DE ou EN,DE"),
+    stream: bool = Query(False, description="NDJSON : une ligne par langue dès qu'elle est traduite")
 ):
-    if not api_key.startswith("sk-"):
-        raise HTTPException(status_code=401, detail="Clé API invalide")
     if not DEEPL_API_KEY:
         raise HTTPException(status_code=500, detail="Clé API DeepL manquante")
 
-    target_lang = header_lang or query_lang
+    target_langs = parse_target_langs([header_lang] if header_lang else query_lang)
+    if not target_langs:
+        raise HTTPException(status_code=400, detail="Langue cible manquante")
 
     try:
         raw_json = await request.json()
@@ -67,6 +189,52 @@ async def translate_cv(
         raise HTTPException(status_code=400, detail="Format JSON invalide")
 
     glossary_id = None  # Optionnel
-    translated = await translate_json(raw_json, target_lang, glossary_id)
 
-    return translated
+    # Une seule langue, sans streaming : réponse inchangée (le CV traduit)
+    if len(target_langs) == 1 and not stream:
+        return await translate_json(raw_json, target_langs[0], glossary_id)
+
+    tasks = translate_json_tasks(raw_json, target_langs, glossary_id)
+    if not stream:
+        try:
+            return dict(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def ndjson():
+        pending = dict(zip(tasks, target_langs))
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    lang = pending.pop(task)
+                    # Une langue en échec (DeepL en erreur, délai, connexion) n'interrompt
+                    # pas le flux : ligne d'erreur, les autres langues suivent
+                    try:
+                        line = {"target_lang": lang, "cv": task.result()[1]}
+                    except HTTPException as e:
+                        line = {"target_lang": lang, "error": e.detail}
+                    except Exception as e:
+                        logger.exception("Traduction %s en échec", lang)
+                        line = {"target_lang": lang, "error": f"Erreur de traduction : {type(e).__name__}: {e}"}
+                    yield json.dumps(line, ensure_ascii=False) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+# Statistiques de la mémoire de traduction (taux de succès)
+@router.get("/translation-memory/stats", dependencies=[Depends(validate_api_key)])
+async def translation_memory_stats():
+    memory = get_memory()
+    return memory.stats() if memory else {"enabled": False}
+
+
+# Application autonome (uvicorn translate-cv:app) ; la passerelle (gateway.py) monte `router`
+app = FastAPI(title="Hireform CV Translation API", lifespan=lifespan, default_response_class=ORJSONResponse)
+app.include_router(router)
+configure_logging_on_startup(app)
+instrument(app)